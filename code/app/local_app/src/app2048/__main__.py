@@ -1,75 +1,183 @@
+import argparse
 import asyncio
 import curses
 import threading
-import time
+from typing import Optional, Union
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 import uvicorn
 
 from game_backend.core.array_backend import ArrayGrid, ArrayTile
+from game_backend.core.comm import AsyncInProcessCommunication
 from game_backend.services import GameManager, LocalStorageManager
-from game_backend.services.api_server import app as fastapi_app
 from cli_frontend.ws_comm import WebSocketCommunication
-from cli_frontend.renderer import Renderer
+from cli_frontend.renderer import IncrementalRenderer, Renderer
 from cli_frontend.input_handler import InputHandler
 from .game_loop import GameLoop
 
-def run_server():
-    """Run the FastAPI server."""
-    uvicorn.run(fastapi_app, host="127.0.0.1", port=8000)
+
+class ReadyServer(uvicorn.Server):
+    """
+    Uvicorn server that signals a threading.Event once startup has finished, successfully or not
+    (check `started`).
+    """
+    def __init__(self, config: uvicorn.Config) -> None:
+        super().__init__(config)
+        self.ready = threading.Event()
+
+    async def startup(self, sockets=None) -> None:
+        try:
+            await super().startup(sockets=sockets)
+        finally:
+            # Also set when startup fails, so the caller need not wait for its timeout
+            self.ready.set()
+
+
+def start_server(host: str = "127.0.0.1", port: int = 8000, timeout: float = 10.0) -> ReadyServer:
+    """
+    Runs the FastAPI server in a background thread for remote clients, returning once it is ready.
+
+    Args:
+        host (str): Interface to bind.
+        port (int): Port to bind.
+        timeout (float): Seconds to wait for the server to start.
+
+    Returns:
+        ReadyServer: The running server.
+    """
+    # Imported here so in-process play does not pay for FastAPI and the server's routers
+    from game_backend.services.api_server import app as fastapi_app
+
+    server = ReadyServer(uvicorn.Config(fastapi_app, host=host, port=port, log_level="warning"))
+    server_thread = threading.Thread(target=server.run, daemon=True)
+    server_thread.start()
+    if not server.ready.wait(timeout) or not server.started or server.should_exit:
+        raise RuntimeError(f"Game server failed to start on {host}:{port}")
+    return server
 
 
-def initialize_cli_frontend(stdscr, communication: WebSocketCommunication) -> GameLoop:
+def create_local_communication() -> AsyncInProcessCommunication:
+    """
+    Creates a local game and an in-process transport to it.
+    """
+    storage_manager = LocalStorageManager()
+    game_manager = GameManager(
+        grid=ArrayGrid(size=4),
+        tile_class=ArrayTile,
+        storage_manager=storage_manager
+    )
+    return AsyncInProcessCommunication(game_manager=game_manager)
+
+
+def initialize_cli_frontend(
+    stdscr,
+    communication: Union[AsyncInProcessCommunication, WebSocketCommunication],
+    incremental: bool = False,
+    animation_frames: int = 0,
+    predict: bool = False,
+    show_latency: bool = False
+) -> GameLoop:
     """
     Initializes the CLI frontend with the provided communication interface.
 
     Args:
         stdscr (curses.window): The curses window object.
-        communication (WebSocketCommunication): Communication interface with the backend.
-    
+        communication (Union[AsyncInProcessCommunication, WebSocketCommunication]): Communication interface with the backend.
+        incremental (bool): Only redraw changed cells instead of repainting the screen on every move.
+        animation_frames (int): Frames used to flash merged and spawned cells in incremental mode.
+        predict (bool): Apply moves locally and pipeline them to the backend.
+        show_latency (bool): Show a latency status line (remote games only).
+
     Returns:
         GameLoop: An instance of the game loop.
     """
-    renderer = Renderer(stdscr)
+    if incremental:
+        renderer = IncrementalRenderer(stdscr, animation_frames=animation_frames)
+    else:
+        renderer = Renderer(stdscr)
     input_handler = InputHandler()
     game_loop = GameLoop(
         communication=communication,
         renderer=renderer,
-        input_handler=input_handler
+        input_handler=input_handler,
+        predict=predict,
+        show_latency=show_latency
     )
     return game_loop
 
 
-def main(stdscr: curses.window) -> None:
+def main(
+    stdscr: curses.window,
+    serve: bool = False,
+    port: int = 8000,
+    connect: Optional[str] = None,
+    incremental: bool = False,
+    animation_frames: int = 0,
+    predict: bool = False,
+    latency_status: bool = False,
+    latency_json: Optional[str] = None
+) -> None:
     """
     Application entry point. Initializes backend and frontend components.
 
     Args:
         stdscr (curses.window): The curses window object.
+        serve (bool): Also start the WebSocket server for remote clients.
+        port (int): Port for the WebSocket server.
+        connect (Optional[str]): Play on a remote server at this WebSocket URI instead of in-process.
+        incremental (bool): Use the incremental renderer.
+        animation_frames (int): Frames used to flash merged and spawned cells in incremental mode.
+        predict (bool): Predict moves locally while replies from the server are in flight.
+        latency_status (bool): Show round trip, server, network, decode and ping latencies in a status line.
+        latency_json (Optional[str]): Write the latency histograms of a remote game to this JSON file on exit.
     """
-    # Start FastAPI server in a background thread
-    server_thread = threading.Thread(target=run_server, daemon=True)
-    server_thread.start()
+    if serve:
+        # Since it's a daemon thread, it will exit with the program
+        start_server(port=port)
 
-    # Wait briefly to ensure the server is up
-    time.sleep(1)
+    if connect:
+        communication = WebSocketCommunication(uri=connect)
+    else:
+        communication = create_local_communication()
 
-    # Initialize WebSocket communication
-    ws_uri = "ws://127.0.0.1:8000/ws/game"
-    communication = WebSocketCommunication(uri=ws_uri)
-    
     # Initialize frontend with communication
-    game_loop = initialize_cli_frontend(stdscr, communication)
-    
+    game_loop = initialize_cli_frontend(
+        stdscr, communication, incremental=incremental, animation_frames=animation_frames, predict=predict,
+        show_latency=latency_status
+    )
+
     # Run the game loop
     try:
         asyncio.run(game_loop.run())
     except KeyboardInterrupt:
         pass
     finally:
-        # Ensure the server thread stops when the main program exits
-        # Since it's a daemon thread, it will exit automatically
-        pass
+        if latency_json and isinstance(communication, WebSocketCommunication):
+            communication.latency.dump(latency_json)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app2048", description="Play 2048 in the terminal.")
+    parser.add_argument("--serve", action="store_true", help="Also serve the game to remote WebSocket clients.")
+    parser.add_argument("--port", type=int, default=8000, help="Port for --serve.")
+    parser.add_argument("--connect", default=None, help="Play on a remote server, e.g. ws://127.0.0.1:8000/ws/game.")
+    parser.add_argument("--incremental", action="store_true", help="Only redraw changed cells (recommended over SSH).")
+    parser.add_argument("--animation-frames", type=int, default=0, help="Flash merged and spawned cells for this many frames.")
+    parser.add_argument("--predict", action="store_true", help="Show moves instantly and pipeline them to a --connect server.")
+    parser.add_argument("--latency-status", action="store_true", help="Show latencies to a --connect server in a status line.")
+    parser.add_argument("--latency-json", default=None, help="Write latency histograms of a --connect game to this file on exit.")
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
-    curses.wrapper(main)
\ No newline at end of file
+    args = parse_args()
+    curses.wrapper(
+        main,
+        serve=args.serve,
+        port=args.port,
+        connect=args.connect,
+        incremental=args.incremental,
+        animation_frames=args.animation_frames,
+        predict=args.predict,
+        latency_status=args.latency_status,
+        latency_json=args.latency_json
+    )
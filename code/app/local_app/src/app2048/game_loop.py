@@ -1,10 +1,13 @@
 import asyncio
+import sys
 
-from typing import Optional
+from typing import Any, Dict, Optional, Union
 from cli_frontend.ws_comm import WebSocketCommunication
 from cli_frontend.renderer import Renderer
 from cli_frontend.input_handler import InputHandler
+from game_backend.core.comm import AsyncInProcessCommunication
 from game_backend.services.game_manager import GameManager
+from .prediction import MovePredictor
 
 class GameLoop:
     """
@@ -12,31 +15,58 @@ class GameLoop:
     """
     def __init__(
         self,
-        communication: WebSocketCommunication,
+        communication: Union[AsyncInProcessCommunication, WebSocketCommunication],
         renderer: Renderer,
-        input_handler: InputHandler
+        input_handler: InputHandler,
+        predict: bool = False,
+        max_in_flight: int = 8,
+        ack_timeout: float = 2.0,
+        show_latency: bool = False
     ) -> None:
         """
         Initializes the GameLoop with necessary components.
 
         Args:
-            communication (WebSocketCommunication): Communication interface with the backend.
+            communication (Union[AsyncInProcessCommunication, WebSocketCommunication]): Communication interface with the backend.
             renderer (Renderer): Renderer for displaying the game.
             input_handler (InputHandler): Handler for user input.
+            predict (bool): Apply moves locally and pipeline them to the server instead of waiting for each reply.
+            max_in_flight (int): Maximum number of unacknowledged moves when predicting.
+            ack_timeout (float): Seconds without a reply after which pending moves are presumed dropped by the server.
+            show_latency (bool): Show the connection's latency histograms in a status line, if it measures them.
         """
         self.communication = communication
         self.renderer = renderer
         self.input_handler = input_handler
+        self.predict = predict
+        self.max_in_flight = max_in_flight
+        self.ack_timeout = ack_timeout
+        self.show_latency = show_latency
         # self.game_manager: GameManager = communication.game_manager
 
+    def render(self, grid_state: Dict[str, Any]) -> None:
+        """
+        Renders a state, followed by the latency status line when enabled.
+        """
+        self.renderer.render_grid(grid_state)
+        latency = getattr(self.communication, 'latency', None)
+        if self.show_latency and latency is not None:
+            self.renderer.draw_status(latency.status_line())
+
     async def run(self) -> None:
         """
         Executes the main game loop, handling rendering and user input.
         """
+        if self.predict:
+            await self.run_predictive()
+            return
+
         await self.communication.connect()
         while True:
             grid_state = self.communication.get_game_state()
-            self.renderer.render_grid(grid_state)
+            self.render(grid_state)
+            # getch blocks the event loop, so the animation gets to play first
+            await self.renderer.wait_animation()
 
             key = self.renderer.stdscr.getch()
             direction: Optional[int] = self.input_handler.get_direction(key)
@@ -50,8 +80,81 @@ class GameLoop:
                     break
                 grid_state = self.communication.get_game_state()
                 if grid_state.get('over', False):
-                    self.renderer.render_grid(grid_state)
+                    self.render(grid_state)
                     self.renderer.show_game_over("Game Over!")
                     self.renderer.stdscr.getch()
                     await self.communication.close()
-                    break
\ No newline at end of file
+                    break
+
+    async def run_predictive(self) -> None:
+        """
+        Executes the game loop with client-side prediction.
+
+        Keys are read as soon as they are typed, applied locally and sent without waiting for
+        the previous reply. Replies are reconciled with the prediction as they arrive.
+        """
+        await self.communication.connect()
+        grid_state = self.communication.get_game_state()
+        if grid_state is None:
+            return
+        predictor = MovePredictor(grid_state)
+        self.render(predictor.display_state())
+
+        stdscr = self.renderer.stdscr
+        loop = asyncio.get_running_loop()
+        keys: asyncio.Queue = asyncio.Queue()
+
+        def read_keys() -> None:
+            while (key := stdscr.getch()) != -1:
+                keys.put_nowait(key)
+
+        stdscr.nodelay(True)
+        loop.add_reader(sys.stdin.fileno(), read_keys)
+        key_task = asyncio.ensure_future(keys.get())
+        reply_task = asyncio.ensure_future(self.communication.next_state())
+        try:
+            while True:
+                waiting = {reply_task}
+                if predictor.in_flight < self.max_in_flight:
+                    waiting.add(key_task)
+                done, _ = await asyncio.wait(
+                    waiting, timeout=self.ack_timeout if predictor.in_flight else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # Replies are overdue (e.g. lost with a dropped connection); stop waiting for them
+                    predictor.resync()
+                    self.communication.forget_pending()
+                    self.render(predictor.display_state())
+                    continue
+
+                if reply_task in done:
+                    reply = reply_task.result()
+                    if reply is None:
+                        break
+                    predictor.reconcile(reply)
+                    self.render(predictor.display_state())
+                    if predictor.over:
+                        loop.remove_reader(sys.stdin.fileno())
+                        stdscr.nodelay(False)
+                        self.renderer.show_game_over("Game Over!")
+                        stdscr.getch()
+                        break
+                    reply_task = asyncio.ensure_future(self.communication.next_state())
+
+                if key_task in done:
+                    key = key_task.result()
+                    key_task = asyncio.ensure_future(keys.get())
+                    direction: Optional[int] = self.input_handler.get_direction(key)
+                    if direction is None and key in InputHandler.EXIT_KEYS:
+                        break
+                    if direction is not None and predictor.apply_local(direction):
+                        if not await self.communication.queue_move(direction):
+                            break
+                        self.render(predictor.display_state())
+        finally:
+            loop.remove_reader(sys.stdin.fileno())
+            stdscr.nodelay(False)
+            key_task.cancel()
+            reply_task.cancel()
+            await self.communication.close()
@@ -0,0 +1,114 @@
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+from game_backend.core import bit_backend
+
+
+class MovePredictor:
+    """
+    Client-side prediction of the board while moves are in flight.
+
+    The displayed board is the last authoritative server state with every unacknowledged move
+    slid and merged locally on top. Spawned tiles only ever come from the server: when a reply
+    arrives it replaces the authoritative state, and the remaining pending moves are replayed on
+    top of it. A reply that is not the predicted slide plus at most one spawned tile counts as a
+    misprediction, and the display rolls back to the server's board.
+    """
+    def __init__(self, state: Dict[str, Any]) -> None:
+        """
+        Initializes the MovePredictor.
+
+        Args:
+            state (Dict[str, Any]): The initial authoritative game state.
+        """
+        self.confirmed: Dict[str, Any] = state
+        self.size: int = state['grid']['size']
+        self.confirmed_board: int = bit_backend.encode_state(state['grid'])[0]
+        self.pending: Deque[int] = deque()
+        self.mispredictions: int = 0
+
+    def _predicted(self) -> Tuple[int, int]:
+        board = self.confirmed_board
+        score = self.confirmed['score']
+        for direction in self.pending:
+            board, gained = bit_backend.move(board, direction, self.size)
+            score += gained
+        return board, score
+
+    def apply_local(self, direction: int) -> bool:
+        """
+        Applies a move locally.
+
+        Returns:
+            bool: False if the move is known not to change the board and need not be sent.
+        """
+        if not self.pending:
+            board, _ = self._predicted()
+            if bit_backend.move(board, direction, self.size)[0] == board:
+                return False
+        self.pending.append(direction)
+        return True
+
+    def reconcile(self, reply: Dict[str, Any]) -> None:
+        """
+        Applies a server reply for the oldest pending move.
+
+        Args:
+            reply (Dict[str, Any]): The server's reply, either a game state or an error.
+        """
+        if 'error' in reply:
+            # The oldest pending move was rejected (e.g. rate limiting). The moves sent after it are still
+            # in flight and replay on the state the error carries, or on the last confirmed one.
+            if self.pending:
+                self.pending.popleft()
+            if 'state' in reply:
+                self.confirmed = reply['state']
+                self.confirmed_board = bit_backend.encode_state(reply['state']['grid'])[0]
+            return
+
+        board = bit_backend.encode_state(reply['grid'])[0]
+        if self.pending:
+            direction = self.pending.popleft()
+            expected, _ = bit_backend.move(self.confirmed_board, direction, self.size)
+            if not self._matches(expected, board):
+                # The remaining moves are still in flight; replaying them on the server's board is the rollback.
+                self.mispredictions += 1
+
+        self.confirmed = reply
+        self.confirmed_board = board
+
+    def resync(self) -> None:
+        """
+        Gives up on pending moves and falls back to the authoritative state.
+        """
+        self.pending.clear()
+
+    def _matches(self, expected: int, actual: int) -> bool:
+        """
+        Checks that `actual` is `expected` with at most one tile spawned in an empty cell.
+        """
+        differences = [
+            (e, a)
+            for e, a in zip(bit_backend.exponents(expected, self.size), bit_backend.exponents(actual, self.size))
+            if e != a
+        ]
+        if not differences:
+            return True
+        return len(differences) == 1 and differences[0][0] == 0 and differences[0][1] in (1, 2)
+
+    def display_state(self) -> Dict[str, Any]:
+        """
+        Returns the state to render: the authoritative state with pending moves applied.
+        """
+        if not self.pending:
+            return self.confirmed
+        board, score = self._predicted()
+        return {**self.confirmed, 'grid': bit_backend.decode_state(board, self.size), 'score': score}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self.pending)
+
+    @property
+    def over(self) -> bool:
+        return bool(self.confirmed.get('over', False))
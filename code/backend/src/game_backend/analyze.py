@@ -0,0 +1,273 @@
+"""
+Offline move-quality analysis of recorded games.
+
+Reads recorded games as JSON lines, in the format `game_backend.dataset` exports: the `boards`
+before each move (packed ints, hex strings or `values[x][y]` matrices) and the `moves` played.
+Every legal move of every position is scored with expectimax, and one JSON line is written per game:
+
+    {"line": 1, "id": ..., "moves": [{"played": 0, "best": 3, "loss": 0.041, "gap": 52.0, "blunder": false}, ...],
+     "accuracy": 93.2, "blunders": 2, "forced": 5}
+
+`gap` is the difference between the best and the played move's value, and `loss` is that gap as a
+fraction of the spread between the best and the worst legal move, so it lies in [0, 1] whatever the
+heuristic's scale. A blunder is a move whose loss reaches the threshold with a gap of at least
+`blunder_gap`, so picking the lesser of two near-equal moves is not flagged.
+Forced moves (a single legal move) have no loss and are left out of `accuracy`, which is
+`100 * (1 - mean loss)` over the other moves.
+
+Input and output are streamed, with a bounded number of chunks in flight across the worker
+processes, so memory stays flat on arbitrarily large logs. Each worker caches the values of the
+positions it has seen, keyed by their symmetry-canonical board, across games.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import multiprocessing.pool
+import os
+import sys
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from game_backend.core import bit_backend
+from game_backend.core.bit_backend.search import Expectimax
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BLUNDER_THRESHOLD = 0.5
+DEFAULT_BLUNDER_GAP = 1000.0  # Roughly two empty cells' worth of the search heuristic
+
+
+class MoveAnalyzer:
+    """
+    Scores played moves against the best move found by expectimax.
+    """
+    def __init__(
+        self,
+        size: int = 4,
+        depth: int = 2,
+        blunder_threshold: float = DEFAULT_BLUNDER_THRESHOLD,
+        blunder_gap: float = DEFAULT_BLUNDER_GAP,
+        cache_size: int = 1 << 18,
+    ) -> None:
+        """
+        Initializes the MoveAnalyzer.
+
+        Args:
+            size (int): Board size of the analyzed games.
+            depth (int): Expectimax depth, counting the move being scored.
+            blunder_threshold (float): Loss from which a move is flagged as a blunder.
+            blunder_gap (float): Smallest value gap flagged as a blunder.
+            cache_size (int): Positions whose move values are kept before the cache is cleared.
+        """
+        self.size = size
+        self.search = Expectimax(size=size, depth=depth)
+        self.blunder_threshold = blunder_threshold
+        self.blunder_gap = blunder_gap
+        self.cache_size = cache_size
+        self.positions: Dict[int, Dict[int, float]] = {}  # Canonical board -> values by canonical direction
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def move_values(self, board: int) -> Dict[int, float]:
+        """
+        Returns the expected value of every legal move of `board`, reusing symmetric positions.
+        """
+        key, transform = bit_backend.canonicalize(board, self.size)
+        values = self.positions.get(key)
+        if values is None:
+            self.misses += 1
+            values = self.search.move_values(key)
+            if len(self.positions) >= self.cache_size:
+                self.positions.clear()
+            self.positions[key] = values
+        else:
+            self.hits += 1
+        return {bit_backend.from_canonical_direction(direction, transform): value for direction, value in values.items()}
+
+    def analyze_move(self, board: int, played: int) -> Dict[str, Any]:
+        """
+        Scores one played move.
+
+        Raises:
+            ValueError: If the move is not legal on `board`.
+        """
+        values = self.move_values(board)
+        if played not in values:
+            raise ValueError(f"illegal move {played}")
+        best = max(values, key=values.get)
+        if len(values) == 1:
+            return {"played": played, "best": best, "loss": 0.0, "gap": 0.0, "blunder": False, "forced": True}
+        gap = values[best] - values[played]
+        spread = values[best] - min(values.values())
+        loss = gap / spread if spread > 0 else 0.0
+        blunder = loss >= self.blunder_threshold and gap >= self.blunder_gap
+        return {"played": played, "best": best, "loss": round(loss, 4), "gap": round(gap, 1), "blunder": blunder}
+
+    def analyze_game(self, game: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Scores every move of a recorded game.
+
+        Raises:
+            ValueError: If the game is malformed or plays an illegal move.
+        """
+        size = game.get("size", self.size)
+        if size != self.size:
+            raise ValueError(f"board size {size} does not match analyzer size {self.size}")
+        boards = [bit_backend.parse_board(board, size) for board in game["boards"]]
+        moves = game["moves"]
+        if len(boards) < len(moves):
+            raise ValueError("fewer boards than moves")
+
+        analyzed = []
+        for index, (board, played) in enumerate(zip(boards, moves)):
+            try:
+                analyzed.append(self.analyze_move(board, played))
+            except ValueError as e:
+                raise ValueError(f"move {index}: {e}") from None
+
+        scored = [move["loss"] for move in analyzed if "forced" not in move]
+        result: Dict[str, Any] = {"id": game["id"]} if "id" in game else {}
+        result.update(
+            moves=analyzed,
+            accuracy=round(100 * (1 - sum(scored) / len(scored)), 1) if scored else None,
+            blunders=sum(move["blunder"] for move in analyzed),
+            forced=len(analyzed) - len(scored),
+        )
+        return result
+
+
+def analyze_lines(analyzer: MoveAnalyzer, lines: Sequence[Tuple[int, str]]) -> List[str]:
+    """
+    Analyzes numbered JSON lines, returning one output line per valid game.
+    """
+    output = []
+    for line_number, line in lines:
+        try:
+            result = analyzer.analyze_game(json.loads(line))
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+            logger.error(f"Skipping invalid game on line {line_number}: {e}")
+            continue
+        output.append(json.dumps({"line": line_number, **result}) + "\n")
+    return output
+
+
+_worker_analyzer: Optional[MoveAnalyzer] = None
+
+
+def _init_worker(size: int, depth: int, blunder_threshold: float, blunder_gap: float, cache_size: int) -> None:
+    global _worker_analyzer
+    _worker_analyzer = MoveAnalyzer(size, depth, blunder_threshold, blunder_gap, cache_size)
+
+
+def _analyze_chunk(lines: Sequence[Tuple[int, str]]) -> List[str]:
+    return analyze_lines(_worker_analyzer, lines)
+
+
+def _chunks(lines: Iterable[str], chunk_size: int) -> Iterator[List[Tuple[int, str]]]:
+    chunk: List[Tuple[int, str]] = []
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        chunk.append((line_number, line))
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def analyze_stream(
+    lines: Iterable[str],
+    output: TextIO,
+    size: int = 4,
+    depth: int = 2,
+    blunder_threshold: float = DEFAULT_BLUNDER_THRESHOLD,
+    blunder_gap: float = DEFAULT_BLUNDER_GAP,
+    cache_size: int = 1 << 18,
+    workers: Optional[int] = None,
+    chunk_size: int = 16,
+) -> int:
+    """
+    Analyzes a stream of recorded games, writing results in input order.
+
+    Args:
+        lines (Iterable[str]): JSON lines of recorded games.
+        output (TextIO): Where the JSON lines of results are written.
+        size (int): Board size of the games.
+        depth (int): Expectimax depth.
+        blunder_threshold (float): Loss from which a move is flagged as a blunder.
+        blunder_gap (float): Smallest value gap flagged as a blunder.
+        cache_size (int): Positions cached per process.
+        workers (Optional[int]): Worker processes; 0 analyzes in this process. Defaults to the CPU count.
+        chunk_size (int): Games per task sent to a worker.
+
+    Returns:
+        int: Number of games analyzed.
+    """
+    games = 0
+    start = time.perf_counter()
+    chunks = _chunks(lines, chunk_size)
+
+    if workers == 0:
+        analyzer = MoveAnalyzer(size, depth, blunder_threshold, blunder_gap, cache_size)
+        for chunk in chunks:
+            results = analyze_lines(analyzer, chunk)
+            output.writelines(results)
+            games += len(results)
+        logger.info(f"Position cache: {analyzer.hits} hits, {analyzer.misses} misses.")
+    else:
+        # Pool.imap would read the whole input ahead of the workers; a window of pending chunks keeps it bounded
+        initargs = (size, depth, blunder_threshold, blunder_gap, cache_size)
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=initargs) as pool:
+            max_in_flight = 2 * (workers or os.cpu_count() or 1)
+            pending: Deque[multiprocessing.pool.AsyncResult] = deque()
+            for chunk in chunks:
+                pending.append(pool.apply_async(_analyze_chunk, (chunk,)))
+                while pending and (len(pending) >= max_in_flight or pending[0].ready()):
+                    results = pending.popleft().get()
+                    output.writelines(results)
+                    games += len(results)
+            for result in pending:
+                results = result.get()
+                output.writelines(results)
+                games += len(results)
+
+    logger.info(f"Analyzed {games} games in {time.perf_counter() - start:.1f}s.")
+    return games
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m game_backend.analyze",
+        description="Score every move of recorded games (JSON lines) against expectimax.",
+    )
+    parser.add_argument("games", help="JSON lines file of recorded games, or - for stdin.")
+    parser.add_argument("-o", "--output", default="-", help="Output JSON lines file, or - for stdout.")
+    parser.add_argument("--size", type=int, default=4, help="Board size.")
+    parser.add_argument("--depth", type=int, default=2, help="Expectimax depth.")
+    parser.add_argument("--blunder", type=float, default=DEFAULT_BLUNDER_THRESHOLD, help="Loss (0-1) flagged as a blunder.")
+    parser.add_argument("--blunder-gap", type=float, default=DEFAULT_BLUNDER_GAP, help="Smallest value gap flagged as a blunder.")
+    parser.add_argument("--cache-size", type=int, default=1 << 18, help="Positions cached per process.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count, 0: none).")
+    parser.add_argument("--chunk-size", type=int, default=16, help="Games per task sent to a worker.")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    source = sys.stdin if args.games == "-" else open(args.games)
+    destination = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        analyze_stream(
+            source, destination, size=args.size, depth=args.depth, blunder_threshold=args.blunder,
+            blunder_gap=args.blunder_gap, cache_size=args.cache_size, workers=args.workers, chunk_size=args.chunk_size,
+        )
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if destination is not sys.stdout:
+            destination.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+import argparse
+import copy
+import json
+import logging
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from game_backend.core.array_backend import ArrayGrid, ArrayTile
+from game_backend.services import GameManager, LocalStorageManager
+
+logger = logging.getLogger(__name__)
+
+DIRECTION_NAMES = ("up", "right", "down", "left")
+
+
+class Benchmark:
+    """
+    One timed operation.
+
+    Without `setup`, `op` is called in a tight loop and must be safe to repeat. With `setup`, a fresh
+    argument is built for every call and only `op(argument)` is timed, for operations that mutate
+    their input (such as a move).
+    """
+    def __init__(self, name: str, op: Callable[..., Any], setup: Optional[Callable[[], Any]] = None) -> None:
+        self.name = name
+        self.op = op
+        self.setup = setup
+
+    def _time_loop(self, number: int) -> float:
+        op = self.op
+        start = time.perf_counter()
+        for _ in range(number):
+            op()
+        return time.perf_counter() - start
+
+    def _time_calls(self, number: int) -> float:
+        op, setup = self.op, self.setup
+        clock = time.perf_counter
+        elapsed = 0.0
+        for _ in range(number):
+            argument = setup()
+            start = clock()
+            op(argument)
+            elapsed += clock() - start
+        return elapsed
+
+    def run(self, repeat: int = 5, min_time: float = 0.1) -> Dict[str, Any]:
+        """
+        Times the operation.
+
+        The iteration count is calibrated so one repeat takes at least `min_time` seconds, then the
+        operation is timed `repeat` times.
+
+        Returns:
+            Dict[str, Any]: Median and best time per operation in nanoseconds, and the iteration counts.
+        """
+        timer = self._time_calls if self.setup else self._time_loop
+        number = 1
+        while True:
+            elapsed = timer(number)
+            if elapsed >= min_time or number >= 1 << 24:
+                break
+            number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.1))
+        per_op = [timer(number) / number * 1e9 for _ in range(repeat)]
+        return {
+            'ns_per_op': round(statistics.median(per_op), 1),
+            'best_ns_per_op': round(min(per_op), 1),
+            'number': number,
+            'repeat': repeat,
+        }
+
+
+def _midgame_manager(storage_file: str, moves: int = 60, seed: int = 2048) -> GameManager:
+    """
+    Plays a deterministic random game for `moves` moves, to benchmark on a realistically filled board.
+    """
+    random.seed(seed)
+    game_manager = GameManager(grid=ArrayGrid(size=4), tile_class=ArrayTile, storage_manager=LocalStorageManager(storage_file))
+    for turn in range(moves):
+        game_manager.play_turn(random.choice((0, 1, 2, 3)) if turn % 3 else 3)
+        if game_manager.over:
+            break
+    return game_manager
+
+
+def build_benchmarks(workdir: str) -> List[Benchmark]:
+    """
+    Builds the benchmark suite, with any storage files created in `workdir`.
+    """
+    storage_file = str(Path(workdir) / "bench_storage.json")
+    game_manager = _midgame_manager(storage_file)
+    grid = game_manager.grid
+    storage = game_manager.storage_manager
+    state_json = json.dumps(game_manager.serialize())
+    scratch_grid = copy.deepcopy(grid)
+    tile = ArrayTile((1, 2), 8)
+
+    def fresh_manager() -> GameManager:
+        clone = copy.copy(game_manager)
+        clone.grid = copy.deepcopy(grid)
+        return clone
+
+    def cold_state_json() -> str:
+        game_manager.invalidate_state()
+        return game_manager.get_state_json()
+
+    benchmarks = [
+        Benchmark("grid.cell_content", lambda: grid.cell_content((2, 1))),
+        Benchmark("grid._available_cells", grid._available_cells),
+        Benchmark("grid.insert_tile", lambda: scratch_grid.insert_tile(tile)),
+        Benchmark("grid.serialize", grid.serialize),
+        Benchmark("game.tile_matches_available", game_manager.tile_matches_available),
+        Benchmark("game.moves_available", game_manager.moves_available),
+        Benchmark("storage.set_best_score", lambda: storage.set_best_score(1024)),
+        Benchmark("storage.set_game_state_json", lambda: storage.set_game_state_json(state_json)),
+        Benchmark("storage._save_storage", storage._save_storage),
+        Benchmark("json.encode_state", lambda: json.dumps(game_manager.serialize())),
+        Benchmark("game.get_state_json.cold", cold_state_json),
+        Benchmark("game.get_state_json.cached", game_manager.get_state_json),
+    ]
+    for direction, name in enumerate(DIRECTION_NAMES):
+        benchmarks.append(
+            Benchmark(f"game._move.{name}", lambda manager, direction=direction: manager._move(direction), setup=fresh_manager)
+        )
+    return benchmarks
+
+
+def run_suite(name_filter: Optional[str] = None, repeat: int = 5, min_time: float = 0.1) -> Dict[str, Any]:
+    """
+    Runs the benchmark suite.
+
+    Args:
+        name_filter (Optional[str]): Only run benchmarks whose name contains this substring.
+        repeat (int): Timed repeats per benchmark.
+        min_time (float): Minimum seconds per repeat.
+
+    Returns:
+        Dict[str, Any]: The report, with machine metadata and a result per benchmark.
+    """
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for benchmark in build_benchmarks(workdir):
+            if name_filter and name_filter not in benchmark.name:
+                continue
+            results[benchmark.name] = benchmark.run(repeat=repeat, min_time=min_time)
+            logger.info(f"{benchmark.name}: {results[benchmark.name]['ns_per_op']:.1f} ns/op")
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        'results': results,
+    }
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float = 0.15) -> List[Dict[str, Any]]:
+    """
+    Compares two reports benchmark by benchmark, on the best repeat, which is the least sensitive to noise.
+
+    Args:
+        baseline (Dict[str, Any]): The stored baseline report.
+        current (Dict[str, Any]): The new report.
+        tolerance (float): Allowed relative slowdown, e.g. 0.15 for 15%.
+
+    Returns:
+        List[Dict[str, Any]]: One row per benchmark present in both reports, with its ratio and status
+        ("regression", "improvement" or "ok").
+    """
+    rows = []
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        ratio = result['best_ns_per_op'] / base['best_ns_per_op'] if base['best_ns_per_op'] else float('inf')
+        if ratio > 1 + tolerance:
+            status = "regression"
+        elif ratio < 1 / (1 + tolerance):
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append({
+            'name': name,
+            'baseline_ns': base['best_ns_per_op'],
+            'current_ns': result['best_ns_per_op'],
+            'ratio': round(ratio, 3),
+            'status': status,
+        })
+    return rows
+
+
+def _print_results(report: Dict[str, Any]) -> None:
+    for name, result in report['results'].items():
+        print(f"{name:<34} {result['ns_per_op']:>14,.1f} ns/op")
+
+
+def _print_comparison(rows: Sequence[Dict[str, Any]]) -> None:
+    print(f"{'benchmark':<34} {'baseline ns':>14} {'current ns':>14} {'ratio':>7}  status")
+    for row in rows:
+        print(
+            f"{row['name']:<34} {row['baseline_ns']:>14,.1f} {row['current_ns']:>14,.1f} "
+            f"{row['ratio']:>7.3f}  {row['status']}"
+        )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m game_backend.bench",
+        description="Microbenchmarks for the game engine, with stored baselines.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_run_options(command: argparse.ArgumentParser) -> None:
+        command.add_argument("--filter", default=None, help="Only run benchmarks whose name contains this.")
+        command.add_argument("--repeat", type=int, default=5, help="Timed repeats per benchmark.")
+        command.add_argument("--min-time", type=float, default=0.1, help="Minimum seconds per repeat.")
+        command.add_argument("--with-logging", action="store_true", help="Keep the engine's debug logging on while timing.")
+
+    run = commands.add_parser("run", help="Run the suite and optionally record the results as a baseline.")
+    add_run_options(run)
+    run.add_argument("--output", default=None, help="Write the report (e.g. a baseline) to this JSON file.")
+
+    compare = commands.add_parser("compare", help="Compare against a baseline; exits with 1 on regressions.")
+    add_run_options(compare)
+    compare.add_argument("baseline", help="Baseline JSON file written by `run --output`.")
+    compare.add_argument("--current", default=None, help="Compare this report instead of running the suite.")
+    compare.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative slowdown (0.15 = 15%%).")
+    compare.add_argument("--output", default=None, help="Also write the new report to this JSON file.")
+
+    commands.add_parser("list", help="List benchmark names.")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command != "list" and not args.with_logging:
+        # The engine logs every tile move at DEBUG; that I/O would dominate the timings
+        logging.disable(logging.CRITICAL)
+
+    if args.command == "list":
+        logging.disable(logging.CRITICAL)
+        with tempfile.TemporaryDirectory() as workdir:
+            for benchmark in build_benchmarks(workdir):
+                print(benchmark.name)
+        return 0
+
+    if args.command == "compare" and args.current:
+        current = json.loads(Path(args.current).read_text())
+    else:
+        current = run_suite(args.filter, repeat=args.repeat, min_time=args.min_time)
+    if args.output:
+        Path(args.output).write_text(json.dumps(current, indent=2) + "\n")
+
+    if args.command == "run":
+        _print_results(current)
+        return 0
+
+    baseline = json.loads(Path(args.baseline).read_text())
+    rows = compare_reports(baseline, current, tolerance=args.tolerance)
+    _print_comparison(rows)
+    regressions = [row['name'] for row in rows if row['status'] == "regression"]
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
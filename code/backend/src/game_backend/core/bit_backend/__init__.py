@@ -0,0 +1,33 @@
+from .board import (
+    DIRECTIONS,
+    MAX_EXPONENT,
+    WIN_EXPONENT,
+    can_move,
+    count_empty,
+    decode_state,
+    decode_values,
+    empty_cells,
+    encode_grid,
+    encode_state,
+    encode_values,
+    exponent_of,
+    exponents,
+    from_exponents,
+    get_exponent,
+    legal_moves,
+    max_exponent,
+    max_tile,
+    move,
+    parse_board,
+    set_exponent,
+)
+from .symmetry import (
+    INVERSE,
+    TRANSFORMS,
+    apply_transform,
+    canonical_key,
+    canonicalize,
+    from_canonical_direction,
+    to_canonical_direction,
+    transform_cell,
+)
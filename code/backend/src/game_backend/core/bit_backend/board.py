@@ -0,0 +1,326 @@
+"""
+Packed board encoding for 2048.
+
+A board is a single int holding one 4-bit exponent per cell (0 = empty, 1 = 2, 2 = 4, ... 11 = 2048).
+Cell (x, y), in the same coordinates as `ArrayGrid.cells[x][y]`, lives at nibble `y * size + x`,
+so a 4x4 board fits in 64 bits. Moves follow `GameManager._move`: direction 0 moves tiles up
+(towards y = 0), 1 right, 2 down and 3 left, and each tile merges at most once per move.
+"""
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+MAX_EXPONENT = 15
+WIN_EXPONENT = 11  # 2048
+DIRECTIONS = (0, 1, 2, 3)
+
+# Lines up to this length get a precomputed lookup table (16^4 = 65536 entries for a 4x4 board)
+_TABLE_MAX_LINE = 4
+
+
+def exponent_of(value: int) -> int:
+    """
+    Converts a tile value to its exponent.
+
+    Raises:
+        ValueError: If the value is not a power of two that fits in a cell.
+    """
+    exponent = value.bit_length() - 1
+    if value <= 1 or value != 1 << exponent or exponent > MAX_EXPONENT:
+        raise ValueError(f"Tile value {value} cannot be packed")
+    return exponent
+
+
+def cell_shift(x: int, y: int, size: int = 4) -> int:
+    return 4 * (y * size + x)
+
+
+def get_exponent(board: int, x: int, y: int, size: int = 4) -> int:
+    return (board >> cell_shift(x, y, size)) & 0xF
+
+
+def set_exponent(board: int, x: int, y: int, exponent: int, size: int = 4) -> int:
+    shift = cell_shift(x, y, size)
+    return (board & ~(0xF << shift)) | (exponent << shift)
+
+
+def encode_values(values: Sequence[Sequence[Optional[int]]], size: int = 4) -> int:
+    """
+    Packs a `values[x][y]` matrix of tile values (None or 0 for empty cells).
+    """
+    board = 0
+    for x in range(size):
+        for y in range(size):
+            value = values[x][y]
+            if value:
+                board |= exponent_of(value) << cell_shift(x, y, size)
+    return board
+
+
+def parse_board(board: Union[int, str, Sequence[Sequence[Optional[int]]]], size: int = 4) -> int:
+    """
+    Reads a board as recorded in JSON: a packed int, a hex string or a `values[x][y]` matrix.
+    """
+    if isinstance(board, int):
+        return board
+    if isinstance(board, str):
+        return int(board, 16)
+    return encode_values(board, size)
+
+
+def encode_grid(grid) -> int:
+    """
+    Packs an `ArrayGrid` (or any grid exposing `size` and `cells[x][y]` tiles).
+    """
+    return encode_values(
+        [[tile.value if tile else None for tile in column] for column in grid.cells], grid.size
+    )
+
+
+def encode_state(grid_state: Dict[str, Any]) -> Tuple[int, int]:
+    """
+    Packs a serialized grid, as produced by `ArrayGrid.serialize()`.
+
+    Returns:
+        Tuple[int, int]: The packed board and its size.
+    """
+    size = grid_state['size']
+    return encode_values(
+        [[cell['value'] if cell else None for cell in column] for column in grid_state['cells']], size
+    ), size
+
+
+def decode_values(board: int, size: int = 4) -> List[List[Optional[int]]]:
+    """
+    Unpacks a board into a `values[x][y]` matrix with None for empty cells.
+    """
+    return [
+        [1 << e if (e := get_exponent(board, x, y, size)) else None for y in range(size)]
+        for x in range(size)
+    ]
+
+
+def decode_state(board: int, size: int = 4) -> Dict[str, Any]:
+    """
+    Unpacks a board into the same shape as `ArrayGrid.serialize()`.
+    """
+    return {
+        'size': size,
+        'cells': [
+            [
+                {'position': [x, y], 'value': 1 << e} if (e := get_exponent(board, x, y, size)) else None
+                for y in range(size)
+            ]
+            for x in range(size)
+        ],
+    }
+
+
+def exponents(board: int, size: int = 4) -> List[int]:
+    """
+    Lists the exponents of all cells in nibble order (row by row).
+    """
+    return [(board >> (4 * i)) & 0xF for i in range(size * size)]
+
+
+def from_exponents(cell_exponents: Sequence[int]) -> int:
+    board = 0
+    for i, exponent in enumerate(cell_exponents):
+        board |= exponent << (4 * i)
+    return board
+
+
+def empty_cells(board: int, size: int = 4) -> List[Tuple[int, int]]:
+    """
+    Lists empty cells in the same order as `ArrayGrid._available_cells()` (x-major),
+    so the same random draw picks the same cell.
+    """
+    return [(x, y) for x in range(size) for y in range(size) if not (board >> (4 * (y * size + x))) & 0xF]
+
+
+def count_empty(board: int, size: int = 4) -> int:
+    return sum(1 for i in range(size * size) if not (board >> (4 * i)) & 0xF)
+
+
+def max_exponent(board: int, size: int = 4) -> int:
+    return max(exponents(board, size))
+
+
+def max_tile(board: int, size: int = 4) -> int:
+    exponent = max_exponent(board, size)
+    return 1 << exponent if exponent else 0
+
+
+def _slide_line(line: Tuple[int, ...]) -> Tuple[Tuple[int, ...], int]:
+    """
+    Slides one line of exponents towards index 0, merging equal neighbours once.
+
+    Returns:
+        Tuple[Tuple[int, ...], int]: The new line and the score gained.
+    """
+    tiles = [e for e in line if e]
+    result: List[int] = []
+    score = 0
+    i = 0
+    while i < len(tiles):
+        # 15 + 15 would not fit in a nibble; such tiles are left unmerged
+        if i + 1 < len(tiles) and tiles[i] == tiles[i + 1] and tiles[i] < MAX_EXPONENT:
+            merged = tiles[i] + 1
+            result.append(merged)
+            score += 1 << merged
+            i += 2
+        else:
+            result.append(tiles[i])
+            i += 1
+    result.extend([0] * (len(line) - len(result)))
+    return tuple(result), score
+
+
+def _pack_line(line: Sequence[int]) -> int:
+    packed = 0
+    for i, exponent in enumerate(line):
+        packed |= exponent << (4 * i)
+    return packed
+
+
+@lru_cache(maxsize=None)
+def _line_table(length: int) -> Tuple[List[int], List[int]]:
+    """
+    Precomputes the slid line and score for every packed line of the given length.
+    """
+    results = [0] * (16 ** length)
+    scores = [0] * (16 ** length)
+    for packed in range(16 ** length):
+        line = tuple((packed >> (4 * i)) & 0xF for i in range(length))
+        slid, score = _slide_line(line)
+        results[packed] = _pack_line(slid)
+        scores[packed] = score
+    return results, scores
+
+
+@lru_cache(maxsize=None)
+def _slide_packed_line(packed: int, length: int) -> Tuple[int, int]:
+    line = tuple((packed >> (4 * i)) & 0xF for i in range(length))
+    slid, score = _slide_line(line)
+    return _pack_line(slid), score
+
+
+@lru_cache(maxsize=None)
+def line_shifts(size: int, direction: int) -> Tuple[Tuple[int, ...], ...]:
+    """
+    Bit shifts of the cells of each line, ordered from the edge tiles move towards.
+    """
+    lines = []
+    for i in range(size):
+        if direction == 0:    # Up: towards y = 0
+            cells = [(i, y) for y in range(size)]
+        elif direction == 2:  # Down
+            cells = [(i, y) for y in reversed(range(size))]
+        elif direction == 3:  # Left: towards x = 0
+            cells = [(x, i) for x in range(size)]
+        elif direction == 1:  # Right
+            cells = [(x, i) for x in reversed(range(size))]
+        else:
+            raise ValueError(f"Invalid direction: {direction}")
+        lines.append(tuple(cell_shift(x, y, size) for x, y in cells))
+    return tuple(lines)
+
+
+# 4x4 fast path: every 16-bit row with its nibbles reversed
+_REVERSED_ROW: List[int] = [
+    ((row & 0xF) << 12) | ((row & 0xF0) << 4) | ((row & 0xF00) >> 4) | (row >> 12)
+    for row in range(1 << 16)
+]
+
+
+def _transpose_4(board: int) -> int:
+    """
+    Swaps x and y on a 4x4 board with nibble masks.
+    """
+    a = (
+        (board & 0xF0F00F0FF0F00F0F)
+        | ((board & 0x0000F0F00000F0F0) << 12)
+        | ((board & 0x0F0F00000F0F0000) >> 12)
+    )
+    return (
+        (a & 0xFF00FF0000FF00FF)
+        | ((a & 0x00FF00FF00000000) >> 24)
+        | ((a & 0x00000000FF00FF00) << 24)
+    )
+
+
+@lru_cache(maxsize=None)
+def _row_tables_4() -> Tuple[Tuple[List[int], List[int]], Tuple[List[int], List[int]]]:
+    """
+    Slid rows and scores of a 4x4 board indexed by the packed 16-bit row, for left and right moves.
+    """
+    left, left_scores = _line_table(4)
+    reverse = _REVERSED_ROW
+    right = [reverse[left[reverse[row]]] for row in range(1 << 16)]
+    right_scores = [left_scores[reverse[row]] for row in range(1 << 16)]
+    return (left, left_scores), (right, right_scores)
+
+
+def _move_4(board: int, direction: int) -> Tuple[int, int]:
+    # Rows are contiguous 16-bit words; vertical moves slide the rows of the transposed board
+    left, right = _row_tables_4()
+    vertical = direction == 0 or direction == 2
+    if vertical:
+        board = _transpose_4(board)
+    rows, scores = left if direction == 0 or direction == 3 else right
+    r0, r1, r2, r3 = board & 0xFFFF, (board >> 16) & 0xFFFF, (board >> 32) & 0xFFFF, board >> 48
+    new_board = rows[r0] | rows[r1] << 16 | rows[r2] << 32 | rows[r3] << 48
+    gained = scores[r0] + scores[r1] + scores[r2] + scores[r3]
+    if vertical:
+        new_board = _transpose_4(new_board)
+    return new_board, gained
+
+
+def move(board: int, direction: int, size: int = 4) -> Tuple[int, int]:
+    """
+    Applies a move without spawning a tile.
+
+    Args:
+        board (int): The packed board.
+        direction (int): Direction of the move (0: up, 1: right, 2: down, 3: left).
+        size (int): Board size.
+
+    Returns:
+        Tuple[int, int]: The new board and the score gained. The board is unchanged if the move is illegal.
+    """
+    if size == 4 and 0 <= direction <= 3:
+        return _move_4(board, direction)
+    if size <= _TABLE_MAX_LINE:
+        table, scores = _line_table(size)
+    else:
+        table = scores = None
+
+    new_board = 0
+    gained = 0
+    for shifts in line_shifts(size, direction):
+        packed = 0
+        for i, shift in enumerate(shifts):
+            packed |= ((board >> shift) & 0xF) << (4 * i)
+        if table is not None:
+            slid, score = table[packed], scores[packed]
+        else:
+            slid, score = _slide_packed_line(packed, size)
+        gained += score
+        for i, shift in enumerate(shifts):
+            new_board |= ((slid >> (4 * i)) & 0xF) << shift
+    return new_board, gained
+
+
+def legal_moves(board: int, size: int = 4) -> List[int]:
+    """
+    Lists the directions that change the board.
+    """
+    return [direction for direction in DIRECTIONS if move(board, direction, size)[0] != board]
+
+
+def can_move(board: int, size: int = 4) -> bool:
+    """
+    Equivalent of `GameManager.moves_available()`.
+    """
+    if count_empty(board, size):
+        return True
+    return any(move(board, direction, size)[0] != board for direction in DIRECTIONS)
@@ -0,0 +1,171 @@
+"""
+Expectimax search on packed boards.
+
+Positions are scored with a per-line heuristic (empty cells, available merges, monotonicity and a
+penalty on large tiles spread out), summed over every row and column; 4x4 boards look lines up in a
+precomputed table. The search alternates max nodes over the legal moves with chance nodes over
+every tile spawn (a 2 with probability 0.9, a 4 with 0.1), and prunes branches whose probability
+falls below a threshold.
+"""
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from .board import DIRECTIONS, cell_shift, line_shifts, move
+
+LOST_PENALTY = 200000.0
+MONOTONICITY_POWER = 4.0
+MONOTONICITY_WEIGHT = 47.0
+SUM_POWER = 3.5
+SUM_WEIGHT = 11.0
+MERGES_WEIGHT = 700.0
+EMPTY_WEIGHT = 270.0
+
+SPAWNS = ((1, 0.9), (2, 0.1))
+
+
+def line_heuristic(line: Tuple[int, ...]) -> float:
+    """
+    Scores one row or column of exponents.
+    """
+    total = 0.0
+    empty = 0
+    merges = 0
+    previous = 0
+    counter = 0
+    for rank in line:
+        total += rank ** SUM_POWER
+        if rank == 0:
+            empty += 1
+        else:
+            if previous == rank:
+                counter += 1
+            elif counter > 0:
+                merges += 1 + counter
+                counter = 0
+            previous = rank
+    if counter > 0:
+        merges += 1 + counter
+
+    decreasing = increasing = 0.0
+    for i in range(1, len(line)):
+        if line[i - 1] > line[i]:
+            decreasing += line[i - 1] ** MONOTONICITY_POWER - line[i] ** MONOTONICITY_POWER
+        else:
+            increasing += line[i] ** MONOTONICITY_POWER - line[i - 1] ** MONOTONICITY_POWER
+
+    return (
+        LOST_PENALTY
+        + EMPTY_WEIGHT * empty
+        + MERGES_WEIGHT * merges
+        - MONOTONICITY_WEIGHT * min(decreasing, increasing)
+        - SUM_WEIGHT * total
+    )
+
+
+@lru_cache(maxsize=None)
+def _heuristic_table(length: int) -> List[float]:
+    return [
+        line_heuristic(tuple((packed >> (4 * i)) & 0xF for i in range(length)))
+        for packed in range(16 ** length)
+    ]
+
+
+@lru_cache(maxsize=1 << 16)
+def _packed_line_heuristic(packed: int, length: int) -> float:
+    return line_heuristic(tuple((packed >> (4 * i)) & 0xF for i in range(length)))
+
+
+def heuristic(board: int, size: int = 4) -> float:
+    """
+    Scores a board: the sum of the line heuristic over all rows and columns.
+    """
+    table = _heuristic_table(size) if size <= 4 else None
+    total = 0.0
+    for direction in (0, 3):  # Columns, then rows
+        for shifts in line_shifts(size, direction):
+            packed = 0
+            for i, shift in enumerate(shifts):
+                packed |= ((board >> shift) & 0xF) << (4 * i)
+            total += table[packed] if table is not None else _packed_line_heuristic(packed, size)
+    return total
+
+
+class Expectimax:
+    """
+    Depth-limited expectimax with a transposition cache shared across searches.
+
+    Cached chance-node values are keyed by board and remaining depth only, not by the probability of
+    the branch that computed them. A value computed on a likely branch is reused on an unlikely one
+    (and vice versa) regardless of the `min_probability` cutoff, so with a warm cache a result can
+    depend on which positions were searched before. Clear `cache` between searches that must be
+    reproducible on their own.
+    """
+    def __init__(self, size: int = 4, depth: int = 2, min_probability: float = 1e-4, cache_size: int = 1 << 20) -> None:
+        """
+        Initializes the Expectimax search.
+
+        Args:
+            size (int): Board size.
+            depth (int): Moves searched ahead, counting the move being chosen.
+            min_probability (float): Chance branches less likely than this are scored by the heuristic.
+            cache_size (int): Cached chance-node values kept before the cache is cleared.
+        """
+        self.size = size
+        self.depth = depth
+        self.min_probability = min_probability
+        self.cache_size = cache_size
+        self.cache: Dict[Tuple[int, int], float] = {}
+        self._cells = [cell_shift(x, y, size) for x in range(size) for y in range(size)]
+
+    def _max_node(self, board: int, depth: int, probability: float) -> float:
+        best = 0.0  # No legal move: the game is lost
+        for direction in DIRECTIONS:
+            new_board, _ = move(board, direction, self.size)
+            if new_board != board:
+                best = max(best, self._chance_node(new_board, depth - 1, probability))
+        return best
+
+    def _chance_node(self, board: int, depth: int, probability: float) -> float:
+        if depth <= 0 or probability < self.min_probability:
+            return heuristic(board, self.size)
+        key = (board, depth)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        empty = [shift for shift in self._cells if not (board >> shift) & 0xF]
+        if not empty:
+            return heuristic(board, self.size)
+        total = 0.0
+        for shift in empty:
+            for exponent, spawn_probability in SPAWNS:
+                total += spawn_probability * self._max_node(
+                    board | (exponent << shift), depth, probability * spawn_probability / len(empty)
+                )
+        value = total / len(empty)
+
+        if len(self.cache) >= self.cache_size:
+            self.cache.clear()
+        self.cache[key] = value
+        return value
+
+    def move_values(self, board: int) -> Dict[int, float]:
+        """
+        Returns the expected value of every legal move.
+        """
+        values = {}
+        for direction in DIRECTIONS:
+            new_board, _ = move(board, direction, self.size)
+            if new_board != board:
+                values[direction] = self._chance_node(new_board, self.depth - 1, 1.0)
+        return values
+
+    def best_move(self, board: int) -> Tuple[Optional[int], float]:
+        """
+        Returns the best move and its value, or (None, 0.0) if no move is legal.
+        """
+        values = self.move_values(board)
+        if not values:
+            return None, 0.0
+        direction = max(values, key=values.get)
+        return direction, values[direction]
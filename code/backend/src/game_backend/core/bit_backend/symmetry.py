@@ -0,0 +1,171 @@
+"""
+Dihedral symmetries of packed boards.
+
+A board and its 8 rotations/reflections play identically, so caches and datasets can key them by
+one canonical representative. A transform `t` in 0..7 is applied as: transpose if `t & 4`, then
+mirror x if `t & 1`, then mirror y if `t & 2`. 4x4 boards use a row-reversal lookup table and a
+bitwise nibble transpose; other sizes use precomputed cell permutations.
+"""
+from functools import lru_cache
+from typing import Tuple, Union
+
+from .board import _REVERSED_ROW, _transpose_4, encode_grid
+
+TRANSFORMS = tuple(range(8))
+IDENTITY = 0
+
+# Direction vectors, as in GameManager.get_vector: 0 up, 1 right, 2 down, 3 left
+_VECTORS = {0: (0, -1), 1: (1, 0), 2: (0, 1), 3: (-1, 0)}
+_DIRECTIONS = {vector: direction for direction, vector in _VECTORS.items()}
+
+
+def transform_cell(x: int, y: int, transform: int, size: int = 4) -> Tuple[int, int]:
+    """
+    Maps a cell to its position on the transformed board.
+    """
+    if transform & 4:
+        x, y = y, x
+    if transform & 1:
+        x = size - 1 - x
+    if transform & 2:
+        y = size - 1 - y
+    return x, y
+
+
+def _transform_vector(dx: int, dy: int, transform: int) -> Tuple[int, int]:
+    if transform & 4:
+        dx, dy = dy, dx
+    if transform & 1:
+        dx = -dx
+    if transform & 2:
+        dy = -dy
+    return dx, dy
+
+
+@lru_cache(maxsize=None)
+def _cell_maps(size: int) -> Tuple[Tuple[int, ...], ...]:
+    """
+    For each transform, the destination nibble index of every source nibble.
+    """
+    maps = []
+    for transform in TRANSFORMS:
+        destinations = [0] * (size * size)
+        for y in range(size):
+            for x in range(size):
+                tx, ty = transform_cell(x, y, transform, size)
+                destinations[y * size + x] = ty * size + tx
+        maps.append(tuple(destinations))
+    return tuple(maps)
+
+
+def _compose(first: int, second: int) -> int:
+    """
+    Returns the transform equivalent to applying `first` then `second`.
+    """
+    size = 3  # Any size > 1 with a non-symmetric probe cell identifies the transform
+    probe = [(0, 1), (2, 0)]
+    mapped = [transform_cell(*transform_cell(x, y, first, size), second, size) for x, y in probe]
+    for candidate in TRANSFORMS:
+        if [transform_cell(x, y, candidate, size) for x, y in probe] == mapped:
+            return candidate
+    raise AssertionError("Dihedral transforms are closed under composition")
+
+
+INVERSE = tuple(
+    next(candidate for candidate in TRANSFORMS if _compose(transform, candidate) == IDENTITY)
+    for transform in TRANSFORMS
+)
+
+# Move direction on the transformed board, indexed [transform][direction]
+DIRECTION_MAP = tuple(
+    tuple(_DIRECTIONS[_transform_vector(*_VECTORS[direction], transform)] for direction in range(4))
+    for transform in TRANSFORMS
+)
+
+def _mirror_x_4(board: int) -> int:
+    reversed_row = _REVERSED_ROW
+    return (
+        reversed_row[board & 0xFFFF]
+        | reversed_row[(board >> 16) & 0xFFFF] << 16
+        | reversed_row[(board >> 32) & 0xFFFF] << 32
+        | reversed_row[(board >> 48) & 0xFFFF] << 48
+    )
+
+
+def _mirror_y_4(board: int) -> int:
+    return (
+        (board & 0xFFFF) << 48
+        | ((board >> 16) & 0xFFFF) << 32
+        | ((board >> 32) & 0xFFFF) << 16
+        | (board >> 48) & 0xFFFF
+    )
+
+
+def apply_transform(board: int, transform: int, size: int = 4) -> int:
+    """
+    Applies a dihedral transform to a packed board.
+    """
+    if size == 4:
+        if transform & 4:
+            board = _transpose_4(board)
+        if transform & 1:
+            board = _mirror_x_4(board)
+        if transform & 2:
+            board = _mirror_y_4(board)
+        return board
+
+    destinations = _cell_maps(size)[transform]
+    result = 0
+    for index, destination in enumerate(destinations):
+        result |= ((board >> (4 * index)) & 0xF) << (4 * destination)
+    return result
+
+
+def canonicalize(board: Union[int, object], size: int = 4) -> Tuple[int, int]:
+    """
+    Maps a board to its canonical representative: the smallest packed value among its 8 symmetries.
+
+    Args:
+        board (Union[int, ArrayGrid]): A packed board, or a grid to pack.
+        size (int): Board size, ignored for grids.
+
+    Returns:
+        Tuple[int, int]: The canonical board and the transform that maps `board` onto it.
+    """
+    if not isinstance(board, int):
+        size = board.size
+        board = encode_grid(board)
+
+    if size == 4:
+        # Listed in transform order, sharing the transpose between the last four
+        t = _transpose_4(board)
+        candidates = (
+            board, _mirror_x_4(board), _mirror_y_4(board), _mirror_y_4(_mirror_x_4(board)),
+            t, _mirror_x_4(t), _mirror_y_4(t), _mirror_y_4(_mirror_x_4(t)),
+        )
+    else:
+        candidates = tuple(apply_transform(board, transform, size) for transform in TRANSFORMS)
+
+    best = min(candidates)
+    return best, candidates.index(best)
+
+
+def canonical_key(board: Union[int, object], size: int = 4) -> int:
+    """
+    Returns only the canonical board, for use as a cache or deduplication key.
+    """
+    return canonicalize(board, size)[0]
+
+
+def to_canonical_direction(direction: int, transform: int) -> int:
+    """
+    Maps a move on the original board to the equivalent move on the transformed board.
+    """
+    return DIRECTION_MAP[transform][direction]
+
+
+def from_canonical_direction(direction: int, transform: int) -> int:
+    """
+    Maps a move on the transformed board (e.g. a cached best move) back to the original board.
+    """
+    return DIRECTION_MAP[INVERSE[transform]][direction]
@@ -1 +1,2 @@
-from .in_process_comm import InProcessCommunication
\ No newline at end of file
+from .in_process_comm import InProcessCommunication
+from .async_in_process_comm import AsyncInProcessCommunication
\ No newline at end of file
@@ -0,0 +1,51 @@
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from game_backend.services.game_manager import GameManager
+
+logger = logging.getLogger(__name__)
+
+class AsyncInProcessCommunication:
+    """
+    Async transport calling GameManager directly.
+
+    Exposes the same interface as `cli_frontend.ws_comm.WebSocketCommunication`, so a frontend
+    can play a local game without a server, network framing or JSON encoding.
+    """
+    def __init__(self, game_manager: GameManager):
+        self.game_manager = game_manager
+        self.connected: bool = False
+        self._replies: asyncio.Queue = asyncio.Queue()
+
+    async def connect(self) -> None:
+        self.connected = True
+        logger.info("Connected to in-process game.")
+
+    async def send_move(self, direction: int) -> bool:
+        if not self.connected:
+            logger.error("In-process game is not connected.")
+            return False
+        self.game_manager.play_turn(direction)
+        return True
+
+    async def queue_move(self, direction: int) -> bool:
+        if not await self.send_move(direction):
+            return False
+        self._replies.put_nowait(self.game_manager.get_grid_state())
+        return True
+
+    async def next_state(self) -> Optional[Dict[str, Any]]:
+        if not self.connected and self._replies.empty():
+            return None
+        return await self._replies.get()
+
+    def forget_pending(self) -> None:
+        pass  # Replies are never lost in process
+
+    def get_game_state(self) -> Optional[Dict[str, Any]]:
+        return self.game_manager.get_grid_state()
+
+    async def close(self) -> None:
+        self.connected = False
+        logger.info("In-process game closed.")
@@ -0,0 +1,256 @@
+import argparse
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from game_backend.core import bit_backend
+
+logger = logging.getLogger(__name__)
+
+
+def record_dtype(size: int = 4) -> np.dtype:
+    """
+    Fixed-size record for one (board, action, reward, legal mask, done) transition.
+
+    Args:
+        size (int): Board size; the board field holds `size * size` exponents in row-major order.
+    """
+    return np.dtype([
+        ('board', np.uint8, (size * size,)),
+        ('action', np.uint8),
+        ('reward', np.uint32),
+        ('legal', np.bool_, (4,)),
+        ('done', np.bool_),
+    ])
+
+
+class DatasetWriter:
+    """
+    Appends transitions to fixed-record, memory-mapped `.npy` shards.
+
+    Each shard is preallocated as a memory map of `shard_records` records and filled in place, so
+    appending creates no Python objects per transition beyond the call itself. Full shards are flushed
+    and atomically renamed from `.npy.tmp` to `.npy`, and partial ones rewritten to `.npy.part` and renamed,
+    so readers only ever see complete files.
+    """
+    def __init__(
+        self,
+        directory: str,
+        size: int = 4,
+        shard_records: int = 1 << 20,
+        flush_every: int = 1 << 14,
+        prefix: Optional[str] = None,
+    ) -> None:
+        """
+        Initializes the DatasetWriter.
+
+        Args:
+            directory (str): Output directory, created if missing.
+            size (int): Board size of the recorded games.
+            shard_records (int): Records per shard before rotating to a new file.
+            flush_every (int): Records between flushes of the memory map to disk.
+            prefix (Optional[str]): Shard file name prefix. Defaults to one unique to this process.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.size = size
+        self.dtype = record_dtype(size)
+        self.shard_records = shard_records
+        self.flush_every = flush_every
+        self.prefix = prefix or f"shard-{os.getpid()}"
+
+        self.shard_index: int = 0
+        self.records_written: int = 0
+        self._shard: Optional[np.memmap] = None
+        self._shard_path: Optional[Path] = None
+        self._count: int = 0
+
+    def _open_shard(self) -> None:
+        while True:
+            path = self.directory / f"{self.prefix}-{self.shard_index:05d}.npy"
+            if not path.exists():
+                break
+            self.shard_index += 1
+        self._shard_path = path
+        self._shard = np.lib.format.open_memmap(
+            path.with_suffix(".npy.tmp"), mode="w+", dtype=self.dtype, shape=(self.shard_records,)
+        )
+        self._count = 0
+
+    def _close_shard(self) -> None:
+        if self._shard is None:
+            return
+        tmp_path = self._shard_path.with_suffix(".npy.tmp")
+        if self._count == self.shard_records:
+            self._shard.flush()
+            del self._shard
+            os.replace(tmp_path, self._shard_path)
+        else:
+            # A partial shard is rewritten at its real length so every shard's shape matches its content,
+            # through a second temporary file so a crash mid-write leaves no truncated .npy behind
+            if self._count:
+                part_path = self._shard_path.with_suffix(".npy.part")
+                with open(part_path, "wb") as f:
+                    np.save(f, self._shard[:self._count])
+                os.replace(part_path, self._shard_path)
+            del self._shard
+            os.remove(tmp_path)
+        logger.info(f"Closed dataset shard {self._shard_path} ({self._count} records).")
+        self._shard = None
+        self.shard_index += 1
+
+    def append(self, board: int, action: int, reward: int, legal: Sequence[bool], done: bool) -> None:
+        """
+        Appends one transition.
+
+        Args:
+            board (int): Packed board before the action (see `bit_backend`).
+            action (int): Direction played.
+            reward (int): Score gained by the action.
+            legal (Sequence[bool]): Which of the four directions were legal on the board.
+            done (bool): Whether the game ended after the action.
+        """
+        if self._shard is None:
+            self._open_shard()
+        record = self._shard[self._count]
+        record['board'] = bit_backend.exponents(board, self.size)
+        record['action'] = action
+        record['reward'] = reward
+        record['legal'] = legal
+        record['done'] = done
+        self._count += 1
+        self.records_written += 1
+
+        if self._count == self.shard_records:
+            self._close_shard()
+        elif self._count % self.flush_every == 0:
+            self._shard.flush()
+
+    def append_move(self, board: int, action: int, reward: int, done: bool) -> None:
+        """
+        Appends one transition, computing the legal mask from the board.
+        """
+        legal = [bit_backend.move(board, direction, self.size)[0] != board for direction in bit_backend.DIRECTIONS]
+        self.append(board, action, reward, legal, done)
+
+    def close(self) -> None:
+        self._close_shard()
+
+    def __enter__(self) -> "DatasetWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class DatasetReader:
+    """
+    Reads the shards written by `DatasetWriter` as read-only memory maps.
+
+    Batches are slices of the mapped shards, so they share memory with the page cache instead of being copied.
+    """
+    def __init__(self, directory: str) -> None:
+        self.directory = Path(directory)
+        self.shards: List[np.memmap] = [
+            np.load(path, mmap_mode="r") for path in sorted(self.directory.glob("*.npy"))
+        ]
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self.shards)
+
+    def batches(self, batch_size: int, drop_last: bool = False) -> Iterator[np.ndarray]:
+        """
+        Yields consecutive zero-copy batches. Batches never span two shards, so the last batch of a
+        shard may be shorter unless `drop_last` is set.
+        """
+        for shard in self.shards:
+            for start in range(0, len(shard), batch_size):
+                batch = shard[start:start + batch_size]
+                if drop_last and len(batch) < batch_size:
+                    break
+                yield batch
+
+    def shuffled_batches(self, batch_size: int, seed: Optional[int] = None) -> Iterator[np.ndarray]:
+        """
+        Yields zero-copy batches in random order (shards and batch offsets shuffled, records within a batch contiguous).
+        """
+        rng = np.random.default_rng(seed)
+        slices = [
+            (shard_index, start)
+            for shard_index, shard in enumerate(self.shards)
+            for start in range(0, len(shard), batch_size)
+        ]
+        for index in rng.permutation(len(slices)):
+            shard_index, start = slices[index]
+            yield self.shards[shard_index][start:start + batch_size]
+
+
+def export_recorded_games(lines: Iterable[str], writer: DatasetWriter) -> int:
+    """
+    Exports recorded games, one JSON object per line, to a dataset.
+
+    Each game holds `boards` (the board before each move, as a packed int, a hex string or a
+    `values[x][y]` matrix) and `moves`. Rewards are recomputed from the rules; the last move of
+    a game is marked done if no move is possible afterwards or if it is the last recorded board.
+
+    Returns:
+        int: Number of games exported.
+    """
+    games = 0
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            game: Dict[str, Any] = json.loads(line)
+            if not isinstance(game, dict):
+                raise ValueError("game must be a JSON object")
+            size = game.get('size', writer.size)
+            if size != writer.size:
+                raise ValueError(f"board size {size} does not match dataset size {writer.size}")
+            boards = [bit_backend.parse_board(board, size) for board in game['boards']]
+            moves = game['moves']
+            if not isinstance(moves, list) or not all(type(action) is int and action in bit_backend.DIRECTIONS for action in moves):
+                raise ValueError("moves must be a list of directions 0-3")
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+            logger.error(f"Skipping invalid game on line {line_number}: {e}")
+            continue
+
+        for index, (board, action) in enumerate(zip(boards, moves)):
+            _, reward = bit_backend.move(board, action, size)
+            if index + 1 < len(boards):
+                done = not bit_backend.can_move(boards[index + 1], size)
+            else:
+                done = True
+            writer.append_move(board, action, reward, done)
+        games += 1
+    return games
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m game_backend.dataset",
+        description="Export recorded games (JSON lines) to memory-mapped .npy training shards.",
+    )
+    parser.add_argument("games", help="JSON lines file of recorded games, or - for stdin.")
+    parser.add_argument("output", help="Output directory for the shards.")
+    parser.add_argument("--size", type=int, default=4, help="Board size.")
+    parser.add_argument("--shard-records", type=int, default=1 << 20, help="Records per shard.")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    with DatasetWriter(args.output, size=args.size, shard_records=args.shard_records) as writer:
+        if args.games == "-":
+            games = export_recorded_games(sys.stdin, writer)
+        else:
+            with open(args.games) as f:
+                games = export_recorded_games(f, writer)
+    logger.info(f"Exported {games} games, {writer.records_written} records to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
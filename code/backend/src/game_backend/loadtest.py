@@ -0,0 +1,372 @@
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+from collections import Counter
+from itertools import cycle
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import websockets
+
+logger = logging.getLogger(__name__)
+
+DIRECTIONS = (0, 1, 2, 3)
+
+
+def percentile(samples: Sequence[float], pct: float) -> Optional[float]:
+    """
+    Computes a nearest-rank percentile.
+
+    Args:
+        samples (Sequence[float]): Samples, not necessarily sorted.
+        pct (float): Percentile in the range [0, 100].
+
+    Returns:
+        Optional[float]: The percentile value, or None if there are no samples.
+    """
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize_latencies(samples: Sequence[float]) -> Dict[str, Optional[float]]:
+    """
+    Summarizes latency samples (in seconds) as milliseconds.
+
+    Args:
+        samples (Sequence[float]): Latency samples in seconds.
+
+    Returns:
+        Dict[str, Optional[float]]: Count, mean, p50, p95, p99 and max in milliseconds.
+    """
+    def ms(value: Optional[float]) -> Optional[float]:
+        return round(value * 1000, 3) if value is not None else None
+
+    return {
+        'count': len(samples),
+        'mean_ms': ms(sum(samples) / len(samples)) if samples else None,
+        'p50_ms': ms(percentile(samples, 50)),
+        'p95_ms': ms(percentile(samples, 95)),
+        'p99_ms': ms(percentile(samples, 99)),
+        'max_ms': ms(max(samples)) if samples else None,
+    }
+
+
+class MoveSource:
+    """
+    Produces the moves played by a load test client.
+    """
+    def __init__(self, script: Optional[Sequence[int]] = None, seed: Optional[int] = None) -> None:
+        """
+        Initializes the MoveSource.
+
+        Args:
+            script (Optional[Sequence[int]]): Directions to cycle through. Random moves are played if empty.
+            seed (Optional[int]): Seed for the random move generator.
+        """
+        self.script = list(script) if script else []
+        self.rng = random.Random(seed)
+        self._scripted: Optional[Iterator[int]] = cycle(self.script) if self.script else None
+
+    def next_move(self) -> int:
+        if self._scripted is not None:
+            return next(self._scripted)
+        return self.rng.choice(DIRECTIONS)
+
+
+class LoadTestStats:
+    """
+    Accumulates measurements shared by all clients of one load test stage.
+    """
+    def __init__(self) -> None:
+        self.connect_times: List[float] = []
+        self.move_rtts: List[float] = []
+        self.messages_sent: int = 0
+        self.messages_received: int = 0
+        self.games_started: int = 0
+        self.games_finished: int = 0
+        self.errors: Counter = Counter()
+        self.server_failures: Counter = Counter()
+
+    def report(self, sessions: int, elapsed: float) -> Dict[str, Any]:
+        """
+        Builds the JSON-serializable report for this stage.
+
+        Args:
+            sessions (int): Number of concurrent sessions in the stage.
+            elapsed (float): Wall time of the stage in seconds.
+
+        Returns:
+            Dict[str, Any]: The stage report.
+        """
+        messages = self.messages_sent + self.messages_received
+        return {
+            'sessions': sessions,
+            'elapsed_s': round(elapsed, 3),
+            'games_started': self.games_started,
+            'games_finished': self.games_finished,
+            'connect': summarize_latencies(self.connect_times),
+            'move_rtt': summarize_latencies(self.move_rtts),
+            'messages_sent': self.messages_sent,
+            'messages_received': self.messages_received,
+            'messages_per_sec': round(messages / elapsed, 3) if elapsed > 0 else None,
+            'moves_per_sec': round(len(self.move_rtts) / elapsed, 3) if elapsed > 0 else None,
+            'errors': dict(self.errors),
+            'error_count': sum(self.errors.values()),
+            'server_failures': dict(self.server_failures),
+            'server_failure_count': sum(self.server_failures.values()),
+        }
+
+
+class LoadTestClient:
+    """
+    Headless game client driving one session on the `/ws/game` endpoint.
+
+    Mirrors `cli_frontend.ws_comm.WebSocketCommunication` without curses, recording timings instead of rendering.
+    """
+    def __init__(
+        self,
+        uri: str,
+        stats: LoadTestStats,
+        moves: MoveSource,
+        rate: float = 0.0,
+        open_timeout: float = 10.0,
+        reply_timeout: float = 10.0,
+    ) -> None:
+        """
+        Initializes the LoadTestClient.
+
+        Args:
+            uri (str): WebSocket URI of the game endpoint.
+            stats (LoadTestStats): Shared stats accumulator.
+            moves (MoveSource): Source of the directions to play.
+            rate (float): Moves per second for this client. 0 plays as fast as replies arrive.
+            open_timeout (float): Timeout for the handshake and initial state, in seconds.
+            reply_timeout (float): Timeout for each move reply, in seconds.
+        """
+        self.uri = uri
+        self.stats = stats
+        self.moves = moves
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.open_timeout = open_timeout
+        self.reply_timeout = reply_timeout
+
+    async def run(self, deadline: float) -> None:
+        """
+        Plays games back to back until the deadline, reconnecting after each game over.
+
+        Args:
+            deadline (float): `time.perf_counter()` value at which to stop.
+        """
+        while time.perf_counter() < deadline:
+            keep_going = await self._play_game(deadline)
+            if not keep_going:
+                break
+
+    async def _play_game(self, deadline: float) -> bool:
+        """
+        Plays a single game on a fresh connection.
+
+        Returns:
+            bool: True if the client should start another game, False if it should stop.
+        """
+        start = time.perf_counter()
+        try:
+            websocket = await asyncio.wait_for(
+                websockets.connect(self.uri, open_timeout=self.open_timeout, max_queue=4),
+                timeout=self.open_timeout,
+            )
+        except asyncio.TimeoutError:
+            self.stats.errors['connect_timeout'] += 1
+            return True
+        except (OSError, websockets.exceptions.WebSocketException) as e:
+            self.stats.errors[f'connect_{type(e).__name__}'] += 1
+            await asyncio.sleep(0.1)
+            return True
+
+        try:
+            state = json.loads(await asyncio.wait_for(websocket.recv(), timeout=self.open_timeout))
+            self.stats.connect_times.append(time.perf_counter() - start)
+            self.stats.messages_received += 1
+            self.stats.games_started += 1
+
+            next_send = time.perf_counter()
+            # The server closes the socket once the game is over or won
+            while not (state.get('over', False) or state.get('won', False)) and time.perf_counter() < deadline:
+                if self.interval:
+                    delay = next_send - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    next_send = max(next_send + self.interval, time.perf_counter())
+
+                sent_at = time.perf_counter()
+                await websocket.send(json.dumps({"direction": self.moves.next_move()}))
+                self.stats.messages_sent += 1
+                reply = json.loads(await asyncio.wait_for(websocket.recv(), timeout=self.reply_timeout))
+                self.stats.move_rtts.append(time.perf_counter() - sent_at)
+                self.stats.messages_received += 1
+
+                if 'error' in reply:
+                    self.stats.server_failures[f"error_reply: {reply['error']}"] += 1
+                    continue
+                state = reply
+
+            if state.get('over', False) or state.get('won', False):
+                self.stats.games_finished += 1
+            return True
+        except asyncio.TimeoutError:
+            self.stats.errors['reply_timeout'] += 1
+            return True
+        except websockets.exceptions.ConnectionClosed as e:
+            code = e.rcvd.code if e.rcvd else None
+            if code not in (1000, 1001):
+                self.stats.server_failures[f'closed_{code}'] += 1
+            return True
+        except json.JSONDecodeError:
+            self.stats.server_failures['invalid_json'] += 1
+            return True
+        finally:
+            await websocket.close()
+
+
+async def run_stage(
+    uri: str,
+    sessions: int,
+    duration: float,
+    rate: float,
+    ramp: float,
+    script: Optional[Sequence[int]],
+    seed: Optional[int],
+) -> Dict[str, Any]:
+    """
+    Runs one load test stage with a fixed number of concurrent sessions.
+
+    Args:
+        uri (str): WebSocket URI of the game endpoint.
+        sessions (int): Number of concurrent clients.
+        duration (float): Duration of the stage in seconds, including the ramp.
+        rate (float): Moves per second per client. 0 plays as fast as possible.
+        ramp (float): Seconds over which client start times are spread.
+        script (Optional[Sequence[int]]): Scripted moves; random moves if empty.
+        seed (Optional[int]): Base seed; client `i` uses `seed + i`.
+
+    Returns:
+        Dict[str, Any]: The stage report.
+    """
+    stats = LoadTestStats()
+    start = time.perf_counter()
+    deadline = start + duration
+
+    async def start_client(index: int) -> None:
+        if ramp > 0:
+            await asyncio.sleep(ramp * index / sessions)
+        client = LoadTestClient(
+            uri=uri,
+            stats=stats,
+            moves=MoveSource(script, None if seed is None else seed + index),
+            rate=rate,
+        )
+        await client.run(deadline)
+
+    results = await asyncio.gather(*(start_client(i) for i in range(sessions)), return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            stats.errors[f'client_{type(result).__name__}'] += 1
+            logger.error(f"Load test client failed: {result!r}")
+
+    return stats.report(sessions, time.perf_counter() - start)
+
+
+async def run_load_test(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Runs every stage requested on the command line, one after another.
+    """
+    stages = []
+    for sessions in args.sessions:
+        logger.info(f"Starting stage with {sessions} sessions for {args.duration}s")
+        report = await run_stage(
+            uri=args.uri,
+            sessions=sessions,
+            duration=args.duration,
+            rate=args.rate,
+            ramp=args.ramp,
+            script=args.script,
+            seed=args.seed,
+        )
+        logger.info(
+            f"{sessions} sessions: p50={report['move_rtt']['p50_ms']}ms "
+            f"p99={report['move_rtt']['p99_ms']}ms errors={report['error_count']} "
+            f"failures={report['server_failure_count']}"
+        )
+        stages.append(report)
+        if args.pause:
+            await asyncio.sleep(args.pause)
+
+    return {
+        'uri': args.uri,
+        'started_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'config': {
+            'duration_s': args.duration,
+            'rate_per_session': args.rate,
+            'ramp_s': args.ramp,
+            'script': args.script,
+            'seed': args.seed,
+        },
+        'stages': stages,
+    }
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(',') if item.strip()]
+
+
+def _direction_list(value: str) -> List[int]:
+    directions = _int_list(value)
+    if any(direction not in DIRECTIONS for direction in directions):
+        raise argparse.ArgumentTypeError("directions must be 0 (up), 1 (right), 2 (down) or 3 (left)")
+    return directions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m game_backend.loadtest",
+        description="Open many concurrent WebSocket game sessions and measure server latency.",
+    )
+    parser.add_argument("--uri", default="ws://127.0.0.1:8000/ws/game", help="Game WebSocket endpoint.")
+    parser.add_argument(
+        "--sessions", type=_int_list, default=[100],
+        help="Comma-separated concurrent session counts; each one runs as a separate stage (e.g. 100,500,1000).",
+    )
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds per stage.")
+    parser.add_argument("--rate", type=float, default=2.0, help="Moves per second per session (0 = unthrottled).")
+    parser.add_argument("--ramp", type=float, default=5.0, help="Seconds over which sessions are opened.")
+    parser.add_argument("--pause", type=float, default=2.0, help="Seconds to wait between stages.")
+    parser.add_argument("--script", type=_direction_list, default=None, help="Comma-separated directions to cycle instead of random moves.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for random moves, for reproducible runs.")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file instead of stdout.")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    # The client library logs every closed connection; keep the report readable.
+    logging.getLogger("websockets").setLevel(logging.WARNING)
+
+    report = asyncio.run(run_load_test(args))
+    encoded = json.dumps(report, indent=4)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(encoded)
+        logger.info(f"Report written to {args.output}")
+    else:
+        print(encoded)
+
+
+if __name__ == "__main__":
+    main()
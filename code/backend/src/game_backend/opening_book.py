@@ -0,0 +1,257 @@
+"""
+Opening book of precomputed best moves.
+
+The builder enumerates every position reachable from the start tiles (as placed by
+`GameManager.add_start_tiles`) within a number of moves, scores each with expectimax, and writes
+one fixed-size record per position, sorted by the symmetry-canonical packed board:
+
+    header:  magic b"2048BOOK", version u32, size u32, depth u32, search depth u32, count u64
+    record:  board u64, value f32, move u8, 3 padding bytes  (little-endian, 16 bytes)
+
+`OpeningBook` memory-maps the file and binary-searches it, so every process using the same book
+shares one copy in the page cache.
+"""
+import argparse
+import logging
+import mmap
+import multiprocessing
+import os
+import struct
+import time
+from itertools import combinations
+from typing import Iterator, List, Optional, Sequence, Set, Tuple
+
+from game_backend.core import bit_backend
+from game_backend.core.bit_backend.search import SPAWNS, Expectimax
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"2048BOOK"
+VERSION = 1
+HEADER = struct.Struct("<8sIIIIQ")
+RECORD = struct.Struct("<QfB3x")
+_KEY = struct.Struct("<Q")
+MAX_SIZE = 4  # Keys are packed boards in a u64
+
+
+def start_positions(size: int = 4, start_tiles: int = 2) -> Set[int]:
+    """
+    All canonical boards `GameManager.add_start_tiles` can produce.
+    """
+    cells = [(x, y) for x in range(size) for y in range(size)]
+    boards = set()
+    for placed in combinations(cells, start_tiles):
+        for exponents in _spawn_exponents(start_tiles):
+            board = 0
+            for (x, y), exponent in zip(placed, exponents):
+                board = bit_backend.set_exponent(board, x, y, exponent, size)
+            boards.add(bit_backend.canonical_key(board, size))
+    return boards
+
+
+def _spawn_exponents(count: int) -> Iterator[Tuple[int, ...]]:
+    if count == 0:
+        yield ()
+        return
+    for exponent, _ in SPAWNS:
+        for rest in _spawn_exponents(count - 1):
+            yield (exponent,) + rest
+
+
+def successors(board: int, size: int = 4) -> Set[int]:
+    """
+    Canonical boards reachable with one move and the tile spawned after it.
+    """
+    children = set()
+    for direction in bit_backend.DIRECTIONS:
+        moved, _ = bit_backend.move(board, direction, size)
+        if moved == board:
+            continue
+        for x, y in bit_backend.empty_cells(moved, size):
+            for exponent, _ in SPAWNS:
+                children.add(bit_backend.canonical_key(bit_backend.set_exponent(moved, x, y, exponent, size), size))
+    return children
+
+
+def explore(depth: int, size: int = 4, start_tiles: int = 2) -> Set[int]:
+    """
+    Canonical boards reachable from the start positions in at most `depth` moves.
+    """
+    frontier = start_positions(size, start_tiles)
+    seen = set(frontier)
+    for level in range(depth):
+        next_frontier = set()
+        for board in frontier:
+            next_frontier.update(successors(board, size))
+        frontier = next_frontier - seen
+        seen |= frontier
+        logger.info(f"Depth {level + 1}: {len(frontier)} new positions, {len(seen)} total.")
+    return seen
+
+
+_worker_search: Optional[Expectimax] = None
+
+
+def _init_worker(size: int, search_depth: int) -> None:
+    global _worker_search
+    _worker_search = Expectimax(size=size, depth=search_depth)
+
+
+def _evaluate(boards: Sequence[int]) -> List[Tuple[int, int, float]]:
+    results = []
+    for board in boards:
+        # The search cache ignores branch probabilities, so a warm cache could change the result;
+        # a cold one per position keeps the book independent of how positions are chunked
+        _worker_search.cache.clear()
+        direction, value = _worker_search.best_move(board)
+        if direction is not None:
+            results.append((board, direction, value))
+    return results
+
+
+def build_book(
+    path: str,
+    depth: int = 3,
+    search_depth: int = 2,
+    size: int = 4,
+    workers: Optional[int] = None,
+    chunk_size: int = 256,
+) -> int:
+    """
+    Builds an opening book file.
+
+    Args:
+        path (str): Output file; written to a temporary file and renamed into place.
+        depth (int): Moves explored from the start positions.
+        search_depth (int): Expectimax depth used to score each position.
+        size (int): Board size.
+        workers (Optional[int]): Processes evaluating positions. Defaults to the CPU count.
+        chunk_size (int): Positions per task sent to a worker.
+
+    Returns:
+        int: Number of records written.
+
+    Raises:
+        ValueError: If the board size is not supported.
+    """
+    if not 2 <= size <= MAX_SIZE:
+        raise ValueError(f"Opening books are supported for sizes 2 to {MAX_SIZE}")
+    boards = sorted(explore(depth, size))
+    chunks = [boards[i:i + chunk_size] for i in range(0, len(boards), chunk_size)]
+    start = time.perf_counter()
+    records: List[Tuple[int, int, float]] = []
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(size, search_depth)) as pool:
+        for done, results in enumerate(pool.imap(_evaluate, chunks), start=1):
+            records.extend(results)
+            if done % 50 == 0:
+                logger.info(f"Evaluated {done}/{len(chunks)} chunks ({time.perf_counter() - start:.0f}s).")
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, size, depth, search_depth, len(records)))
+        for board, direction, value in records:  # Already sorted by board
+            f.write(RECORD.pack(board, value, direction))
+    os.replace(tmp_path, path)
+    logger.info(f"Wrote {len(records)} positions to {path} in {time.perf_counter() - start:.1f}s.")
+    return len(records)
+
+
+class OpeningBook:
+    """
+    Read-only, memory-mapped opening book.
+    """
+    def __init__(self, path: str) -> None:
+        """
+        Opens a book written by `build_book`.
+
+        Raises:
+            ValueError: If the file is not an opening book of a supported version.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.size, self.depth, self.search_depth, self.count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a version {VERSION} opening book")
+        if len(self._mmap) < HEADER.size + self.count * RECORD.size:
+            self._mmap.close()
+            raise ValueError(f"{path} is truncated")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _find(self, key: int) -> Optional[int]:
+        buffer, unpack_key = self._mmap, _KEY.unpack_from
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if unpack_key(buffer, HEADER.size + middle * RECORD.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and unpack_key(buffer, HEADER.size + low * RECORD.size)[0] == key:
+            return HEADER.size + low * RECORD.size
+        return None
+
+    def lookup(self, board: int) -> Optional[Tuple[int, float]]:
+        """
+        Looks up a position in any orientation.
+
+        Args:
+            board (int): The packed board.
+
+        Returns:
+            Optional[Tuple[int, float]]: The best move for `board` as given and its value, or None if the position is not in the book.
+        """
+        key, transform = bit_backend.canonicalize(board, self.size)
+        offset = self._find(key)
+        if offset is None:
+            return None
+        _, value, direction = RECORD.unpack_from(self._mmap, offset)
+        return bit_backend.from_canonical_direction(direction, transform), value
+
+    def best_move(self, board: int) -> Optional[int]:
+        found = self.lookup(board)
+        return found[0] if found is not None else None
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def __enter__(self) -> "OpeningBook":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m game_backend.opening_book", description="Build or query an opening book.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Explore the openings and write a book.")
+    build.add_argument("output", help="Book file to write.")
+    build.add_argument("--depth", type=int, default=3, help="Moves explored from the start positions.")
+    build.add_argument("--search-depth", type=int, default=2, help="Expectimax depth used to score positions.")
+    build.add_argument("--size", type=int, default=4, help="Board size.")
+    build.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+
+    lookup = commands.add_parser("lookup", help="Look up positions given as hex packed boards.")
+    lookup.add_argument("book", help="Book file.")
+    lookup.add_argument("boards", nargs="+", help="Packed boards in hex.")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "build":
+        build_book(args.output, depth=args.depth, search_depth=args.search_depth, size=args.size, workers=args.workers)
+        return
+
+    with OpeningBook(args.book) as book:
+        for board in args.boards:
+            found = book.lookup(int(board, 16))
+            print(f"{board}: {'not in book' if found is None else f'move {found[0]}, value {found[1]:.1f}'}")
+
+
+if __name__ == "__main__":
+    main()
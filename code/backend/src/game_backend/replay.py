@@ -0,0 +1,250 @@
+"""
+Headless verification of submitted game records.
+
+A record is replayed on `bit_backend` boards with the rules of `GameManager`, without any storage
+I/O, and every step is checked: each move must change the board, and each spawned tile must be a 2
+or a 4 placed on an empty cell. The recomputed score must match the claimed one.
+
+Records are JSON objects:
+
+    {"id": ..., "size": 4, "seed": 42, "moves": [0, 3, ...], "score": 1234}
+    {"id": ..., "size": 4, "board": [0, 2, 0, ...], "moves": [...], "spawns": [[x, y, value], ...], "score": 1234}
+
+With a `board` (tile values in row-major order, i.e. cell (x, y) at index `y * size + x`), the
+record lists the tile spawned after each move. With a `seed`, the start tiles and every spawn are
+drawn from `random.Random(seed)` exactly as `simulation.spawn_tile` draws them; `spawns`, if given,
+must then match those draws. `id` is optional and echoed back.
+"""
+import asyncio
+import concurrent.futures
+import logging
+import multiprocessing
+import os
+import random
+from itertools import repeat
+from typing import Any, Dict, List, Optional, Sequence
+
+from game_backend.core import bit_backend
+from game_backend.simulation import spawn_tile
+
+logger = logging.getLogger(__name__)
+
+MAX_SIZE = 8
+SPAWN_EXPONENTS = {2: 1, 4: 2}
+
+
+class ReplayError(ValueError):
+    """
+    A record that is malformed or does not replay; `move_index` is the first offending move, if any.
+    """
+    def __init__(self, message: str, move_index: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.move_index = move_index
+
+
+def _initial_board(record: Dict[str, Any], size: int, start_tiles: int, rng: Optional[random.Random]) -> int:
+    if rng is not None:
+        board = 0
+        for _ in range(start_tiles):
+            board = spawn_tile(board, size, rng)
+        return board
+
+    values = record.get("board")
+    if not isinstance(values, list) or len(values) != size * size:
+        raise ReplayError(f"Record needs a seed or a board of {size * size} cells")
+    board = 0
+    tiles = 0
+    for index, value in enumerate(values):
+        if value is None or type(value) is int and value == 0:
+            continue
+        # Untrusted values may be unhashable, so the type is checked before the lookup
+        if type(value) is not int or value not in SPAWN_EXPONENTS:
+            raise ReplayError("Initial tiles must be 2 or 4")
+        board = bit_backend.set_exponent(board, index % size, index // size, SPAWN_EXPONENTS[value], size)
+        tiles += 1
+    if tiles != start_tiles:
+        raise ReplayError(f"Initial board must have {start_tiles} tiles")
+    return board
+
+
+def replay(record: Dict[str, Any], start_tiles: int = 2) -> Dict[str, Any]:
+    """
+    Replays a record and checks every move and spawn.
+
+    Args:
+        record (Dict[str, Any]): The game record (see the module docstring).
+        start_tiles (int): Number of tiles on the initial board.
+
+    Returns:
+        Dict[str, Any]: The final score, max tile and number of moves.
+
+    Raises:
+        ReplayError: If the record is malformed, a move is illegal or a spawn is impossible.
+    """
+    size = record.get("size", 4)
+    if type(size) is not int or not 2 <= size <= MAX_SIZE:
+        raise ReplayError(f"Size must be between 2 and {MAX_SIZE}")
+    moves = record.get("moves")
+    if not isinstance(moves, list):
+        raise ReplayError("Record needs a list of moves")
+    seed = record.get("seed")
+    if seed is not None and type(seed) is not int:
+        raise ReplayError("Seed must be an integer")
+    spawns = record.get("spawns")
+    if spawns is None and seed is None:
+        raise ReplayError("Record needs a seed or a list of spawns")
+    if spawns is not None and (not isinstance(spawns, list) or len(spawns) != len(moves)):
+        raise ReplayError("Record needs one spawn per move")
+
+    rng = random.Random(seed) if seed is not None else None
+    board = _initial_board(record, size, start_tiles, rng)
+    move, get_exponent = bit_backend.move, bit_backend.get_exponent
+    score = 0
+    for index, direction in enumerate(moves):
+        if type(direction) is not int or not 0 <= direction <= 3:
+            raise ReplayError("Invalid direction", index)
+        new_board, gained = move(board, direction, size)
+        if new_board == board:
+            raise ReplayError("Illegal move", index)
+        score += gained
+
+        if rng is not None:
+            board = spawn_tile(new_board, size, rng)
+            if spawns is not None and spawns[index] != _describe_spawn(new_board, board, size):
+                raise ReplayError("Spawn does not match the seed", index)
+            continue
+
+        spawn = spawns[index]
+        if not isinstance(spawn, list) or len(spawn) != 3:
+            raise ReplayError("Spawns must be [x, y, value]", index)
+        x, y, value = spawn
+        # Booleans are ints to isinstance, so the type is checked exactly as for directions
+        if not (type(x) is int and type(y) is int and 0 <= x < size and 0 <= y < size):
+            raise ReplayError("Spawn outside the board", index)
+        if type(value) is not int or value not in SPAWN_EXPONENTS:
+            raise ReplayError("Spawned tiles must be 2 or 4", index)
+        if get_exponent(new_board, x, y, size):
+            raise ReplayError("Spawn on an occupied cell", index)
+        board = bit_backend.set_exponent(new_board, x, y, SPAWN_EXPONENTS[value], size)
+
+    return {"score": score, "maxTile": bit_backend.max_tile(board, size), "moves": len(moves)}
+
+
+def _describe_spawn(before: int, after: int, size: int) -> List[int]:
+    # The spawn only sets one empty nibble, so its index is that of the highest differing bit
+    index = ((after ^ before).bit_length() - 1) // 4
+    return [index % size, index // size, 1 << ((after >> (4 * index)) & 0xF)]
+
+
+def verify_record(record: Any, start_tiles: int = 2) -> Dict[str, Any]:
+    """
+    Verifies one record: it must replay, and its claimed score must match.
+
+    Returns:
+        Dict[str, Any]: `valid`, the recomputed `score`, `maxTile` and `moves` when the record
+        replays, and otherwise an `error` with the offending `moveIndex` (None if the record itself is malformed).
+    """
+    if not isinstance(record, dict):
+        return {"valid": False, "error": "Record must be an object", "moveIndex": None}
+    result: Dict[str, Any] = {"id": record["id"]} if "id" in record else {}
+    try:
+        result.update(replay(record, start_tiles))
+    except ReplayError as e:
+        result.update(valid=False, error=str(e), moveIndex=e.move_index)
+        return result
+    except (TypeError, ValueError) as e:
+        # A malformed value the checks above missed fails this record only, never the batch
+        result.update(valid=False, error=f"Malformed record: {type(e).__name__}", moveIndex=None)
+        return result
+    claimed = record.get("score")
+    if claimed != result["score"]:
+        result.update(valid=False, error=f"Claimed score {claimed} does not match")
+    else:
+        result["valid"] = True
+    return result
+
+
+def verify_records(records: Sequence[Any], start_tiles: int = 2) -> List[Dict[str, Any]]:
+    """
+    Verifies a chunk of records; the unit of work sent to a pool worker.
+    """
+    return [verify_record(record, start_tiles) for record in records]
+
+
+def _warm_up() -> None:
+    # Builds the 4x4 move table once per worker rather than in the first chunk
+    bit_backend.move(0, 0, 4)
+
+
+class ReplayVerifier:
+    """
+    Verifies batches of records on a shared process pool.
+
+    Batches are split into chunks so pickling and dispatch are amortized over many records; a batch
+    that fits in one chunk is verified in the calling process, where the round trip to a worker
+    would cost more than the replay.
+    """
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = 256, start_tiles: int = 2) -> None:
+        """
+        Initializes the ReplayVerifier.
+
+        Args:
+            workers (Optional[int]): Worker processes. Defaults to `GAME_VERIFY_WORKERS` or the CPU count.
+            chunk_size (int): Records per task sent to a worker.
+            start_tiles (int): Number of tiles on the initial board.
+        """
+        self.workers = workers or int(os.environ.get("GAME_VERIFY_WORKERS", 0)) or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.start_tiles = start_tiles
+        self._pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> concurrent.futures.ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"), initializer=_warm_up
+            )
+        return self._pool
+
+    def _chunks(self, records: Sequence[Any]) -> List[Sequence[Any]]:
+        return [records[i:i + self.chunk_size] for i in range(0, len(records), self.chunk_size)]
+
+    def verify(self, records: Sequence[Any]) -> List[Dict[str, Any]]:
+        """
+        Verifies a batch, blocking until every record is checked.
+
+        Returns:
+            List[Dict[str, Any]]: One result per record, in order (see `verify_record`).
+        """
+        if len(records) <= self.chunk_size:
+            return verify_records(records, self.start_tiles)
+        results: List[Dict[str, Any]] = []
+        pool = self._get_pool()
+        for chunk_results in pool.map(verify_records, self._chunks(records), repeat(self.start_tiles)):
+            results.extend(chunk_results)
+        return results
+
+    async def verify_async(self, records: Sequence[Any]) -> List[Dict[str, Any]]:
+        """
+        Verifies a batch without blocking the event loop. A batch that fits in one chunk runs on a
+        thread of the calling process, sparing it the pickling round trip to a worker.
+
+        Returns:
+            List[Dict[str, Any]]: One result per record, in order (see `verify_record`).
+        """
+        loop = asyncio.get_running_loop()
+        if len(records) <= self.chunk_size:
+            results = await loop.run_in_executor(None, verify_records, records, self.start_tiles)
+            logger.info(f"Verified {len(results)} records: {sum(result['valid'] for result in results)} valid.")
+            return results
+        pool = self._get_pool()
+        chunk_results = await asyncio.gather(*(
+            loop.run_in_executor(pool, verify_records, chunk, self.start_tiles) for chunk in self._chunks(records)
+        ))
+        results = [result for chunk in chunk_results for result in chunk]
+        logger.info(f"Verified {len(results)} records: {sum(result['valid'] for result in results)} valid.")
+        return results
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -1,2 +1,2 @@
 from .game_manager import GameManager
-from .local_storage_manager import LocalStorageManager
\ No newline at end of file
+from .local_storage_manager import LocalStorageManager, MemoryStorageManager
\ No newline at end of file
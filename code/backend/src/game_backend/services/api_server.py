@@ -1,11 +1,30 @@
-from typing import Dict, Optional, Any
+from typing import Callable, Dict, List, Optional, Any, Tuple
+import asyncio
+import contextlib
+import cProfile
+import hmac
 import json
+import logging
+import os
+import time
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, FastAPI, Header, HTTPException, Query, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field
 
-from game_backend.services import GameManager, LocalStorageManager
+from game_backend.services import GameManager, LocalStorageManager, MemoryStorageManager
+from game_backend.services.broadcast import Broadcaster
+from game_backend.services.leaderboard import Leaderboard
+from game_backend.services.multiplex import MultiplexSession
+from game_backend.services.profiling import StackSampler, profile_pstats, spans
+from game_backend.services.rate_limit import RateLimiter, SessionLimiter
 from game_backend.core.array_backend import ArrayGrid, ArrayTile
+from game_backend.core import bit_backend
+from game_backend.replay import ReplayVerifier
+from game_backend.simulation import SimulationRunner
+
+logger = logging.getLogger(__name__)
 
 
 app = FastAPI()
@@ -18,61 +37,560 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Created with the first recorded game, so importing the server writes nothing
+leaderboard = Leaderboard(os.environ.get("GAME_LEADERBOARD_FILE", "leaderboard.jsonl"))
+
 class ConnectionManager:
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
         self.game_managers: Dict[str, GameManager] = {}
+        self.players: Dict[str, str] = {}
+        self.broadcaster = Broadcaster()
+        self.rate_limiter = RateLimiter.from_env()
+        self.limiters: Dict[str, SessionLimiter] = {}
+        self.dataset_writer = self._open_dataset_writer()
+        self.session_table = self._open_session_table()
 
-    async def connect(self, websocket: WebSocket) -> str:
-        # await websocket.accept()
+    @staticmethod
+    def _open_dataset_writer():
+        """
+        Records every played move as training data when GAME_DATASET_DIR is set (requires numpy).
+        """
+        directory = os.environ.get("GAME_DATASET_DIR")
+        if not directory:
+            return None
+        from game_backend.dataset import DatasetWriter
+        return DatasetWriter(directory)
+
+    @staticmethod
+    def _open_session_table():
+        """
+        Keeps all sessions in one compact NumPy table instead of a GameManager each when
+        GAME_SESSION_TABLE is set (requires numpy). Table sessions have no undo and store nothing on disk.
+        """
+        if os.environ.get("GAME_SESSION_TABLE", "") in ("", "0"):
+            return None
+        from game_backend.services.session_table import SessionTable
+        return SessionTable(capacity=int(os.environ.get("GAME_SESSION_CAPACITY", 1024)))
+
+    def register_connection(self, websocket: WebSocket, multiplexed: bool = False) -> str:
+        """
+        Registers a socket and its rate limiter, without a game.
+
+        Args:
+            websocket (WebSocket): The accepted socket.
+            multiplexed (bool): Whether the socket drives many games, which gives it the multiplexed rate budget.
+
+        Returns:
+            str: The connection's id.
+        """
         session_id = str(id(websocket))
         self.active_connections[session_id] = websocket
+        address = websocket.client.host if websocket.client else None
+        self.limiters[session_id] = self.rate_limiter.for_session(address, multiplexed)
+        return session_id
 
-        # Initialize a new game for each connection
-        storage_manager = LocalStorageManager()
-        grid = ArrayGrid(size=4)
-        tile_class = ArrayTile
-        game_manager = GameManager(
-            grid=grid,
-            tile_class=tile_class,
-            storage_manager=storage_manager
-        )
+    def unregister_connection(self, session_id: str) -> None:
+        self.active_connections.pop(session_id, None)
+        limiter = self.limiters.pop(session_id, None)
+        if limiter is not None:
+            self.rate_limiter.release(limiter.address_key)
+
+    def open_game(self, session_id: str, player: Optional[str] = None, persistent: bool = True) -> GameManager:
+        """
+        Starts a new game under `session_id`, visible to spectators and recorded for `player`.
+
+        Args:
+            session_id (str): Id the game is registered under.
+            player (Optional[str]): Player name recorded on the leaderboard.
+            persistent (bool): Save the game to local storage after every move. Games that are never
+                resumed skip the disk writes.
+        """
+        player = Leaderboard.normalize_player(player)
+        if player:
+            self.players[session_id] = player
+
+        if self.session_table is not None:
+            game_manager = self.session_table.create()
+        else:
+            storage_manager = LocalStorageManager() if persistent else MemoryStorageManager()
+            grid = ArrayGrid(size=4)
+            tile_class = ArrayTile
+            game_manager = GameManager(
+                grid=grid,
+                tile_class=tile_class,
+                storage_manager=storage_manager
+            )
         self.game_managers[session_id] = game_manager
+        self.broadcaster.open(session_id)
+        return game_manager
+
+    def close_game(self, session_id: str) -> None:
+        game_manager = self.game_managers.pop(session_id, None)
+        if self.session_table is not None and game_manager is not None:
+            self.session_table.release(game_manager)
+        self.players.pop(session_id, None)
+        self.broadcaster.close(session_id)
 
+    async def connect(self, websocket: WebSocket, player: Optional[str] = None) -> str:
+        # await websocket.accept()
+        session_id = self.register_connection(websocket)
+        # Initialize a new game for each connection
+        self.open_game(session_id, player)
         return session_id
 
     def disconnect(self, session_id: str):
-        del self.active_connections[session_id]
-        del self.game_managers[session_id]
+        self.close_game(session_id)
+        self.unregister_connection(session_id)
+
+    async def send_text(self, websocket: WebSocket, text: str) -> None:
+        """
+        Sends a frame, giving up with asyncio.TimeoutError if the client stops reading and the socket stays full.
+        """
+        with spans.span("ws.send"):
+            await asyncio.wait_for(websocket.send_text(text), timeout=self.rate_limiter.send_timeout)
+
+    async def send_state(self, session_id: str, websocket: WebSocket, received: Optional[float] = None) -> None:
+        """
+        Sends the session's cached encoded state to the player and fans the same frame out to spectators.
+
+        Args:
+            session_id (str): The session whose state is sent.
+            websocket (WebSocket): The player's socket.
+            received (Optional[float]): `time.perf_counter()` when the request frame arrived. If given, the
+                player's copy carries the time spent on the server as `serverMs`.
+        """
+        frame = self.game_managers[session_id].get_state_json()
+        if received is None:
+            await self.send_text(websocket, frame)
+        else:
+            # Spliced into the cached frame; spectators get it unchanged
+            server_ms = (time.perf_counter() - received) * 1000
+            await self.send_text(websocket, f'{{"serverMs": {server_ms:.3f}, {frame[1:]}')
+        self.broadcaster.publish(session_id, frame)
+
+    async def admit(self, session_id: str, websocket: WebSocket) -> bool:
+        """
+        Applies the session's rate limit to an incoming frame.
+
+        In delay mode the frame waits for a token. In reject mode it is dropped and answered with an
+        error carrying the session's current state, so every frame still gets exactly one reply.
+
+        Returns:
+            bool: True if the frame should be processed.
+        """
+        limiter = self.limiters[session_id]
+        wait = limiter.acquire()
+        if wait == 0:
+            return True
+        if self.rate_limiter.mode == RateLimiter.MODE_DELAY:
+            while wait:
+                await asyncio.sleep(wait)
+                wait = limiter.acquire()
+            return True
+        limiter.rejected += 1
+        reply = f'{{"error": "Rate limit exceeded", "retryAfter": {round(wait, 3)}'
+        game_manager = self.game_managers.get(session_id)
+        if game_manager is not None:
+            # The cached state JSON is spliced in rather than decoded and re-encoded
+            reply += f', "state": {game_manager.get_state_json()}'
+        await self.send_text(websocket, reply + "}")
+        return False
+
+    def finish_game(self, session_id: str) -> None:
+        """
+        Records a terminated game on the leaderboard if the session belongs to a named player and
+        never undid a move.
+        """
+        player = self.players.pop(session_id, None)
+        game_manager = self.game_managers.get(session_id)
+        if player and game_manager and not game_manager.used_undo:
+            leaderboard.record_game(player, game_manager.score, game_manager.max_tile(), game_manager.moves)
+
+    def play_turn(self, session_id: str, direction: int) -> None:
+        """
+        Plays a move in a session, recording the transition if a dataset is being collected.
+        """
+        game_manager = self.game_managers[session_id]
+        if self.dataset_writer is None or game_manager.is_game_terminated():
+            game_manager.play_turn(direction)
+            return
+        board = game_manager.packed_board()
+        score = game_manager.score
+        game_manager.play_turn(direction)
+        self.dataset_writer.append_move(board, direction, game_manager.score - score, game_manager.is_game_terminated())
+
+    async def step_history(self, session_id: str, websocket: WebSocket, undo: bool = True, received: Optional[float] = None) -> None:
+        """
+        Undoes or redoes a move and sends the resulting state, or an error if there is nothing to step to.
+        """
+        game_manager = self.game_managers[session_id]
+        stepped = game_manager.undo() if undo else game_manager.redo()
+        if stepped:
+            await self.send_state(session_id, websocket, received)
+        else:
+            await self.send_text(websocket, json.dumps({"error": f"Nothing to {'undo' if undo else 'redo'}"}))
+
+    def close(self) -> None:
+        """
+        Flushes server-wide resources on shutdown.
+        """
+        if self.dataset_writer is not None:
+            self.dataset_writer.close()
 
     def get_game_manager(self, session_id: str) -> GameManager:
         return self.game_managers[session_id]
 
 manager = ConnectionManager()
+app.router.on_shutdown.append(manager.close)
+
+
+class ResponseCache:
+    """
+    Caches encoded JSON responses for a short time, and drops them as soon as the source version changes.
+    """
+    def __init__(self, ttl: float = 2.0) -> None:
+        self.ttl = ttl
+        self._entries: Dict[Any, Tuple[int, float, bytes]] = {}
+
+    def get_or_build(self, key: Any, version: int, build: Callable[[], Any]) -> bytes:
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry and entry[0] == version and now - entry[1] < self.ttl:
+            return entry[2]
+        body = json.dumps(build()).encode()
+        if len(self._entries) > 1024:
+            self._entries.clear()
+        self._entries[key] = (version, now, body)
+        return body
+
+    def response(self, body: bytes) -> Response:
+        return Response(
+            content=body,
+            media_type="application/json",
+            headers={"Cache-Control": f"public, max-age={int(self.ttl)}"},
+        )
+
+
+leaderboard_cache = ResponseCache()
+leaderboard_router = APIRouter(prefix="/leaderboard")
+
+@leaderboard_router.get("/top")
+async def leaderboard_top(limit: int = Query(100, ge=1, le=1000), offset: int = Query(0, ge=0)):
+    body = leaderboard_cache.get_or_build(
+        ("top", limit, offset),
+        leaderboard.version,
+        lambda: {"players": len(leaderboard.best_by_player), "entries": leaderboard.top(limit, offset)},
+    )
+    return leaderboard_cache.response(body)
+
+@leaderboard_router.get("/rank/{player}")
+async def leaderboard_rank(player: str):
+    player = Leaderboard.normalize_player(player) or ""
+    body = leaderboard_cache.get_or_build(("rank", player), leaderboard.version, lambda: leaderboard.player_rank(player))
+    if body == b"null":
+        raise HTTPException(status_code=404, detail="Player has no recorded games")
+    return leaderboard_cache.response(body)
+
+app.include_router(leaderboard_router)
+
+spectator_router = APIRouter()
+
+@spectator_router.get("/spectate/sessions")
+async def spectate_sessions():
+    return [
+        {
+            "sessionId": session_id,
+            "player": manager.players.get(session_id),
+            "score": game_manager.score,
+            "spectators": manager.broadcaster.spectator_count(session_id),
+        }
+        for session_id, game_manager in manager.game_managers.items()
+    ]
+
+@spectator_router.websocket("/ws/spectate/{session_id}")
+async def spectate_endpoint(websocket: WebSocket, session_id: str):
+    await websocket.accept()
+    subscriber = manager.broadcaster.subscribe(session_id)
+    if subscriber is None:
+        await websocket.send_text(json.dumps({"error": "Unknown session"}))
+        await websocket.close(code=1008)
+        return
+
+    # Spectators never send anything; listening only tells us when they leave.
+    receiver = asyncio.ensure_future(websocket.receive())
+    try:
+        while True:
+            getter = asyncio.ensure_future(subscriber.next_frame())
+            done, _ = await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                getter.cancel()
+                if receiver.result()["type"] == "websocket.disconnect":
+                    return
+                receiver = asyncio.ensure_future(websocket.receive())
+                continue
+            frame = getter.result()
+            if frame is None:
+                await websocket.close()
+                return
+            await websocket.send_text(frame)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        receiver.cancel()
+        manager.broadcaster.unsubscribe(session_id, subscriber)
+
+app.include_router(spectator_router)
+
+
+def require_debug_token(
+    x_debug_token: Optional[str] = Header(None),
+    token: Optional[str] = Query(None),
+) -> None:
+    """
+    Guards the debug endpoints: they only exist when GAME_DEBUG_TOKEN is set, and require that token
+    in the X-Debug-Token header or the `token` query parameter.
+    """
+    expected = os.environ.get("GAME_DEBUG_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=404)
+    supplied = x_debug_token or token or ""
+    if not hmac.compare_digest(supplied.encode(), expected.encode()):
+        raise HTTPException(status_code=403, detail="Invalid debug token")
+
+
+debug_router = APIRouter(prefix="/debug", dependencies=[Depends(require_debug_token)])
+_profile_lock = asyncio.Lock()
+
+@debug_router.get("/profile")
+async def debug_profile(
+    seconds: float = Query(5.0, gt=0, le=60),
+    mode: str = Query("pstats", pattern="^(pstats|collapsed)$"),
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|ncalls)$"),
+    interval: float = Query(0.005, ge=0.001, le=1.0),
+):
+    """
+    Profiles the server's event loop for `seconds` while it keeps serving games.
+
+    `pstats` traces every call with cProfile; `collapsed` samples the loop's stack every `interval`
+    seconds and returns collapsed stacks for flame graph tools, at much lower overhead.
+    """
+    if _profile_lock.locked():
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    async with _profile_lock:
+        if mode == "collapsed":
+            sampler = StackSampler(interval=interval)
+            sampler.start()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                sampler.stop()
+            return PlainTextResponse(sampler.collapsed())
+
+        # cProfile traces the calling thread, which is the event loop serving every session
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.disable()
+        return PlainTextResponse(profile_pstats(profiler, sort=sort))
+
+@debug_router.get("/spans")
+async def debug_spans():
+    return spans.snapshot()
+
+@debug_router.post("/spans")
+async def debug_set_spans(enabled: bool = Query(...), reset: bool = Query(False)):
+    """
+    Switches the timing spans on or off, optionally clearing the collected stats.
+    """
+    spans.enabled = enabled
+    if reset:
+        spans.reset()
+    return spans.snapshot()
+
+app.include_router(debug_router)
+
+
+multiplex_router = APIRouter()
+
+async def _read_multiplexed_frames(websocket: WebSocket, connection_id: str, session: MultiplexSession, wakeup: asyncio.Event) -> None:
+    limiter = manager.limiters[connection_id]
+    delay = manager.rate_limiter.mode == RateLimiter.MODE_DELAY
+    while True:
+        data = await websocket.receive_text()
+        for command in session.parse_frame(data):
+            # Every command costs a token, however many share a frame
+            wait = limiter.acquire()
+            while wait and delay:
+                await asyncio.sleep(wait)
+                wait = limiter.acquire()
+            if wait:
+                limiter.rejected += 1
+                session.reject(command, "Rate limit exceeded", retryAfter=round(wait, 3))
+            else:
+                session.enqueue(command)
+                wakeup.set()
+        wakeup.set()
+
+@multiplex_router.websocket("/ws/games")
+async def multiplex_endpoint(websocket: WebSocket):
+    """
+    Plays many games over one socket (see `MultiplexSession`). Each command counts once against the
+    connection's rate limit, which has its own budget (`GAME_MUX_MOVE_RATE`, see `RateLimiter`)
+    rather than that of a single-game socket. Every event-loop tick sends at most one frame: the
+    JSON array of replies to one bounded round of commands.
+    """
+    await websocket.accept()
+    connection_id = manager.register_connection(websocket, multiplexed=True)
+    session = MultiplexSession(
+        manager,
+        connection_id,
+        player=websocket.query_params.get("player"),
+        max_games=int(os.environ.get("GAME_MUX_MAX_GAMES", 10000)),
+    )
+    wakeup = asyncio.Event()
+    reader = asyncio.ensure_future(_read_multiplexed_frames(websocket, connection_id, session, wakeup))
+    try:
+        while True:
+            if not session.pending:
+                wakeup.clear()
+                waiter = asyncio.ensure_future(wakeup.wait())
+                await asyncio.wait({waiter, reader}, return_when=asyncio.FIRST_COMPLETED)
+                waiter.cancel()
+                if reader.done():
+                    reader.result()  # Re-raises whatever ended the reader, usually a disconnect
+                continue
+            with spans.span("ws.mux_round"):
+                replies = session.run_round()
+                await manager.send_text(websocket, "[" + ",".join(replies) + "]")
+            # Let the reader and other connections run before the next round
+            await asyncio.sleep(0)
+    except WebSocketDisconnect:
+        pass
+    except asyncio.TimeoutError:
+        await websocket.close(code=1008, reason="Client is not reading")
+    finally:
+        reader.cancel()
+        session.close()
+        manager.unregister_connection(connection_id)
+
+app.include_router(multiplex_router)
+
+
+simulation_runner = SimulationRunner()
+app.router.on_shutdown.append(simulation_runner.close)
+# Batches tie up the process pool, so they are reserved to holders of the debug token
+simulation_router = APIRouter(prefix="/simulate", dependencies=[Depends(require_debug_token)])
+
+class SimulationRequest(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    policy: str = "random"
+    size: int = Field(4, ge=2, le=8)
+    seeds: List[int] = Field(..., min_length=1, max_length=100_000)
+    max_moves: Optional[int] = Field(None, ge=1, alias="maxMoves")
+    chunk_size: int = Field(32, ge=1, le=10_000, alias="chunkSize")
+
+@simulation_router.post("")
+async def simulate(request: SimulationRequest):
+    """
+    Plays a batch of headless games on the process pool, streaming one NDJSON line per game
+    (seed, score, maxTile, moves, wallMs) as games complete. The job id is returned in the
+    X-Job-Id header; a cancelled job ends with a `{"cancelled": true, ...}` line and a failed one
+    with an `{"error": ..., ...}` line. Requires the debug token (see `require_debug_token`).
+    """
+    try:
+        job = simulation_runner.create_job(
+            request.policy, request.seeds, size=request.size, max_moves=request.max_moves, chunk_size=request.chunk_size
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def stream():
+        # Closed explicitly so a disconnect stops the job and unregisters it right away
+        async with contextlib.aclosing(simulation_runner.results(job)) as chunks:
+            try:
+                async for results in chunks:
+                    yield "".join(json.dumps(result) + "\n" for result in results)
+            except Exception as e:
+                logger.error(f"Simulation job {job.job_id} failed: {e!r}")
+                yield json.dumps({"error": f"Simulation failed: {type(e).__name__}", "completed": job.completed}) + "\n"
+                return
+        if job.cancelled.is_set():
+            yield json.dumps({"cancelled": True, "completed": job.completed}) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson", headers={"X-Job-Id": job.job_id})
+
+@simulation_router.get("/jobs")
+async def simulation_jobs():
+    return [job.serialize() for job in simulation_runner.jobs.values()]
+
+@simulation_router.delete("/{job_id}")
+async def cancel_simulation(job_id: str):
+    if not simulation_runner.cancel(job_id):
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return {"jobId": job_id, "cancelled": True}
+
+app.include_router(simulation_router)
+
+
+replay_verifier = ReplayVerifier()
+app.router.on_shutdown.append(replay_verifier.close)
+verification_router = APIRouter(prefix="/verify")
+
+class VerificationRequest(BaseModel):
+    records: List[Dict[str, Any]] = Field(..., min_length=1, max_length=100_000)
+
+@verification_router.post("")
+async def verify_records(request: VerificationRequest):
+    """
+    Replays submitted game records on the process pool and checks every move, spawn and the
+    claimed score. Returns one result per record, in order (see `game_backend.replay`).
+    """
+    results = await replay_verifier.verify_async(request.records)
+    return {"valid": sum(result["valid"] for result in results), "results": results}
+
+app.include_router(verification_router)
 
 @app.websocket("/ws/game")
 async def game_endpoint(websocket: WebSocket):
     # Allow any origin for WebSocket connections
     await websocket.accept()
-    session_id = await manager.connect(websocket)
+    session_id = await manager.connect(websocket, player=websocket.query_params.get("player"))
     game_manager = manager.get_game_manager(session_id)
+    # Clients connecting with ?timing=1 get the server-side time of each reply as `serverMs`
+    timing = websocket.query_params.get("timing") == "1"
     try:
         # Send initial game state
-        await websocket.send_text(json.dumps(game_manager.get_grid_state()))
+        await manager.send_state(session_id, websocket)
 
         while True:
             data = await websocket.receive_text()
-            message = json.loads(data)
-            direction = message.get("direction")
-            if direction in [0, 1, 2, 3]:
-                game_manager.play_turn(direction)
-                state = game_manager.get_grid_state()
-                await websocket.send_text(json.dumps(state))
-                if game_manager.is_game_terminated():
-                    await websocket.close()
-                    break
-            else:
-                await websocket.send_text(json.dumps({"error": "Invalid move"}))
+            received = time.perf_counter() if timing else None
+            if not await manager.admit(session_id, websocket):
+                continue
+            with spans.span("ws.frame"):
+                message = json.loads(data)
+                if message.get("undo") is True or message.get("redo") is True:
+                    await manager.step_history(session_id, websocket, undo=message.get("undo") is True, received=received)
+                    continue
+                direction = message.get("direction")
+                if direction in [0, 1, 2, 3]:
+                    manager.play_turn(session_id, direction)
+                    await manager.send_state(session_id, websocket, received)
+                    if game_manager.is_game_terminated():
+                        manager.finish_game(session_id)
+                        await websocket.close()
+                        break
+                else:
+                    await manager.send_text(websocket, json.dumps({"error": "Invalid move"}))
     except WebSocketDisconnect:
+        pass
+    except asyncio.TimeoutError:
+        # The client stopped reading replies; drop it rather than buffering for it.
+        await websocket.close(code=1008, reason="Client is not reading")
+    finally:
         manager.disconnect(session_id)
 
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+from typing import Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class Subscriber:
+    """
+    A spectator's bounded queue of encoded frames.
+
+    When the queue is full the oldest frame is dropped, so a slow viewer skips intermediate
+    states and always catches up to the latest one instead of holding up the publisher.
+    """
+    def __init__(self, max_frames: int = 4) -> None:
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_frames)
+        self.dropped: int = 0
+
+    def offer(self, frame: Optional[str]) -> None:
+        """
+        Enqueues a frame without blocking. `None` marks the end of the session.
+        """
+        while True:
+            try:
+                self.queue.put_nowait(frame)
+                return
+            except asyncio.QueueFull:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except asyncio.QueueEmpty:
+                    pass
+
+    async def next_frame(self) -> Optional[str]:
+        return await self.queue.get()
+
+
+class Channel:
+    """
+    Fan-out point for one game session.
+    """
+    def __init__(self) -> None:
+        self.subscribers: Set[Subscriber] = set()
+        self.last_frame: Optional[str] = None
+
+
+class Broadcaster:
+    """
+    Pushes each session's encoded state to its spectators.
+
+    A frame is encoded once by the publisher and the same string is handed to every subscriber queue.
+    """
+    def __init__(self, max_frames: int = 4) -> None:
+        """
+        Initializes the Broadcaster.
+
+        Args:
+            max_frames (int): Per-subscriber queue size. Defaults to 4.
+        """
+        self.max_frames = max_frames
+        self.channels: Dict[str, Channel] = {}
+
+    def open(self, session_id: str) -> None:
+        self.channels.setdefault(session_id, Channel())
+
+    def publish(self, session_id: str, frame: str) -> None:
+        """
+        Publishes an encoded frame to every subscriber of a session. Never blocks.
+
+        Args:
+            session_id (str): The session the frame belongs to.
+            frame (str): The encoded game state.
+        """
+        channel = self.channels.get(session_id)
+        if channel is None:
+            return
+        channel.last_frame = frame
+        for subscriber in channel.subscribers:
+            subscriber.offer(frame)
+
+    def close(self, session_id: str) -> None:
+        """
+        Ends a session's channel and tells its subscribers no more frames will come.
+        """
+        channel = self.channels.pop(session_id, None)
+        if channel is None:
+            return
+        for subscriber in channel.subscribers:
+            subscriber.offer(None)
+
+    def subscribe(self, session_id: str) -> Optional[Subscriber]:
+        """
+        Subscribes to a session, primed with its latest frame.
+
+        Returns:
+            Optional[Subscriber]: The subscriber, or None if the session does not exist.
+        """
+        channel = self.channels.get(session_id)
+        if channel is None:
+            return None
+        subscriber = Subscriber(self.max_frames)
+        if channel.last_frame is not None:
+            subscriber.offer(channel.last_frame)
+        channel.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, session_id: str, subscriber: Subscriber) -> None:
+        channel = self.channels.get(session_id)
+        if channel is not None:
+            channel.subscribers.discard(subscriber)
+
+    def spectator_count(self, session_id: str) -> int:
+        channel = self.channels.get(session_id)
+        return len(channel.subscribers) if channel else 0
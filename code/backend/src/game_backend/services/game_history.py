@@ -0,0 +1,146 @@
+from array import array
+from typing import Optional, Tuple
+
+from game_backend.core import bit_backend
+
+# Layout of the per-state flags byte: the move that led to the state and whether the game was won in it
+_DIRECTION_MASK = 0x3
+_WON = 1 << 2
+
+
+class GameHistory:
+    """
+    Compact undo/redo history of one game.
+
+    Each state is stored as its packed board (see `bit_backend`) in an `array`-backed ring buffer,
+    together with a flags byte holding the direction that led to it and whether the game was won in
+    it. Scores are not stored: the score gained by a move is recomputed from the previous board and
+    the direction, so a 4x4 state costs 9 bytes and a 10,000-move history about 90 KB. Undo and redo
+    are O(1); once `depth` moves are recorded the oldest states are overwritten.
+    """
+    def __init__(self, size: int = 4, depth: int = 10000) -> None:
+        """
+        Initializes the GameHistory.
+
+        Args:
+            size (int): Board size.
+            depth (int): Maximum number of moves that can be undone.
+        """
+        if depth < 1:
+            raise ValueError("History depth must be at least 1")
+        self.size = size
+        self.depth = depth
+        # Boards larger than 4x4 do not fit in one 64-bit word and are split across several
+        self._words = max(1, (size * size + 15) // 16)
+        # Buffers grow with the game up to `depth + 1` states, then wrap around
+        self._boards = array('Q')
+        self._flags = array('B')
+        # Absolute state indices; state i lives in slot i % capacity
+        self._start = 0
+        self._cursor = 0
+        self._end = 0
+
+    def _write(self, index: int, board: int, flags: int) -> None:
+        slot = index % (self.depth + 1)
+        offset = slot * self._words
+        if offset == len(self._boards):
+            self._boards.extend([0] * self._words)
+            self._flags.append(0)
+        for word in range(self._words):
+            self._boards[offset + word] = (board >> (64 * word)) & 0xFFFFFFFFFFFFFFFF
+        self._flags[slot] = flags
+
+    def _board(self, index: int) -> int:
+        offset = (index % (self.depth + 1)) * self._words
+        board = 0
+        for word in range(self._words):
+            board |= self._boards[offset + word] << (64 * word)
+        return board
+
+    def _flags_of(self, index: int) -> int:
+        return self._flags[index % (self.depth + 1)]
+
+    def reset(self, board: int, won: bool = False) -> None:
+        """
+        Forgets all history and starts from `board`.
+        """
+        self._start = self._cursor = self._end = 0
+        self._write(0, board, _WON if won else 0)
+
+    def record(self, direction: int, board: int, won: bool = False) -> None:
+        """
+        Records a played move and the board it produced (spawned tile included), discarding any redo states.
+
+        Raises:
+            ValueError: If `board` is not the move applied to the current board plus one spawned 2 or 4.
+        """
+        moved, _ = bit_backend.move(self.board, direction, self.size)
+        spawned = moved ^ board
+        cell = max(0, spawned.bit_length() - 1) // 4
+        exponent = spawned >> (4 * cell)
+        if exponent not in (1, 2) or spawned != exponent << (4 * cell) or moved & (0xF << (4 * cell)):
+            raise ValueError("Board is not the recorded move plus one spawned tile")
+
+        self._cursor += 1
+        self._end = self._cursor
+        if self._end - self._start > self.depth:
+            self._start += 1
+        self._write(self._cursor, board, direction | (_WON if won else 0))
+
+    def can_undo(self) -> bool:
+        return self._cursor > self._start
+
+    def can_redo(self) -> bool:
+        return self._cursor < self._end
+
+    @property
+    def board(self) -> int:
+        return self._board(self._cursor)
+
+    @property
+    def won(self) -> bool:
+        """
+        Whether the game was won in the state at the cursor.
+        """
+        return bool(self._flags_of(self._cursor) & _WON)
+
+    def undo(self) -> Optional[Tuple[int, int]]:
+        """
+        Steps back one move.
+
+        Returns:
+            Optional[Tuple[int, int]]: The previous board and the score the undone move had gained, or None if there is nothing to undo.
+        """
+        if not self.can_undo():
+            return None
+        direction = self._flags_of(self._cursor) & _DIRECTION_MASK
+        self._cursor -= 1
+        board = self._board(self._cursor)
+        _, gained = bit_backend.move(board, direction, self.size)
+        return board, gained
+
+    def redo(self) -> Optional[Tuple[int, int]]:
+        """
+        Steps forward one undone move.
+
+        Returns:
+            Optional[Tuple[int, int]]: The next board and the score the move gains, or None if there is nothing to redo.
+        """
+        if not self.can_redo():
+            return None
+        direction = self._flags_of(self._cursor + 1) & _DIRECTION_MASK
+        _, gained = bit_backend.move(self._board(self._cursor), direction, self.size)
+        self._cursor += 1
+        return self._board(self._cursor), gained
+
+    def __len__(self) -> int:
+        return self._cursor - self._start
+
+    def memory_usage(self) -> int:
+        """
+        Bytes used by the history buffers.
+        """
+        return (
+            self._boards.buffer_info()[1] * self._boards.itemsize
+            + self._flags.buffer_info()[1] * self._flags.itemsize
+        )
@@ -1,11 +1,15 @@
+import json
 import random
 from typing import Type, Optional, Dict, Any
 import logging
 
 
+from game_backend.core import bit_backend
 from game_backend.interface.grid import Grid
 from game_backend.interface.tile import Tile
+from game_backend.services.game_history import GameHistory
 from game_backend.services.local_storage_manager import LocalStorageManager
+from game_backend.services.profiling import spans
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -22,7 +26,8 @@ class GameManager:
             grid: Grid,
             tile_class: Type[Tile],
             storage_manager: LocalStorageManager,
-            start_tiles: int = 2
+            start_tiles: int = 2,
+            history_depth: int = 10000
         ) -> None:
         """
         Initializes the GameManager.
@@ -32,6 +37,7 @@ class GameManager:
             tile_class (Type[Tile]): The Tile class to instantiate tiles.
             storage_manager (LocalStorageManager): Manages game state persistence.
             start_tiles (int): Number of tiles to start the game with. Defaults to 2.
+            history_depth (int): Number of moves that can be undone. Defaults to 10000.
         """
         self.grid: Grid = grid
         self.tile_class: Type[Tile] = tile_class
@@ -40,10 +46,22 @@ class GameManager:
 
         self.start_tiles: int = start_tiles
         self.score: int = 0
+        self.moves: int = 0
         self.over: bool = False
         self.won: bool = False
         self.keep_playing: bool = False
 
+        # Serialized state is computed at most once per state version and shared by storage and every send
+        self.state_version: int = 0
+        self._state_cache_version: int = -1
+        self._state_cache: Optional[Dict[str, Any]] = None
+        self._state_json: Optional[str] = None
+        self._stored_version: int = -1
+
+        self.history_depth: int = history_depth
+        self.history: Optional[GameHistory] = None
+        self.used_undo: bool = False  # Undo lets a player reroll spawns, so such games are not ranked
+
         # # Event bindings
         # self.input_manager.on("move", self.move)
         # self.input_manager.on("restart", self.restart)
@@ -64,6 +82,7 @@ class GameManager:
         Allows the player to continue playing after winning.
         """
         self.keep_playing = True
+        self.invalidate_state()
         # self.actuator.continue_game()  # Clear the game won/lost message
 
     def is_game_terminated(self) -> bool:
@@ -84,18 +103,23 @@ class GameManager:
         if previous_state:
             self.grid = self._initialize_grid_from_state(previous_state['grid'])
             self.score = previous_state['score']
+            self.moves = previous_state.get('moves', 0)
             self.over = previous_state['over']
             self.won = previous_state['won']
             self.keep_playing = previous_state['keepPlaying']
         else:
             self.grid = self.grid.__class__(self.size)
             self.score = 0
+            self.moves = 0
             self.over = False
             self.won = False
             self.keep_playing = False
 
             self.add_start_tiles()
 
+        self.used_undo = False
+        self._reset_history()
+        self.invalidate_state()
         self.actuate()
 
     def add_start_tiles(self) -> None:
@@ -112,6 +136,7 @@ class GameManager:
             tile = self.tile_class(position, value)
             self.grid.insert_tile(tile)
 
+    @spans.timed("game.play_turn")
     def play_turn(self, direction: int) -> None:
         """
         Executes a move in the specified direction.
@@ -125,13 +150,80 @@ class GameManager:
         moved = self._move(direction)
 
         if moved:
+            self.moves += 1
             # Temprarily disabled adding random tile after each move for testing
             self.add_random_tile()
             if not self.moves_available():
                 self.over = True
+            if self.history is not None:
+                self._record_history(direction)
+            self.invalidate_state()
 
         self.actuate()
 
+    def _reset_history(self) -> None:
+        try:
+            board = bit_backend.encode_grid(self.grid)
+        except ValueError:
+            # Tiles beyond what a packed board can hold; undo is unavailable for this game
+            self.history = None
+            return
+        if self.history is None or self.history.size != self.size:
+            self.history = GameHistory(size=self.size, depth=self.history_depth)
+        self.history.reset(board, self.won)
+
+    def _record_history(self, direction: int) -> None:
+        try:
+            self.history.record(direction, bit_backend.encode_grid(self.grid), self.won)
+        except ValueError:
+            logger.warning("Board no longer fits the packed history; undo disabled for this game.")
+            self.history = None
+
+    def _restore_board(self, board: int) -> None:
+        self.grid = self.grid.__class__(self.size)
+        for x, column in enumerate(bit_backend.decode_values(board, self.size)):
+            for y, value in enumerate(column):
+                if value:
+                    self.grid.insert_tile(self.tile_class((x, y), value))
+        # `over` follows from the board as in play_turn; `won` only from a merge into 2048, so it is kept in the history
+        self.over = not bit_backend.can_move(board, self.size)
+        self.won = self.history.won
+        self.invalidate_state()
+        self.actuate()
+
+    def undo(self) -> bool:
+        """
+        Reverts the last move, spawned tile included.
+
+        Returns:
+            bool: True if a move was undone, False if there is nothing to undo.
+        """
+        step = self.history.undo() if self.history is not None else None
+        if step is None:
+            return False
+        board, gained = step
+        self.score -= gained
+        self.moves -= 1
+        self.used_undo = True
+        self._restore_board(board)
+        return True
+
+    def redo(self) -> bool:
+        """
+        Replays the last undone move, with the same spawned tile.
+
+        Returns:
+            bool: True if a move was redone, False if there is nothing to redo.
+        """
+        step = self.history.redo() if self.history is not None else None
+        if step is None:
+            return False
+        board, gained = step
+        self.score += gained
+        self.moves += 1
+        self._restore_board(board)
+        return True
+
     @staticmethod
     def get_vector(direction: int) -> tuple:
         """
@@ -208,7 +300,28 @@ class GameManager:
             bool: True if moves are available, False otherwise.
         """
         return self.grid.cells_available() or self.tile_matches_available()
+
+    def max_tile(self) -> int:
+        """
+        Finds the highest tile value on the grid.
+
+        Returns:
+            int: The highest tile value, or 0 if the grid is empty.
+        """
+        best = 0
+        for x in range(self.size):
+            for y in range(self.size):
+                tile = self.grid.cell_content((x, y))
+                if tile and tile.value > best:
+                    best = tile.value
+        return best
     
+    def packed_board(self) -> int:
+        """
+        Packs the grid into a `bit_backend` board.
+        """
+        return bit_backend.encode_grid(self.grid)
+
     def tile_matches_available(self) -> bool:
         """
         Checks if there are any tiles that can be merged.
@@ -264,17 +377,30 @@ class GameManager:
                     tile.merged_from = None
                     tile.save_position()
 
+    @spans.timed("game.actuate")
     def actuate(self) -> None:
         """
         Updates the storage with the current game state and score.
+
+        Nothing is written if the state has not changed since the last call.
         """
+        if self._stored_version == self.state_version:
+            return
+        self._stored_version = self.state_version
+
         if self.storage_manager.get_best_score() < self.score:
             self.storage_manager.set_best_score(self.score)
 
         if self.over:
             self.storage_manager.clear_game_state()
         else:
-            self.storage_manager.set_game_state(self.serialize())
+            self.storage_manager.set_game_state_json(self.get_state_json())
+
+    def invalidate_state(self) -> None:
+        """
+        Marks the cached serialized state as stale. Must be called after every mutation of the game state.
+        """
+        self.state_version += 1
 
 
     def serialize(self) -> Dict[str, Any]:
@@ -287,6 +413,7 @@ class GameManager:
         return {
             'grid': self.grid.serialize(),
             'score': self.score,
+            'moves': self.moves,
             'over': self.over,
             'won': self.won,
             'keepPlaying': self.keep_playing
@@ -296,10 +423,28 @@ class GameManager:
         """
         Retrieves the current game state.
 
+        The result is cached until the next state change and shared between callers, so it must not be mutated.
+
         Returns:
             Dict[str, Any]: Current game state.
         """
-        return self.serialize()
+        if self._state_cache_version != self.state_version:
+            self._state_cache = self.serialize()
+            self._state_json = None
+            self._state_cache_version = self.state_version
+        return self._state_cache
+
+    def get_state_json(self) -> str:
+        """
+        Retrieves the current game state encoded as JSON, as stored and sent over the wire.
+
+        Returns:
+            str: JSON-encoded game state, cached until the next state change.
+        """
+        state = self.get_grid_state()
+        if self._state_json is None:
+            self._state_json = json.dumps(state)
+        return self._state_json
     
     def _initialize_grid_from_state(self, grid_state: Dict[str, Any]) -> Grid:
         """
@@ -0,0 +1,196 @@
+import json
+import logging
+import time
+from bisect import bisect_left, insort
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class GameRecord:
+    """
+    A finished game as stored on the leaderboard.
+    """
+    __slots__ = ("player", "score", "max_tile", "moves", "finished_at", "seq")
+
+    def __init__(self, player: str, score: int, max_tile: int, moves: int, finished_at: float, seq: int) -> None:
+        self.player = player
+        self.score = score
+        self.max_tile = max_tile
+        self.moves = moves
+        self.finished_at = finished_at
+        self.seq = seq  # Insertion order, breaks ties in favour of whoever got the score first
+
+    @property
+    def rank_key(self) -> Tuple[int, int]:
+        return (-self.score, self.seq)
+
+    def serialize(self) -> Dict[str, Any]:
+        return {
+            "player": self.player,
+            "score": self.score,
+            "maxTile": self.max_tile,
+            "moves": self.moves,
+            "finishedAt": self.finished_at,
+        }
+
+
+class Leaderboard:
+    """
+    Global leaderboard of finished games.
+
+    Every recorded game is appended to a JSON lines file, created with the first game and replayed
+    once at startup.
+    Reads are served from memory only: a dict of per-player bests and a list of their rank keys
+    kept sorted, so top-N is a slice and a player's rank is a binary search.
+    """
+    MAX_PLAYER_NAME_LENGTH = 32
+
+    def __init__(self, storage_file: str = 'leaderboard.jsonl') -> None:
+        """
+        Initializes the Leaderboard and loads previously recorded games.
+
+        Args:
+            storage_file (str): The path to the JSON lines file used for persistent storage.
+                                Defaults to 'leaderboard.jsonl'.
+        """
+        self.storage_path: Path = Path(storage_file)
+        self.best_by_player: Dict[str, GameRecord] = {}
+        self._ranked: List[Tuple[int, int, str]] = []  # (-score, seq, player), ascending
+        self.games_recorded: int = 0
+        self.version: int = 0  # Bumped on every change that can alter query results
+        self.persistent: bool = True
+
+        self._load_storage()
+
+    @classmethod
+    def normalize_player(cls, player: Optional[str]) -> Optional[str]:
+        """
+        Validates a player name.
+
+        Returns:
+            Optional[str]: The stripped name, or None if it is empty or too long.
+        """
+        if not player:
+            return None
+        player = player.strip()
+        if not player or len(player) > cls.MAX_PLAYER_NAME_LENGTH:
+            return None
+        return player
+
+    def _load_storage(self) -> None:
+        """
+        Rebuilds the in-memory index from the storage file, if there is one yet.
+        """
+        try:
+            if not self.storage_path.exists():
+                return
+            with self.storage_path.open("r") as f:
+                for line_number, line in enumerate(f, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = json.loads(line)
+                        self._index(
+                            entry["player"], int(entry["score"]), int(entry["maxTile"]),
+                            int(entry["moves"]), float(entry["finishedAt"]),
+                        )
+                    except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+                        logger.error(f"Skipping invalid leaderboard entry on line {line_number}: {e}")
+            logger.info(f"Leaderboard loaded: {self.games_recorded} games, {len(self.best_by_player)} players.")
+        except IOError as e:
+            logger.warning(f"Leaderboard storage not available, using in-memory storage: {e}")
+            self.persistent = False
+
+    def _append_storage(self, record: GameRecord) -> None:
+        """
+        Appends a single record to the storage file, creating it with the first record.
+        """
+        if not self.persistent:
+            return
+        try:
+            self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.storage_path.open("a") as f:
+                f.write(json.dumps(record.serialize()) + "\n")
+        except IOError as e:
+            logger.error(f"Error saving leaderboard entry: {e}")
+
+    def _index(self, player: str, score: int, max_tile: int, moves: int, finished_at: float) -> GameRecord:
+        record = GameRecord(player, score, max_tile, moves, finished_at, self.games_recorded)
+        self.games_recorded += 1
+
+        previous = self.best_by_player.get(player)
+        if previous is None or score > previous.score:
+            if previous is not None:
+                index = bisect_left(self._ranked, (*previous.rank_key, player))
+                del self._ranked[index]
+            self.best_by_player[player] = record
+            insort(self._ranked, (*record.rank_key, player))
+            self.version += 1
+        return record
+
+    def record_game(self, player: str, score: int, max_tile: int, moves: int) -> Optional[GameRecord]:
+        """
+        Records a finished game.
+
+        Args:
+            player (str): The player name.
+            score (int): Final score.
+            max_tile (int): Highest tile value reached.
+            moves (int): Number of moves played.
+
+        Returns:
+            Optional[GameRecord]: The stored record, or None if the player name is invalid.
+        """
+        player = self.normalize_player(player)
+        if player is None:
+            return None
+        record = self._index(player, score, max_tile, moves, time.time())
+        self._append_storage(record)
+        return record
+
+    def top(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Returns the best game of each of the top players.
+
+        Args:
+            limit (int): Maximum number of entries.
+            offset (int): Number of entries to skip.
+
+        Returns:
+            List[Dict[str, Any]]: Ranked entries, best first.
+        """
+        entries = []
+        for _, _, player in self._ranked[offset:offset + limit]:
+            record = self.best_by_player[player]
+            entries.append({"rank": self.rank_of_score(record.score), **record.serialize()})
+        return entries
+
+    def rank_of_score(self, score: int) -> int:
+        """
+        Returns the rank a score would have: one more than the number of players with a strictly higher best.
+        """
+        return bisect_left(self._ranked, (-score,)) + 1
+
+    def player_rank(self, player: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns a player's rank and best game.
+
+        Args:
+            player (str): The player name.
+
+        Returns:
+            Optional[Dict[str, Any]]: The ranked entry, or None if the player has no recorded game.
+        """
+        player = self.normalize_player(player)
+        record = self.best_by_player.get(player) if player else None
+        if record is None:
+            return None
+        return {
+            "rank": self.rank_of_score(record.score),
+            "players": len(self._ranked),
+            **record.serialize(),
+        }
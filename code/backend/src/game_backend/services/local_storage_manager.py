@@ -3,6 +3,8 @@ import logging
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+from game_backend.services.profiling import spans
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -75,6 +77,7 @@ class LocalStorageManager:
             logger.error(f"Error loading storage: {e}")
             self._data = {}
 
+    @spans.timed("storage.save")
     def _save_storage(self) -> None:
         """
         Saves the internal dictionary data to the storage file.
@@ -133,15 +136,44 @@ class LocalStorageManager:
             game_state (Dict[str, Any]): The game state to store.
         """
         try:
-            self._data[self.game_state_key] = json.dumps(game_state)
-            self._save_storage()
+            self.set_game_state_json(json.dumps(game_state))
         except (TypeError, ValueError) as e:
             logger.error(f"Error encoding game state: {e}")
 
+    def set_game_state_json(self, game_state_json: str) -> None:
+        """
+        Sets the current game state in storage from an already encoded JSON string.
+
+        Args:
+            game_state_json (str): The JSON-encoded game state to store.
+        """
+        self._data[self.game_state_key] = game_state_json
+        self._save_storage()
+
     def clear_game_state(self) -> None:
         """
         Clears the current game state from storage.
         """
         if self.game_state_key in self._data:
             del self._data[self.game_state_key]
-            self._save_storage()
\ No newline at end of file
+            self._save_storage()
+
+class MemoryStorageManager(LocalStorageManager):
+    """
+    Storage kept only in memory, for games that are never resumed (e.g. the games of a
+    multiplexed connection): nothing is read from or written to disk.
+    """
+    def __init__(self) -> None:
+        """
+        Initializes the MemoryStorageManager.
+        """
+        self.best_score_key: str = self.KEY_BEST_SCORE
+        self.game_state_key: str = self.KEY_GAME_STATE
+        self.storage_path: Optional[Path] = None
+        self._data: Dict[str, Any] = {}
+
+    def local_storage_supported(self) -> bool:
+        return False
+
+    def _save_storage(self) -> None:
+        pass
@@ -0,0 +1,197 @@
+import json
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Union
+
+OPERATIONS = ("create", "move", "undo", "redo", "close")
+
+
+class MultiplexSession:
+    """
+    Many games driven over one WebSocket connection.
+
+    Commands are frames (or JSON arrays of up to `max_frame_commands` frames) carrying a
+    client-chosen game `id` and an `op`: `create`, `move` (with a `direction`), `undo`, `redo` or
+    `close`. Each game has its own command queue, and `run_round` takes at most one command per game
+    in round-robin order, so one busy game cannot starve the others. A round stops early once it has
+    run `round_commands` commands or for `round_seconds`, and the next one carries on with the games
+    that were skipped, so one connection never holds the event loop for long. The replies of a round
+    are sent together as one JSON array frame.
+
+    Games are registered with the `ConnectionManager` under `<connection id>/<game id>`, so
+    spectating, the leaderboard and dataset recording work as for single-game sockets.
+    """
+    def __init__(
+        self,
+        manager,
+        connection_id: str,
+        player: Optional[str] = None,
+        max_games: int = 10000,
+        max_queued: int = 100000,
+        max_frame_commands: int = 256,
+        round_commands: int = 256,
+        round_seconds: float = 0.005,
+    ) -> None:
+        """
+        Initializes the MultiplexSession.
+
+        Args:
+            manager (ConnectionManager): The server's connection manager.
+            connection_id (str): Id of the registered connection.
+            player (Optional[str]): Player name recorded on the leaderboard for every game of the connection.
+            max_games (int): Games the connection may have open at once.
+            max_queued (int): Commands that may wait across all games before new ones are rejected.
+            max_frame_commands (int): Commands one frame may carry; larger frames are rejected whole.
+            round_commands (int): Commands run at most per round.
+            round_seconds (float): Time after which a round stops taking further commands.
+        """
+        self.manager = manager
+        self.connection_id = connection_id
+        self.player = player
+        self.max_games = max_games
+        self.max_queued = max_queued
+        self.max_frame_commands = max_frame_commands
+        self.round_commands = round_commands
+        self.round_seconds = round_seconds
+        self.queued: int = 0
+        self.games: Dict[str, str] = {}  # Game id -> session id
+        self.queues: Dict[str, Deque[Dict[str, Any]]] = {}
+        self.ready: Deque[str] = deque()
+        self.errors: List[str] = []
+
+    def _session_id(self, game_id: str) -> str:
+        return f"{self.connection_id}/{game_id}"
+
+    def _error(self, message: str, reply_id: Union[str, int, None] = None) -> str:
+        if reply_id is None:
+            return json.dumps({"error": message})
+        return json.dumps({"id": reply_id, "error": message})
+
+    def parse_frame(self, data: str) -> List[Dict[str, Any]]:
+        """
+        Parses a frame into its commands, queueing an error reply for anything malformed.
+        """
+        try:
+            message = json.loads(data)
+        except json.JSONDecodeError:
+            self.errors.append(self._error("Invalid JSON"))
+            return []
+        commands = message if isinstance(message, list) else [message]
+        if len(commands) > self.max_frame_commands:
+            self.errors.append(self._error(f"At most {self.max_frame_commands} commands per frame"))
+            return []
+        valid = []
+        for command in commands:
+            if not isinstance(command, dict) or not isinstance(command.get("id"), (str, int)):
+                self.errors.append(self._error("Every command needs an id"))
+                continue
+            valid.append(command)
+        return valid
+
+    def reject(self, command: Dict[str, Any], message: str, **details: Any) -> None:
+        """
+        Answers a parsed command with an error instead of running it.
+        """
+        self.errors.append(json.dumps({"id": command["id"], "error": message, **details}))
+
+    def enqueue(self, command: Dict[str, Any]) -> None:
+        """
+        Queues a parsed command on its game.
+        """
+        if self.queued >= self.max_queued:
+            self.reject(command, "Too many queued commands")
+            return
+        game_id = str(command["id"])
+        queue = self.queues.get(game_id)
+        if queue is None:
+            queue = self.queues[game_id] = deque()
+        if not queue:
+            self.ready.append(game_id)
+        queue.append(command)
+        self.queued += 1
+
+    @property
+    def pending(self) -> bool:
+        return bool(self.ready or self.errors)
+
+    def run_round(self) -> List[str]:
+        """
+        Runs one command for every game with queued commands, within the round's budget.
+
+        Returns:
+            List[str]: The encoded replies of the round, including errors since the last round.
+        """
+        replies, self.errors = self.errors, []
+        deadline = time.perf_counter() + self.round_seconds
+        for count in range(min(len(self.ready), self.round_commands)):
+            if count and time.perf_counter() >= deadline:
+                break
+            game_id = self.ready.popleft()
+            queue = self.queues[game_id]
+            self.queued -= 1
+            replies.append(self._execute(game_id, queue.popleft()))
+            if queue:
+                self.ready.append(game_id)
+            else:
+                del self.queues[game_id]
+        return replies
+
+    def _state_reply(self, reply_id: Union[str, int], session_id: str) -> str:
+        frame = self.manager.game_managers[session_id].get_state_json()
+        self.manager.broadcaster.publish(session_id, frame)
+        # The cached state JSON is spliced in rather than decoded and re-encoded
+        return f'{{"id": {json.dumps(reply_id)}, "state": {frame}}}'
+
+    def _execute(self, game_id: str, command: Dict[str, Any]) -> str:
+        # Game ids are keyed as strings but echoed back as the client sent them
+        reply_id = command["id"]
+        op = command.get("op", "move" if "direction" in command else None)
+        if op not in OPERATIONS:
+            return self._error("Unknown op", reply_id)
+        session_id = self.games.get(game_id)
+
+        if op == "create":
+            if session_id is not None:
+                return self._error("Game already exists", reply_id)
+            if len(self.games) >= self.max_games:
+                return self._error("Too many games", reply_id)
+            session_id = self._session_id(game_id)
+            # Multiplexed games are never resumed, so they are kept off the disk
+            self.manager.open_game(session_id, self.player, persistent=False)
+            self.games[game_id] = session_id
+            return self._state_reply(reply_id, session_id)
+
+        if session_id is None:
+            return self._error("Unknown game", reply_id)
+
+        if op == "close":
+            self.manager.close_game(self.games.pop(game_id))
+            return json.dumps({"id": reply_id, "closed": True})
+
+        game_manager = self.manager.game_managers[session_id]
+        if op == "move":
+            direction = command.get("direction")
+            if direction not in (0, 1, 2, 3):
+                return self._error("Invalid move", reply_id)
+            if game_manager.is_game_terminated():
+                return self._error("Game is over", reply_id)
+            self.manager.play_turn(session_id, direction)
+            if game_manager.is_game_terminated():
+                self.manager.finish_game(session_id)
+            return self._state_reply(reply_id, session_id)
+
+        stepped = game_manager.undo() if op == "undo" else game_manager.redo()
+        if not stepped:
+            return self._error(f"Nothing to {op}", reply_id)
+        return self._state_reply(reply_id, session_id)
+
+    def close(self) -> None:
+        """
+        Closes every game of the connection.
+        """
+        for session_id in self.games.values():
+            self.manager.close_game(session_id)
+        self.games.clear()
+        self.queues.clear()
+        self.ready.clear()
+        self.queued = 0
@@ -0,0 +1,178 @@
+import cProfile
+import functools
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class SpanStats:
+    """
+    Running count, total and maximum duration of one named span.
+    """
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+
+    def add(self, elapsed: float) -> None:
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+    def serialize(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "totalMs": round(self.total * 1000, 3),
+            "meanMs": round(self.total * 1000 / self.count, 4) if self.count else 0.0,
+            "maxMs": round(self.max * 1000, 3),
+        }
+
+
+class _Span:
+    """
+    One timed run of a span; records its duration on exit.
+    """
+    __slots__ = ("recorder", "name", "start")
+
+    def __init__(self, recorder: "SpanRecorder", name: str) -> None:
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        self.recorder.record(self.name, time.perf_counter() - self.start)
+
+
+# Shared by every disabled span; nullcontext holds no state, so it can be entered any number of times at once
+_DISABLED_SPAN = nullcontext()
+
+
+class SpanRecorder:
+    """
+    Named timing spans around hot-path stages, switchable at runtime.
+
+    While disabled, a span costs one attribute check and returns a shared no-op context manager. Set `GAME_PROFILE_SPANS=1` to enable spans at startup.
+    """
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.stats: Dict[str, SpanStats] = {}
+
+    def record(self, name: str, elapsed: float) -> None:
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = SpanStats()
+        stats.add(elapsed)
+
+    def span(self, name: str) -> ContextManager[None]:
+        """
+        Times the enclosed block under `name` if spans are enabled.
+        """
+        if not self.enabled:
+            return _DISABLED_SPAN
+        return _Span(self, name)
+
+    def timed(self, name: str) -> Callable[[F], F]:
+        """
+        Decorator timing every call of a function under `name` if spans are enabled.
+        """
+        def decorator(function: F) -> F:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def reset(self) -> None:
+        self.stats = {}
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "spans": {name: stats.serialize() for name, stats in sorted(self.stats.items())},
+        }
+
+
+spans = SpanRecorder(enabled=os.environ.get("GAME_PROFILE_SPANS", "") not in ("", "0"))
+
+
+def profile_pstats(profiler: cProfile.Profile, sort: str = "cumulative", limit: int = 60) -> str:
+    """
+    Formats a finished cProfile run as pstats text.
+    """
+    output = io.StringIO()
+    stats = pstats.Stats(profiler, stream=output)
+    stats.sort_stats(sort).print_stats(limit)
+    return output.getvalue()
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Sampling profiler for one thread: a background thread records that thread's stack at a fixed
+    interval, and the samples are reported as collapsed stacks (`root;...;leaf count`, the input
+    format of flame graph tools). Unlike cProfile it adds no per-call overhead to the sampled thread.
+    """
+    def __init__(self, thread_id: Optional[int] = None, interval: float = 0.005) -> None:
+        """
+        Initializes the StackSampler.
+
+        Args:
+            thread_id (Optional[int]): Thread to sample. Defaults to the calling thread.
+            interval (float): Seconds between samples.
+        """
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
@@ -0,0 +1,182 @@
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+
+class TokenBucket:
+    """
+    Classic token bucket: refills at `rate` tokens per second up to `burst` tokens.
+    """
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """
+        Returns how long to wait until one token is available, 0 if one is available now.
+        """
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self) -> None:
+        self.tokens -= 1
+
+
+class SessionLimiter:
+    """
+    Rate limit for one game session, combining its own bucket with the bucket shared by its remote address.
+    """
+    def __init__(self, session_bucket: TokenBucket, address_bucket: Optional[TokenBucket], address_key: Optional[str] = None) -> None:
+        self.session_bucket = session_bucket
+        self.address_bucket = address_bucket
+        self.address_key = address_key  # Key of the address bucket, to release it when the session ends
+        self.rejected: int = 0
+
+    def acquire(self) -> float:
+        """
+        Takes a token from both buckets if both have one.
+
+        Returns:
+            float: 0 if the frame may be processed, otherwise the seconds until it could be.
+        """
+        now = time.monotonic()
+        wait = self.session_bucket.wait_time(now)
+        if self.address_bucket is not None:
+            wait = max(wait, self.address_bucket.wait_time(now))
+        if wait == 0:
+            self.session_bucket.consume()
+            if self.address_bucket is not None:
+                self.address_bucket.consume()
+        return wait
+
+
+class RateLimiter:
+    """
+    Hands out per-session limiters backed by per-session and per-address token buckets.
+
+    Multiplexed connections, which drive many games over one socket, get their own per-connection
+    and per-address budgets, separate from those of single-game sessions.
+
+    Defaults can be overridden with the environment variables `GAME_MOVE_RATE`, `GAME_MOVE_BURST`,
+    `GAME_ADDRESS_RATE`, `GAME_ADDRESS_BURST`, `GAME_MUX_MOVE_RATE`, `GAME_MUX_MOVE_BURST`,
+    `GAME_MUX_ADDRESS_RATE`, `GAME_MUX_ADDRESS_BURST`, `GAME_RATE_LIMIT_MODE` and `GAME_SEND_TIMEOUT`.
+    """
+    MODE_REJECT = "reject"  # Drop excess frames, answering each with an error and the current state
+    MODE_DELAY = "delay"  # Hold excess frames until a token is available; the client's socket fills up instead
+
+    def __init__(
+        self,
+        session_rate: float = 20.0,
+        session_burst: float = 10.0,
+        address_rate: float = 100.0,
+        address_burst: float = 50.0,
+        mux_rate: float = 2000.0,
+        mux_burst: float = 500.0,
+        mux_address_rate: float = 5000.0,
+        mux_address_burst: float = 1000.0,
+        mode: str = MODE_REJECT,
+        send_timeout: float = 5.0,
+    ) -> None:
+        """
+        Initializes the RateLimiter.
+
+        Args:
+            session_rate (float): Moves per second allowed for one session. 0 disables the session limit.
+            session_burst (float): Moves a session may send back to back.
+            address_rate (float): Moves per second allowed across all sessions of one remote address. 0 disables it.
+            address_burst (float): Moves an address may send back to back.
+            mux_rate (float): Commands per second allowed for one multiplexed connection. 0 disables the limit.
+            mux_burst (float): Commands a multiplexed connection may send back to back.
+            mux_address_rate (float): Commands per second allowed across the multiplexed connections of one address. 0 disables it.
+            mux_address_burst (float): Commands an address may send back to back over multiplexed connections.
+            mode (str): What to do with excess frames, "reject" or "delay".
+            send_timeout (float): Seconds a send may wait for a client that is not reading before the session is closed.
+        """
+        if mode not in (self.MODE_REJECT, self.MODE_DELAY):
+            raise ValueError(f"Unknown rate limit mode: {mode}")
+        self.session_rate = session_rate
+        self.session_burst = session_burst
+        self.address_rate = address_rate
+        self.address_burst = address_burst
+        self.mux_rate = mux_rate
+        self.mux_burst = mux_burst
+        self.mux_address_rate = mux_address_rate
+        self.mux_address_burst = mux_address_burst
+        self.mode = mode
+        self.send_timeout = send_timeout
+        self._addresses: Dict[str, Tuple[TokenBucket, int]] = {}
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        return cls(
+            session_rate=float(os.environ.get("GAME_MOVE_RATE", 20.0)),
+            session_burst=float(os.environ.get("GAME_MOVE_BURST", 10.0)),
+            address_rate=float(os.environ.get("GAME_ADDRESS_RATE", 100.0)),
+            address_burst=float(os.environ.get("GAME_ADDRESS_BURST", 50.0)),
+            mux_rate=float(os.environ.get("GAME_MUX_MOVE_RATE", 2000.0)),
+            mux_burst=float(os.environ.get("GAME_MUX_MOVE_BURST", 500.0)),
+            mux_address_rate=float(os.environ.get("GAME_MUX_ADDRESS_RATE", 5000.0)),
+            mux_address_burst=float(os.environ.get("GAME_MUX_ADDRESS_BURST", 1000.0)),
+            mode=os.environ.get("GAME_RATE_LIMIT_MODE", cls.MODE_REJECT),
+            send_timeout=float(os.environ.get("GAME_SEND_TIMEOUT", 5.0)),
+        )
+
+    def for_session(self, address: Optional[str], multiplexed: bool = False) -> SessionLimiter:
+        """
+        Creates the limiter for a new session.
+
+        Args:
+            address (Optional[str]): The client's remote address, if known.
+            multiplexed (bool): Use the budgets of multiplexed connections.
+        """
+        if multiplexed:
+            rate, burst = self.mux_rate, self.mux_burst
+            address_rate, address_burst = self.mux_address_rate, self.mux_address_burst
+        else:
+            rate, burst = self.session_rate, self.session_burst
+            address_rate, address_burst = self.address_rate, self.address_burst
+        session_bucket = TokenBucket(rate, burst) if rate > 0 else _UNLIMITED
+        if not address or address_rate <= 0:
+            return SessionLimiter(session_bucket, None)
+        # Multiplexed connections draw on an address bucket of their own
+        key = f"mux:{address}" if multiplexed else address
+        bucket, sessions = self._addresses.get(key, (None, 0))
+        if bucket is None:
+            bucket = TokenBucket(address_rate, address_burst)
+        self._addresses[key] = (bucket, sessions + 1)
+        return SessionLimiter(session_bucket, bucket, key)
+
+    def release(self, address_key: Optional[str]) -> None:
+        """
+        Releases a session's share of its address bucket (see `SessionLimiter.address_key`),
+        dropping the bucket with the last session.
+        """
+        if not address_key or address_key not in self._addresses:
+            return
+        bucket, sessions = self._addresses[address_key]
+        if sessions <= 1:
+            del self._addresses[address_key]
+        else:
+            self._addresses[address_key] = (bucket, sessions - 1)
+
+
+class _UnlimitedBucket(TokenBucket):
+    def __init__(self) -> None:
+        super().__init__(rate=float("inf"), burst=float("inf"))
+
+    def wait_time(self, now: float) -> float:
+        return 0.0
+
+    def consume(self) -> None:
+        pass
+
+
+_UNLIMITED = _UnlimitedBucket()
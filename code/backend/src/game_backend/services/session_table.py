@@ -0,0 +1,255 @@
+import json
+import random
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from game_backend.core import bit_backend
+
+# Bits of the `flags` column
+FLAG_OVER = 1
+FLAG_WON = 2
+FLAG_KEEP_PLAYING = 4
+
+
+class SessionTable:
+    """
+    Struct-of-arrays storage for the game state of many sessions.
+
+    Every session is a slot in preallocated NumPy columns: the packed board (see `bit_backend`,
+    split into 64-bit words), score, move count, flags, last-active time and a generation counter.
+    A 4x4 session costs 30 bytes, against several kilobytes for a `GameManager` with its
+    grid, tiles and storage manager. Freed slots are reused from a free list, and the columns
+    double in size when the table is full.
+
+    Sessions are accessed through `SessionGame` views; the board is only unpacked while a move is
+    processed. Sessions store nothing on disk.
+    """
+    def __init__(self, size: int = 4, capacity: int = 1024) -> None:
+        """
+        Initializes the SessionTable.
+
+        Args:
+            size (int): Board size of every session in the table.
+            capacity (int): Initial number of slots.
+        """
+        self.size = size
+        self.words = max(1, (size * size + 15) // 16)
+        self.capacity = 0
+        self.boards = np.zeros((0, self.words), dtype=np.uint64)
+        self.scores = np.zeros(0, dtype=np.uint32)
+        self.moves = np.zeros(0, dtype=np.uint32)
+        self.flags = np.zeros(0, dtype=np.uint8)
+        self.last_active = np.zeros(0, dtype=np.float64)
+        self.generations = np.zeros(0, dtype=np.uint32)
+        self.in_use = np.zeros(0, dtype=np.bool_)
+        self._free: List[int] = []
+        self._grow(capacity)
+
+    def _grow(self, capacity: int) -> None:
+        extra = capacity - self.capacity
+        self.boards = np.concatenate([self.boards, np.zeros((extra, self.words), dtype=np.uint64)])
+        self.scores = np.concatenate([self.scores, np.zeros(extra, dtype=np.uint32)])
+        self.moves = np.concatenate([self.moves, np.zeros(extra, dtype=np.uint32)])
+        self.flags = np.concatenate([self.flags, np.zeros(extra, dtype=np.uint8)])
+        self.last_active = np.concatenate([self.last_active, np.zeros(extra, dtype=np.float64)])
+        self.generations = np.concatenate([self.generations, np.zeros(extra, dtype=np.uint32)])
+        self.in_use = np.concatenate([self.in_use, np.zeros(extra, dtype=np.bool_)])
+        # Lowest slots are handed out first
+        self._free.extend(reversed(range(self.capacity, capacity)))
+        self.capacity = capacity
+
+    def __len__(self) -> int:
+        return self.capacity - len(self._free)
+
+    def load_board(self, slot: int) -> int:
+        board = 0
+        for word, value in enumerate(self.boards[slot].tolist()):
+            board |= value << (64 * word)
+        return board
+
+    def store_board(self, slot: int, board: int) -> None:
+        row = self.boards[slot]
+        for word in range(self.words):
+            row[word] = (board >> (64 * word)) & 0xFFFFFFFFFFFFFFFF
+
+    def create(self, start_tiles: int = 2) -> "SessionGame":
+        """
+        Allocates a slot and starts a new game in it.
+        """
+        if not self._free:
+            self._grow(self.capacity * 2)
+        slot = self._free.pop()
+        self.in_use[slot] = True
+        self.generations[slot] += 1
+        game = SessionGame(self, slot)
+        game.restart(start_tiles)
+        return game
+
+    def release(self, game: "SessionGame") -> None:
+        """
+        Frees a session's slot for reuse. Views of it become invalid.
+        """
+        if not game.valid:
+            return
+        slot = game.slot
+        self.in_use[slot] = False
+        self.generations[slot] += 1
+        self._free.append(slot)
+
+    def idle_slots(self, idle_seconds: float) -> np.ndarray:
+        """
+        Returns the slots of sessions that have not played for `idle_seconds`.
+        """
+        return np.flatnonzero(self.in_use & (self.last_active < time.monotonic() - idle_seconds))
+
+    def memory_usage(self) -> int:
+        """
+        Bytes used by the columns.
+        """
+        return sum(
+            column.nbytes
+            for column in (self.boards, self.scores, self.moves, self.flags, self.last_active, self.generations, self.in_use)
+        )
+
+
+class SessionGame:
+    """
+    View of one session in a `SessionTable`, with the subset of the `GameManager` interface used by
+    the game server. Spawns draw from the `random` module in the same order as `GameManager`.
+    """
+    __slots__ = ("table", "slot", "generation")
+
+    def __init__(self, table: SessionTable, slot: int) -> None:
+        self.table = table
+        self.slot = slot
+        self.generation = int(table.generations[slot])
+
+    @property
+    def valid(self) -> bool:
+        return bool(self.table.in_use[self.slot]) and int(self.table.generations[self.slot]) == self.generation
+
+    def _check(self) -> None:
+        if not self.valid:
+            raise LookupError(f"Session slot {self.slot} was released")
+
+    @property
+    def size(self) -> int:
+        return self.table.size
+
+    @property
+    def board(self) -> int:
+        return self.table.load_board(self.slot)
+
+    @property
+    def score(self) -> int:
+        return int(self.table.scores[self.slot])
+
+    @property
+    def moves(self) -> int:
+        return int(self.table.moves[self.slot])
+
+    def _flag(self, flag: int) -> bool:
+        return bool(self.table.flags[self.slot] & flag)
+
+    @property
+    def over(self) -> bool:
+        return self._flag(FLAG_OVER)
+
+    @property
+    def won(self) -> bool:
+        return self._flag(FLAG_WON)
+
+    @property
+    def keep_playing(self) -> bool:
+        return self._flag(FLAG_KEEP_PLAYING)
+
+    def _spawn(self, board: int) -> int:
+        cells = bit_backend.empty_cells(board, self.size)
+        if not cells:
+            return board
+        exponent = 2 if random.random() < 0.1 else 1
+        x, y = random.choice(cells)
+        return bit_backend.set_exponent(board, x, y, exponent, self.size)
+
+    def restart(self, start_tiles: int = 2) -> None:
+        self._check()
+        board = 0
+        for _ in range(start_tiles):
+            board = self._spawn(board)
+        table, slot = self.table, self.slot
+        table.store_board(slot, board)
+        table.scores[slot] = 0
+        table.moves[slot] = 0
+        table.flags[slot] = 0
+        table.last_active[slot] = time.monotonic()
+
+    def is_game_terminated(self) -> bool:
+        flags = int(self.table.flags[self.slot])
+        return bool(flags & FLAG_OVER) or (bool(flags & FLAG_WON) and not flags & FLAG_KEEP_PLAYING)
+
+    def keep_playing_action(self) -> None:
+        self._check()
+        self.table.flags[self.slot] |= FLAG_KEEP_PLAYING
+
+    def play_turn(self, direction: int) -> None:
+        """
+        Executes a move like `GameManager.play_turn`.
+        """
+        self._check()
+        table, slot, size = self.table, self.slot, self.size
+        table.last_active[slot] = time.monotonic()
+        if self.is_game_terminated():
+            return
+
+        board = table.load_board(slot)
+        new_board, gained = bit_backend.move(board, direction, size)
+        if new_board == board:
+            return
+        new_board = self._spawn(new_board)
+
+        flags = int(table.flags[slot])
+        if bit_backend.max_exponent(new_board, size) >= bit_backend.WIN_EXPONENT:
+            flags |= FLAG_WON
+        if not bit_backend.can_move(new_board, size):
+            flags |= FLAG_OVER
+        table.store_board(slot, new_board)
+        table.scores[slot] += gained
+        table.moves[slot] += 1
+        table.flags[slot] = flags
+
+    @property
+    def used_undo(self) -> bool:
+        return False
+
+    def undo(self) -> bool:
+        # Table sessions keep no history
+        return False
+
+    def redo(self) -> bool:
+        return False
+
+    def max_tile(self) -> int:
+        return bit_backend.max_tile(self.board, self.size)
+
+    def packed_board(self) -> int:
+        return self.board
+
+    def serialize(self) -> Dict[str, Any]:
+        flags = int(self.table.flags[self.slot])
+        return {
+            'grid': bit_backend.decode_state(self.board, self.size),
+            'score': self.score,
+            'moves': self.moves,
+            'over': bool(flags & FLAG_OVER),
+            'won': bool(flags & FLAG_WON),
+            'keepPlaying': bool(flags & FLAG_KEEP_PLAYING),
+        }
+
+    def get_grid_state(self) -> Dict[str, Any]:
+        return self.serialize()
+
+    def get_state_json(self) -> str:
+        # Not cached: a cached string per session would cost more than the session itself
+        return json.dumps(self.serialize())
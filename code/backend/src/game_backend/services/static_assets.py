@@ -0,0 +1,289 @@
+import gzip
+import hashlib
+import logging
+import mimetypes
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, PlainTextResponse, Response
+from starlette.types import Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # Optional: `.br` variants are only built when brotli is installed
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Content worth compressing; images and fonts are already compressed formats.
+COMPRESSIBLE_SUFFIXES = {
+    ".html", ".js", ".mjs", ".css", ".json", ".map", ".svg", ".txt", ".xml", ".wasm", ".webmanifest", ".ico",
+}
+
+# Vite emits `assets/<name>-<8 char hash>.<ext>`; these never change content under the same name.
+HASHED_ASSET_PATTERN = re.compile(r"(^|/)assets/.+-[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# Preferred order when the client accepts several encodings equally.
+ENCODING_PREFERENCE = ("br", "gzip")
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+class AssetVariant:
+    """
+    One stored representation (identity, gzip or brotli) of a static asset.
+    """
+    def __init__(self, path: Path, etag: str, size: int, body: Optional[bytes] = None) -> None:
+        self.path = path
+        self.etag = etag
+        self.size = size
+        self.body = body  # Kept in memory for small files so serving them does no disk I/O
+
+
+class StaticAsset:
+    """
+    A static file with its negotiated variants and response headers.
+    """
+    def __init__(self, media_type: str, cache_control: str, variants: Dict[str, AssetVariant]) -> None:
+        self.media_type = media_type
+        self.cache_control = cache_control
+        self.variants = variants  # Keyed by content-coding, "identity" always present
+
+    @property
+    def etags(self) -> List[str]:
+        return [variant.etag for variant in self.variants.values()]
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """
+    Parses an Accept-Encoding header into a mapping of coding to q-value.
+
+    Args:
+        header (str): The raw header value.
+
+    Returns:
+        Dict[str, float]: Lower-cased codings with their q-values.
+    """
+    accepted: Dict[str, float] = {}
+    for item in header.split(","):
+        parts = item.strip().split(";")
+        coding = parts[0].strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in parts[1:]:
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def negotiate_encoding(header: Optional[str], available: List[str]) -> str:
+    """
+    Picks the best available content-coding for a request.
+
+    Args:
+        header (Optional[str]): The request's Accept-Encoding header.
+        available (List[str]): Codings the asset is stored in, besides identity.
+
+    Returns:
+        str: The chosen coding, or "identity".
+    """
+    if not header:
+        return "identity"
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = "identity", 0.0
+    for coding in ENCODING_PREFERENCE:
+        if coding not in available:
+            continue
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def if_none_match(header: Optional[str], etags: List[str]) -> bool:
+    """
+    Checks an If-None-Match header against the asset's ETags using weak comparison.
+    """
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return any(etag in candidates for etag in etags)
+
+
+class PrecompressedStaticFiles:
+    """
+    ASGI app serving a built frontend with precompressed variants and long-lived caching.
+
+    At startup every file under `directory` is indexed. Existing `.gz`/`.br` siblings are discovered,
+    and missing ones are built for compressible files. Requests then only negotiate Accept-Encoding,
+    compare ETags and hand out stored bytes.
+    """
+    def __init__(
+        self,
+        directory: str,
+        html: bool = False,
+        min_compress_size: int = 256,
+        memory_limit: int = 256 * 1024,
+        write_variants: bool = True,
+    ) -> None:
+        """
+        Initializes PrecompressedStaticFiles and builds the asset index.
+
+        Args:
+            directory (str): Directory with the build output.
+            html (bool): Serve `index.html` for directories and `404.html` for missing files, like `StaticFiles`.
+            min_compress_size (int): Files smaller than this many bytes are only served uncompressed.
+            memory_limit (int): Variants up to this many bytes are held in memory; larger ones stream from disk.
+            write_variants (bool): Write built variants next to the originals so later startups can reuse them.
+        """
+        self.directory = Path(directory)
+        if not self.directory.is_dir():
+            raise RuntimeError(f"Directory '{directory}' does not exist")
+        self.html = html
+        self.min_compress_size = min_compress_size
+        self.memory_limit = memory_limit
+        self.write_variants = write_variants
+        self.assets: Dict[str, StaticAsset] = {}
+        self._build_index()
+
+    def _build_index(self) -> None:
+        """
+        Indexes every file under the directory, discovering or building compressed variants.
+        """
+        built = 0
+        for path in sorted(self.directory.rglob("*")):
+            if not path.is_file() or path.suffix in (".gz", ".br"):
+                continue
+            relative = path.relative_to(self.directory).as_posix()
+            asset, built_count = self._index_file(path, relative)
+            self.assets[relative] = asset
+            built += built_count
+        logger.info(f"Indexed {len(self.assets)} static assets ({built} compressed variants built).")
+
+    def _index_file(self, path: Path, relative: str) -> Tuple[StaticAsset, int]:
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()[:20]
+        variants = {"identity": self._variant(path, f'"{digest}"', data)}
+        built = 0
+
+        if path.suffix in COMPRESSIBLE_SUFFIXES and len(data) >= self.min_compress_size:
+            for coding in ENCODING_PREFERENCE:
+                variant_path = path.with_name(path.name + ENCODING_SUFFIXES[coding])
+                compressed = self._existing_variant(variant_path, path)
+                if compressed is None:
+                    compressed = self._compress(coding, data)
+                    if compressed is None:
+                        continue
+                    built += 1
+                    if self.write_variants:
+                        try:
+                            variant_path.write_bytes(compressed)
+                        except OSError as e:
+                            logger.warning(f"Could not write {variant_path}, keeping it in memory: {e}")
+                            variant_path = None
+                    else:
+                        variant_path = None
+                # Only worth sending when it actually saves bandwidth.
+                if len(compressed) >= len(data) * 0.9:
+                    continue
+                tag = ENCODING_SUFFIXES[coding].lstrip(".")
+                variants[coding] = self._variant(variant_path, f'"{digest}-{tag}"', compressed)
+
+        media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        if media_type.startswith("text/") or media_type in ("application/javascript", "application/json"):
+            media_type += "; charset=utf-8"
+        cache_control = IMMUTABLE_CACHE_CONTROL if HASHED_ASSET_PATTERN.search(relative) else REVALIDATE_CACHE_CONTROL
+        return StaticAsset(media_type, cache_control, variants), built
+
+    def _variant(self, path: Optional[Path], etag: str, data: bytes) -> AssetVariant:
+        body = data if path is None or len(data) <= self.memory_limit else None
+        return AssetVariant(path=path, etag=etag, size=len(data), body=body)
+
+    @staticmethod
+    def _existing_variant(variant_path: Path, original: Path) -> Optional[bytes]:
+        """
+        Returns a prebuilt variant if it exists and is not older than the original.
+        """
+        try:
+            if variant_path.stat().st_mtime >= original.stat().st_mtime:
+                return variant_path.read_bytes()
+        except OSError:
+            pass
+        return None
+
+    @staticmethod
+    def _compress(coding: str, data: bytes) -> Optional[bytes]:
+        if coding == "gzip":
+            return gzip.compress(data, compresslevel=9, mtime=0)
+        if coding == "br" and brotli is not None:
+            return brotli.compress(data, quality=11)
+        return None
+
+    def _lookup(self, path: str) -> Tuple[Optional[StaticAsset], int]:
+        """
+        Resolves a request path to an asset and the status code to serve it with.
+        """
+        relative = path.lstrip("/")
+        asset = self.assets.get(relative)
+        if asset is not None:
+            return asset, 200
+        if self.html:
+            index = f"{relative.rstrip('/')}/index.html".lstrip("/")
+            if index in self.assets:
+                return self.assets[index], 200
+            if "404.html" in self.assets:
+                return self.assets["404.html"], 404
+        return None, 404
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        assert scope["type"] == "http"
+        if scope["method"] not in ("GET", "HEAD"):
+            response: Response = PlainTextResponse("Method Not Allowed", status_code=405)
+            await response(scope, receive, send)
+            return
+
+        path, root_path = scope["path"], scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        asset, status_code = self._lookup(path)
+        if asset is None:
+            await PlainTextResponse("Not Found", status_code=404)(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        coding = negotiate_encoding(
+            request_headers.get("accept-encoding"), [c for c in asset.variants if c != "identity"]
+        )
+        variant = asset.variants[coding]
+        headers = {
+            "etag": variant.etag,
+            "cache-control": asset.cache_control,
+        }
+        if len(asset.variants) > 1:
+            headers["vary"] = "Accept-Encoding"
+        if coding != "identity":
+            headers["content-encoding"] = coding
+
+        if status_code == 200 and if_none_match(request_headers.get("if-none-match"), asset.etags):
+            response = Response(status_code=304, headers=headers)
+        elif variant.body is not None:
+            response = Response(variant.body, status_code=status_code, media_type=asset.media_type, headers=headers)
+        else:
+            response = FileResponse(
+                variant.path, status_code=status_code, media_type=asset.media_type, headers=headers,
+                method=scope["method"],
+            )
+        await response(scope, receive, send)
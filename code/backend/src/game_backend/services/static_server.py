@@ -1,11 +1,23 @@
 import json
+import time
 
 from fastapi import FastAPI, WebSocket
-from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 
-from .api_server import manager
+from .api_server import (
+    debug_router,
+    leaderboard_router,
+    manager,
+    multiplex_router,
+    replay_verifier,
+    simulation_router,
+    simulation_runner,
+    spectator_router,
+    verification_router,
+)
+from .profiling import spans
+from .static_assets import PrecompressedStaticFiles
 
 app = FastAPI()
 
@@ -18,6 +30,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.router.on_shutdown.append(manager.close)
+app.router.on_shutdown.append(simulation_runner.close)
+app.router.on_shutdown.append(replay_verifier.close)
+app.include_router(leaderboard_router)
+app.include_router(spectator_router)
+app.include_router(debug_router)
+app.include_router(simulation_router)
+app.include_router(multiplex_router)
+app.include_router(verification_router)
+
 # WebSocket endpoint
 @app.websocket("/ws/game")
 async def websocket_endpoint(websocket: WebSocket):
@@ -26,22 +48,31 @@ async def websocket_endpoint(websocket: WebSocket):
     
     try:
         # Then handle game management
-        session_id = await manager.connect(websocket)
+        session_id = await manager.connect(websocket, player=websocket.query_params.get("player"))
         game_manager = manager.get_game_manager(session_id)
+        timing = websocket.query_params.get("timing") == "1"
         
         # Send initial state
-        await websocket.send_text(json.dumps(game_manager.get_grid_state()))
+        await manager.send_state(session_id, websocket)
         
         while True:
             data = await websocket.receive_text()
-            message = json.loads(data)
-            direction = message.get("direction")
-            if direction in [0, 1, 2, 3]:
-                game_manager.play_turn(direction)
-                state = game_manager.get_grid_state()
-                await websocket.send_text(json.dumps(state))
-            else:
-                await websocket.send_text(json.dumps({"error": "Invalid move"}))
+            received = time.perf_counter() if timing else None
+            if not await manager.admit(session_id, websocket):
+                continue
+            with spans.span("ws.frame"):
+                message = json.loads(data)
+                if message.get("undo") is True or message.get("redo") is True:
+                    await manager.step_history(session_id, websocket, undo=message.get("undo") is True, received=received)
+                    continue
+                direction = message.get("direction")
+                if direction in [0, 1, 2, 3]:
+                    manager.play_turn(session_id, direction)
+                    await manager.send_state(session_id, websocket, received)
+                    if game_manager.is_game_terminated():
+                        manager.finish_game(session_id)
+                else:
+                    await manager.send_text(websocket, json.dumps({"error": "Invalid move"}))
     except Exception as e:
         print(f"Error: {e}")
         if session_id:
@@ -50,5 +81,5 @@ async def websocket_endpoint(websocket: WebSocket):
         if session_id:
             manager.disconnect(session_id)
 
-# Serve static files
-app.mount("/", StaticFiles(directory="/app/frontend/build", html=True), name="static")
\ No newline at end of file
+# Serve static files, precompressed and indexed once at startup
+app.mount("/", PrecompressedStaticFiles(directory="/app/frontend/build", html=True), name="static")
\ No newline at end of file
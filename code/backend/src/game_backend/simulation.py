@@ -0,0 +1,261 @@
+"""
+Headless batch simulation of policies on packed boards.
+
+Games follow the rules of `GameManager` (same move semantics, and the same tile spawn draws:
+`random() < 0.1` for a 4, then a choice among the empty cells in x-major order) but run on
+`bit_backend` boards with a per-game `random.Random(seed)` and no storage I/O. Play continues past
+2048 until no move is left or the move cap is reached.
+"""
+import asyncio
+import concurrent.futures
+import logging
+import multiprocessing
+import os
+import random
+import time
+import uuid
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Set
+
+from game_backend.core import bit_backend
+
+logger = logging.getLogger(__name__)
+
+Policy = Callable[[int, int, random.Random], int]
+
+
+def random_policy(board: int, size: int, rng: random.Random) -> int:
+    """
+    Plays a uniformly random legal move.
+    """
+    return rng.choice(bit_backend.legal_moves(board, size))
+
+
+def greedy_policy(board: int, size: int, rng: random.Random) -> int:
+    """
+    Plays the legal move with the highest immediate score, breaking ties at random.
+    """
+    best_score = -1
+    best: List[int] = []
+    for direction in bit_backend.DIRECTIONS:
+        new_board, gained = bit_backend.move(board, direction, size)
+        if new_board == board:
+            continue
+        if gained > best_score:
+            best_score, best = gained, [direction]
+        elif gained == best_score:
+            best.append(direction)
+    return rng.choice(best)
+
+
+def corner_policy(board: int, size: int, rng: random.Random) -> int:
+    """
+    Keeps the largest tiles in the top-left corner: up, then left, then right, and down only when forced.
+    """
+    for direction in (0, 3, 1, 2):
+        if bit_backend.move(board, direction, size)[0] != board:
+            return direction
+    raise ValueError("No legal move")
+
+
+POLICIES: Dict[str, Policy] = {
+    "random": random_policy,
+    "greedy": greedy_policy,
+    "corner": corner_policy,
+}
+
+
+def spawn_tile(board: int, size: int, rng: random.Random) -> int:
+    """
+    Adds a random tile like `GameManager.add_random_tile`.
+    """
+    cells = bit_backend.empty_cells(board, size)
+    if not cells:
+        return board
+    exponent = 2 if rng.random() < 0.1 else 1
+    x, y = rng.choice(cells)
+    return bit_backend.set_exponent(board, x, y, exponent, size)
+
+
+def play_game(
+    policy: str,
+    seed: int,
+    size: int = 4,
+    max_moves: Optional[int] = None,
+    start_tiles: int = 2,
+) -> Dict[str, Any]:
+    """
+    Plays one game with a named policy.
+
+    Args:
+        policy (str): Name of a policy in `POLICIES`.
+        seed (int): Seed of the game's random generator, shared by the spawns and the policy.
+        size (int): Board size.
+        max_moves (Optional[int]): Stop after this many moves.
+        start_tiles (int): Number of tiles on the initial board.
+
+    Returns:
+        Dict[str, Any]: The seed, final score, max tile, number of moves and wall time in milliseconds.
+    """
+    choose = POLICIES[policy]
+    rng = random.Random(seed)
+    start = time.perf_counter()
+
+    board = 0
+    for _ in range(start_tiles):
+        board = spawn_tile(board, size, rng)
+
+    score = 0
+    moves = 0
+    while (max_moves is None or moves < max_moves) and bit_backend.can_move(board, size):
+        new_board, gained = bit_backend.move(board, choose(board, size, rng), size)
+        if new_board == board:
+            raise ValueError(f"Policy {policy!r} chose an illegal move")
+        score += gained
+        moves += 1
+        board = spawn_tile(new_board, size, rng)
+
+    return {
+        "seed": seed,
+        "score": score,
+        "maxTile": bit_backend.max_tile(board, size),
+        "moves": moves,
+        "wallMs": round((time.perf_counter() - start) * 1000, 3),
+    }
+
+
+def play_games(policy: str, seeds: Sequence[int], size: int = 4, max_moves: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Plays a chunk of games; the unit of work sent to a pool worker.
+    """
+    return [play_game(policy, seed, size, max_moves) for seed in seeds]
+
+
+def _warm_up() -> None:
+    # Builds the 4x4 move table once per worker, so it is not counted in the first game's wall time
+    bit_backend.move(0, 0, 4)
+
+
+class SimulationJob:
+    """
+    A running batch of games, streamed as chunks of games complete.
+    """
+    def __init__(self, policy: str, seeds: Sequence[int], size: int, max_moves: Optional[int], chunk_size: int) -> None:
+        self.job_id: str = uuid.uuid4().hex
+        self.policy = policy
+        self.seeds = seeds
+        self.size = size
+        self.max_moves = max_moves
+        self.chunk_size = chunk_size
+        self.completed: int = 0
+        self.cancelled = asyncio.Event()
+
+    def serialize(self) -> Dict[str, Any]:
+        return {
+            "jobId": self.job_id,
+            "policy": self.policy,
+            "size": self.size,
+            "games": len(self.seeds),
+            "completed": self.completed,
+            "cancelled": self.cancelled.is_set(),
+        }
+
+
+class SimulationRunner:
+    """
+    Runs simulation jobs on a shared process pool.
+
+    Seeds are sent to the workers in chunks, with a bounded number of chunks in flight per job, so
+    a 100k-game job neither floods the pool's queue nor delays other jobs' first results, and
+    cancelling it only has to wait for the chunks already running.
+    """
+    def __init__(self, workers: Optional[int] = None, max_chunks_in_flight: Optional[int] = None) -> None:
+        """
+        Initializes the SimulationRunner.
+
+        Args:
+            workers (Optional[int]): Worker processes. Defaults to `GAME_SIM_WORKERS` or the CPU count.
+            max_chunks_in_flight (Optional[int]): Chunks submitted at once per job. Defaults to twice the workers.
+        """
+        self.workers = workers or int(os.environ.get("GAME_SIM_WORKERS", 0)) or os.cpu_count() or 1
+        self.max_chunks_in_flight = max_chunks_in_flight or 2 * self.workers
+        self.jobs: Dict[str, SimulationJob] = {}
+        self._pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> concurrent.futures.ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawned workers do not inherit the server's event loop, sockets or threads
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"), initializer=_warm_up
+            )
+        return self._pool
+
+    def create_job(
+        self, policy: str, seeds: Sequence[int], size: int = 4, max_moves: Optional[int] = None, chunk_size: int = 32
+    ) -> SimulationJob:
+        """
+        Creates a job. Games start when its results are iterated, and the job is listed in `jobs`
+        (and can be cancelled) only while they are, so a job whose results are never read holds nothing.
+
+        Raises:
+            ValueError: If the policy is unknown.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy {policy!r}; expected one of {', '.join(POLICIES)}")
+        return SimulationJob(policy, seeds, size, max_moves, chunk_size)
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.jobs.get(job_id)
+        if job is None:
+            return False
+        job.cancelled.set()
+        return True
+
+    async def results(self, job: SimulationJob) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yields the per-game results of each chunk as it completes, in completion order.
+
+        Stops early once the job is cancelled, or when the consumer stops iterating (e.g. the HTTP
+        client disconnects); chunks that have not started are dropped from the pool. A failing chunk
+        ends the iteration with its exception.
+        """
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        self.jobs[job.job_id] = job
+        chunks = (job.seeds[i:i + job.chunk_size] for i in range(0, len(job.seeds), job.chunk_size))
+        pending: Set[asyncio.Future] = set()
+        cancel_waiter = asyncio.ensure_future(job.cancelled.wait())
+        try:
+            while True:
+                while len(pending) < self.max_chunks_in_flight and not job.cancelled.is_set():
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    pending.add(loop.run_in_executor(pool, play_games, job.policy, chunk, job.size, job.max_moves))
+                if not pending or job.cancelled.is_set():
+                    break
+                done, pending = await asyncio.wait(pending | {cancel_waiter}, return_when=asyncio.FIRST_COMPLETED)
+                done.discard(cancel_waiter)
+                pending.discard(cancel_waiter)
+                for future in done:
+                    results = future.result()
+                    job.completed += len(results)
+                    yield results
+        except concurrent.futures.BrokenExecutor:
+            # A worker died; later jobs get a fresh pool
+            if self._pool is pool:
+                self._pool = None
+                pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        finally:
+            cancel_waiter.cancel()
+            for future in pending:
+                future.cancel()
+            self.jobs.pop(job.job_id, None)
+            logger.info(f"Simulation job {job.job_id} finished: {job.completed}/{len(job.seeds)} games.")
+
+    def close(self) -> None:
+        for job in self.jobs.values():
+            job.cancelled.set()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,527 @@
+"""
+Exhaustive tablebase of small boards.
+
+Every position reachable under the rules of `GameManager` (two start tiles, then a 2 with
+probability 0.9 or a 4 with 0.1 on a uniformly chosen empty cell after each move) is enumerated
+and solved exactly: its value is the expected score still to be gained with optimal play, and its
+move the one achieving it. Positions are stored once per symmetry class, keyed by the canonical
+packed board.
+
+A move keeps the sum of the tiles and the spawn then raises it by 2 or 4, so positions fall into
+layers by tile sum and every transition goes from one layer to one of the next two. The builder
+enumerates layers forwards, then solves them backwards with only three layers in memory at a time,
+each layer split into chunks processed on a pool of worker processes.
+
+The result is an open-addressing hash table in one file, memory-mapped by `Tablebase`, so a lookup
+is a canonicalization and a few probes whatever the size of the table:
+
+    header:  magic b"2048TBSE", version u32, size u32, count u64, log2 capacity u32, 4 padding bytes,
+             expected score from the start f64, padded to 64 bytes
+    keys:    capacity x u64 canonical boards (0 = empty slot)
+    values:  capacity x f32 expected scores
+    moves:   capacity x u8 best moves in the canonical orientation (255 = no legal move)
+
+A 3x3 table holds about 49 million positions (about 870 MB); a 2x2 table a hundred or so. The
+largest tile reachable on these boards is far below 2048, so the win never ends a game early.
+"""
+import argparse
+import logging
+import mmap
+import multiprocessing
+import os
+import struct
+import tempfile
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from game_backend.core import bit_backend
+from game_backend.core.bit_backend.board import _line_table
+from game_backend.core.bit_backend.search import SPAWNS
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"2048TBSE"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQI4xd")
+HEADER_SIZE = 64
+NO_MOVE = 255
+MAX_SIZE = 3  # 4x4 boards are far beyond exhaustive enumeration
+LOAD_FACTOR = 0.75
+
+_HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+_MASK64 = (1 << 64) - 1
+_KEY = struct.Struct("<Q")
+_VALUE = struct.Struct("<f")
+
+
+class _BoardOps:
+    """
+    Moves and symmetries of a whole array of packed boards at once.
+    """
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.cells = size * size
+        self.row_bits = 4 * size
+        self.row_mask = np.uint64((1 << self.row_bits) - 1)
+
+        rows = np.arange(1 << self.row_bits, dtype=np.uint64)
+        self.reversed_row = self._reverse(rows).astype(np.int64)
+        left, left_scores = (np.array(table, dtype=np.uint64) for table in _line_table(size))
+        self.left, self.left_scores = left, left_scores
+        # Sliding a row right is sliding its mirror image left
+        self.right = self._reverse(left[self.reversed_row])
+        self.right_scores = left_scores[self.reversed_row]
+
+    def _reverse(self, rows: np.ndarray) -> np.ndarray:
+        reversed_rows = np.zeros_like(rows)
+        for i in range(self.size):
+            reversed_rows |= ((rows >> np.uint64(4 * i)) & np.uint64(0xF)) << np.uint64(4 * (self.size - 1 - i))
+        return reversed_rows
+
+    def _row(self, boards: np.ndarray, y: int) -> np.ndarray:
+        return ((boards >> np.uint64(self.row_bits * y)) & self.row_mask).astype(np.int64)
+
+    def exponent(self, boards: np.ndarray, cell: int) -> np.ndarray:
+        return (boards >> np.uint64(4 * cell)) & np.uint64(0xF)
+
+    def transpose(self, boards: np.ndarray) -> np.ndarray:
+        size = self.size
+        result = np.zeros_like(boards)
+        for y in range(size):
+            for x in range(size):
+                result |= self.exponent(boards, y * size + x) << np.uint64(4 * (x * size + y))
+        return result
+
+    def mirror_x(self, boards: np.ndarray) -> np.ndarray:
+        result = np.zeros_like(boards)
+        for y in range(self.size):
+            result |= self.reversed_row[self._row(boards, y)].astype(np.uint64) << np.uint64(self.row_bits * y)
+        return result
+
+    def mirror_y(self, boards: np.ndarray) -> np.ndarray:
+        result = np.zeros_like(boards)
+        for y in range(self.size):
+            result |= self._row(boards, y).astype(np.uint64) << np.uint64(self.row_bits * (self.size - 1 - y))
+        return result
+
+    def canonical(self, boards: np.ndarray) -> np.ndarray:
+        """
+        The smallest of the 8 symmetries of each board, as `bit_backend.canonical_key`.
+        """
+        result = boards.copy()
+        for board in (boards, self.transpose(boards)):
+            mirrored_x = self.mirror_x(board)
+            for candidate in (board, mirrored_x, self.mirror_y(board), self.mirror_y(mirrored_x)):
+                np.minimum(result, candidate, out=result)
+        return result
+
+    def move(self, boards: np.ndarray, direction: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Applies a move to every board, as `bit_backend.move`.
+        """
+        vertical = direction in (0, 2)
+        if vertical:
+            boards = self.transpose(boards)
+        table, scores = (self.left, self.left_scores) if direction in (0, 3) else (self.right, self.right_scores)
+        moved = np.zeros_like(boards)
+        gained = np.zeros_like(boards)
+        for y in range(self.size):
+            row = self._row(boards, y)
+            moved |= table[row] << np.uint64(self.row_bits * y)
+            gained += scores[row]
+        if vertical:
+            moved = self.transpose(moved)
+        return moved, gained
+
+    def tile_sum(self, boards: np.ndarray) -> np.ndarray:
+        total = np.zeros_like(boards)
+        for cell in range(self.cells):
+            exponent = self.exponent(boards, cell)
+            total += np.where(exponent > 0, np.uint64(1) << exponent, np.uint64(0))
+        return total
+
+    def spawns(self, moved: np.ndarray) -> Iterator[Tuple[np.ndarray, int, float, np.ndarray]]:
+        """
+        Yields, for every cell and spawned tile, the boards where the cell is empty, the tile
+        value, its probability and the canonical boards after the spawn.
+        """
+        for cell in range(self.cells):
+            empty = self.exponent(moved, cell) == 0
+            if not empty.any():
+                continue
+            for exponent, probability in SPAWNS:
+                children = self.canonical(moved[empty] | np.uint64(exponent << (4 * cell)))
+                yield empty, 1 << exponent, probability, children
+
+
+def start_boards(size: int, start_tiles: int = 2) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Every board `GameManager.add_start_tiles` can produce, with its probability.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Packed boards (not canonicalized) and their probabilities.
+    """
+    boards: Dict[int, float] = {0: 1.0}
+    for _ in range(start_tiles):
+        placed: Dict[int, float] = {}
+        for board, probability in boards.items():
+            empty = bit_backend.empty_cells(board, size)
+            for x, y in empty:
+                for exponent, spawn_probability in SPAWNS:
+                    child = bit_backend.set_exponent(board, x, y, exponent, size)
+                    placed[child] = placed.get(child, 0.0) + probability * spawn_probability / len(empty)
+        boards = placed
+    return np.array(list(boards), dtype=np.uint64), np.array(list(boards.values()))
+
+
+_worker_ops: Optional[_BoardOps] = None
+_worker_directory: Optional[str] = None
+_worker_layers: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+
+def _init_worker(size: int, directory: str) -> None:
+    global _worker_ops, _worker_directory
+    _worker_ops = _BoardOps(size)
+    _worker_directory = directory
+    _worker_layers.clear()
+
+
+def _layer_path(directory: str, tile_sum: int, kind: str) -> str:
+    return os.path.join(directory, f"{kind}_{tile_sum}.npy")
+
+
+def _expand(boards: np.ndarray) -> Dict[int, np.ndarray]:
+    """
+    The canonical positions one turn after a chunk of boards, keyed by the tile added by the spawn.
+    """
+    ops = _worker_ops
+    children: Dict[int, List[np.ndarray]] = {}
+    for direction in bit_backend.DIRECTIONS:
+        moved, _ = ops.move(boards, direction)
+        moved = moved[moved != boards]
+        for _, tile, _, spawned in ops.spawns(moved):
+            children.setdefault(tile, []).append(spawned)
+    return {tile: np.unique(np.concatenate(arrays)) for tile, arrays in children.items()}
+
+
+def _solved_layer(tile_sum: int) -> Tuple[np.ndarray, np.ndarray]:
+    layer = _worker_layers.get(tile_sum)
+    if layer is None:
+        boards_path = _layer_path(_worker_directory, tile_sum, "boards")
+        if not os.path.exists(boards_path):
+            layer = np.zeros(0, dtype=np.uint64), np.zeros(0)
+        else:
+            layer = np.load(boards_path, mmap_mode="r"), np.load(_layer_path(_worker_directory, tile_sum, "values"), mmap_mode="r")
+        # Layers are solved in decreasing sum order; only the next two are ever read again
+        for cached in [cached for cached in _worker_layers if cached > tile_sum + 4]:
+            del _worker_layers[cached]
+        _worker_layers[tile_sum] = layer
+    return layer
+
+
+def _solve(task: Tuple[int, int, int]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Values and best moves of a chunk of a layer, from the solved layers above it.
+    """
+    tile_sum, start, end = task
+    ops = _worker_ops
+    boards = np.array(np.load(_layer_path(_worker_directory, tile_sum, "boards"), mmap_mode="r")[start:end])
+    best_values = np.zeros(len(boards))
+    best_moves = np.full(len(boards), NO_MOVE, dtype=np.uint8)
+    for direction in bit_backend.DIRECTIONS:
+        moved, gained = ops.move(boards, direction)
+        legal = moved != boards
+        if not legal.any():
+            continue
+        moved = moved[legal]
+        expected = np.zeros(len(moved))
+        empty_count = np.zeros(len(moved))
+        for empty, tile, probability, children in ops.spawns(moved):
+            next_boards, next_values = _solved_layer(tile_sum + tile)
+            expected[empty] += probability * next_values[np.searchsorted(next_boards, children)]
+            if tile == 1 << SPAWNS[0][0]:
+                empty_count += empty
+        values = gained[legal] + expected / empty_count
+        # Strictly better only, so ties keep the lowest direction
+        better = (best_moves[legal] == NO_MOVE) | (values > best_values[legal])
+        indices = np.flatnonzero(legal)[better]
+        best_values[indices] = values[better]
+        best_moves[indices] = direction
+    return best_values, best_moves
+
+
+def _slot_hash(keys: np.ndarray, bits: int) -> np.ndarray:
+    with np.errstate(over="ignore"):
+        return ((keys * np.uint64(_HASH_MULTIPLIER)) >> np.uint64(64 - bits)).astype(np.int64)
+
+
+def _insert(table_keys: np.ndarray, table_values: np.ndarray, table_moves: np.ndarray, bits: int,
+            keys: np.ndarray, values: np.ndarray, moves: np.ndarray) -> None:
+    """
+    Inserts keys with linear probing, one probe step for all pending keys at a time.
+    """
+    mask = (1 << bits) - 1
+    slots = _slot_hash(keys, bits)
+    pending = np.arange(len(keys))
+    while len(pending):
+        candidate_slots = slots[pending]
+        free = table_keys[candidate_slots] == 0
+        # Of the keys probing the same free slot, the first one takes it
+        taken_slots, first = np.unique(candidate_slots[free], return_index=True)
+        winners = pending[free][first]
+        table_keys[taken_slots] = keys[winners]
+        table_values[taken_slots] = values[winners]
+        table_moves[taken_slots] = moves[winners]
+        placed = np.zeros(len(keys), dtype=bool)
+        placed[winners] = True
+        pending = pending[~placed[pending]]
+        slots[pending] = (slots[pending] + 1) & mask
+
+
+def _table_layout(bits: int) -> Tuple[int, int, int, int]:
+    capacity = 1 << bits
+    keys_offset = HEADER_SIZE
+    values_offset = keys_offset + 8 * capacity
+    moves_offset = values_offset + 4 * capacity
+    return keys_offset, values_offset, moves_offset, moves_offset + capacity
+
+
+def _chunked(count: int, chunk_size: int) -> List[Tuple[int, int]]:
+    return [(start, min(start + chunk_size, count)) for start in range(0, count, chunk_size)]
+
+
+def build_tablebase(
+    path: str,
+    size: int = 3,
+    workers: Optional[int] = None,
+    chunk_size: int = 1 << 16,
+    work_directory: Optional[str] = None,
+) -> int:
+    """
+    Enumerates and solves every reachable position of a small board and writes the tablebase.
+
+    Args:
+        path (str): Output file; written to a temporary file and renamed into place.
+        size (int): Board size, 2 or 3.
+        workers (Optional[int]): Worker processes; 0 works in this process. Defaults to the CPU count.
+        chunk_size (int): Positions per task sent to a worker.
+        work_directory (Optional[str]): Where the per-layer files are kept during the build. Defaults
+            to a temporary directory next to `path`.
+
+    Returns:
+        int: Number of positions written.
+
+    Raises:
+        ValueError: If the board size is not supported.
+    """
+    if not 2 <= size <= MAX_SIZE:
+        raise ValueError(f"Tablebases are supported for sizes 2 to {MAX_SIZE}")
+    with tempfile.TemporaryDirectory(dir=work_directory or os.path.dirname(os.path.abspath(path))) as directory:
+        pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(size, directory)) if workers != 0 else None
+        if pool is None:
+            _init_worker(size, directory)
+        run: Callable[[Callable, Iterable], Iterator] = pool.imap if pool is not None else map
+        try:
+            start = time.perf_counter()
+            ops = _BoardOps(size)
+            layer_sums = _enumerate(ops, directory, run, chunk_size)
+            logger.info(f"Enumerated {len(layer_sums)} layers in {time.perf_counter() - start:.0f}s.")
+            _solve_layers(layer_sums, directory, run, chunk_size)
+            logger.info(f"Solved all layers in {time.perf_counter() - start:.0f}s.")
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+        return _write_table(path, size, ops, directory, layer_sums)
+
+
+def _enumerate(ops: _BoardOps, directory: str, run: Callable, chunk_size: int) -> List[int]:
+    boards, _ = start_boards(ops.size)
+    boards = np.unique(ops.canonical(boards))
+    sums = ops.tile_sum(boards)
+    pending: Dict[int, List[np.ndarray]] = {int(tile_sum): [boards[sums == tile_sum]] for tile_sum in np.unique(sums)}
+    layer_sums = []
+    total = 0
+    while pending:
+        tile_sum = min(pending)
+        layer = np.unique(np.concatenate(pending.pop(tile_sum)))
+        np.save(_layer_path(directory, tile_sum, "boards"), layer)
+        layer_sums.append(tile_sum)
+        total += len(layer)
+        chunks = [layer[start:end] for start, end in _chunked(len(layer), chunk_size)]
+        for children in run(_expand, chunks):
+            for tile, spawned in children.items():
+                pending.setdefault(tile_sum + tile, []).append(spawned)
+        # Merge as we go, so a layer is held once rather than once per chunk that reaches it
+        for next_sum, arrays in pending.items():
+            if len(arrays) > 1:
+                pending[next_sum] = [np.unique(np.concatenate(arrays))]
+        if len(layer_sums) % 100 == 0:
+            logger.info(f"Layer {tile_sum}: {len(layer)} positions, {total} so far.")
+    logger.info(f"{total} positions in total.")
+    return layer_sums
+
+
+def _solve_layers(layer_sums: Sequence[int], directory: str, run: Callable, chunk_size: int) -> None:
+    for done, tile_sum in enumerate(reversed(layer_sums), start=1):
+        count = len(np.load(_layer_path(directory, tile_sum, "boards"), mmap_mode="r"))
+        tasks = [(tile_sum, start, end) for start, end in _chunked(count, chunk_size)]
+        results = list(run(_solve, tasks))
+        np.save(_layer_path(directory, tile_sum, "values"), np.concatenate([values for values, _ in results]))
+        np.save(_layer_path(directory, tile_sum, "moves"), np.concatenate([moves for _, moves in results]))
+        if done % 100 == 0:
+            logger.info(f"Solved {done}/{len(layer_sums)} layers.")
+
+
+def _write_table(path: str, size: int, ops: _BoardOps, directory: str, layer_sums: Sequence[int]) -> int:
+    count = sum(len(np.load(_layer_path(directory, tile_sum, "boards"), mmap_mode="r")) for tile_sum in layer_sums)
+    bits = max(4, int(np.ceil(np.log2(count / LOAD_FACTOR))))
+    keys_offset, values_offset, moves_offset, file_size = _table_layout(bits)
+    capacity = 1 << bits
+
+    # The expected score of a new game: start positions weighted by how likely add_start_tiles makes them
+    boards, probabilities = start_boards(size)
+    boards = ops.canonical(boards)
+    start_value = 0.0
+    for tile_sum in np.unique(ops.tile_sum(boards)).tolist():
+        in_layer = ops.tile_sum(boards) == tile_sum
+        layer_boards = np.load(_layer_path(directory, tile_sum, "boards"))
+        layer_values = np.load(_layer_path(directory, tile_sum, "values"))
+        start_value += float(np.dot(probabilities[in_layer], layer_values[np.searchsorted(layer_boards, boards[in_layer])]))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, size, count, bits, start_value).ljust(HEADER_SIZE, b"\0"))
+        f.truncate(file_size)
+    table_keys = np.memmap(tmp_path, dtype="<u8", mode="r+", offset=keys_offset, shape=(capacity,))
+    table_values = np.memmap(tmp_path, dtype="<f4", mode="r+", offset=values_offset, shape=(capacity,))
+    table_moves = np.memmap(tmp_path, dtype=np.uint8, mode="r+", offset=moves_offset, shape=(capacity,))
+    for tile_sum in layer_sums:
+        _insert(
+            table_keys, table_values, table_moves, bits,
+            np.load(_layer_path(directory, tile_sum, "boards")),
+            np.load(_layer_path(directory, tile_sum, "values")).astype(np.float32),
+            np.load(_layer_path(directory, tile_sum, "moves")),
+        )
+    for array in (table_keys, table_values, table_moves):
+        array.flush()
+    del table_keys, table_values, table_moves
+    os.replace(tmp_path, path)
+    logger.info(f"Wrote {count} positions to {path}; expected score from the start {start_value:.2f}.")
+    return count
+
+
+class Tablebase:
+    """
+    Read-only, memory-mapped tablebase.
+    """
+    def __init__(self, path: str) -> None:
+        """
+        Opens a tablebase written by `build_tablebase`.
+
+        Raises:
+            ValueError: If the file is not a tablebase of a supported version.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.size, self.count, self.bits, self.start_value = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a version {VERSION} tablebase")
+        self._keys_offset, self._values_offset, self._moves_offset, file_size = _table_layout(self.bits)
+        if len(self._mmap) < file_size:
+            self._mmap.close()
+            raise ValueError(f"{path} is truncated")
+        self._mask = (1 << self.bits) - 1
+        self._shift = 64 - self.bits
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _find(self, key: int) -> Optional[int]:
+        buffer, unpack_key, keys_offset = self._mmap, _KEY.unpack_from, self._keys_offset
+        slot = ((key * _HASH_MULTIPLIER) & _MASK64) >> self._shift
+        while True:
+            stored = unpack_key(buffer, keys_offset + 8 * slot)[0]
+            if stored == key:
+                return slot
+            if stored == 0:
+                return None
+            slot = (slot + 1) & self._mask
+
+    def lookup(self, board: int) -> Optional[Tuple[Optional[int], float]]:
+        """
+        Looks up a position in any orientation.
+
+        Args:
+            board (int): The packed board.
+
+        Returns:
+            Optional[Tuple[Optional[int], float]]: The best move for `board` as given (None if no move
+            is legal) and the expected score still to be gained with optimal play, or None if the
+            position cannot be reached.
+        """
+        key, transform = bit_backend.canonicalize(board, self.size)
+        if key == 0:
+            return None  # The empty board is unreachable, and 0 also marks empty slots
+        slot = self._find(key)
+        if slot is None:
+            return None
+        value = _VALUE.unpack_from(self._mmap, self._values_offset + 4 * slot)[0]
+        direction = self._mmap[self._moves_offset + slot]
+        if direction == NO_MOVE:
+            return None, value
+        return bit_backend.from_canonical_direction(direction, transform), value
+
+    def best_move(self, board: int) -> Optional[int]:
+        found = self.lookup(board)
+        return found[0] if found is not None else None
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def __enter__(self) -> "Tablebase":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m game_backend.tablebase", description="Build or query a small-board tablebase.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Solve every reachable position and write a tablebase.")
+    build.add_argument("output", help="Tablebase file to write.")
+    build.add_argument("--size", type=int, default=3, help="Board size (2 or 3).")
+    build.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count, 0: none).")
+    build.add_argument("--chunk-size", type=int, default=1 << 16, help="Positions per task sent to a worker.")
+    build.add_argument("--work-dir", default=None, help="Directory for the per-layer files (default: next to the output).")
+
+    lookup = commands.add_parser("lookup", help="Look up positions given as hex packed boards.")
+    lookup.add_argument("tablebase", help="Tablebase file.")
+    lookup.add_argument("boards", nargs="*", help="Packed boards in hex; prints the table's summary if none.")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "build":
+        build_tablebase(args.output, size=args.size, workers=args.workers, chunk_size=args.chunk_size, work_directory=args.work_dir)
+        return
+
+    with Tablebase(args.tablebase) as tablebase:
+        if not args.boards:
+            print(f"{tablebase.size}x{tablebase.size}: {len(tablebase)} positions, expected score from the start {tablebase.start_value:.2f}")
+        for board in args.boards:
+            found = tablebase.lookup(int(board, 16))
+            if found is None:
+                print(f"{board}: unreachable")
+            else:
+                print(f"{board}: move {found[0] if found[0] is not None else '-'}, expected score {found[1]:.2f}")
+
+
+if __name__ == "__main__":
+    main()
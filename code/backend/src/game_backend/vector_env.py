@@ -0,0 +1,313 @@
+"""
+Gym-style vectorized 2048 environments.
+
+`VectorEnv` runs N games with the rules of `GameManager` (`bit_backend` moves, and spawns drawn
+like `add_random_tile`), sharded across worker processes. Observations, rewards, done flags and
+legal-move masks live in `multiprocessing.shared_memory` buffers: workers write them in place and
+`step` only sends a one-word command down each worker's pipe, so no per-environment data is pickled.
+"""
+import multiprocessing
+import os
+import random
+from multiprocessing import shared_memory
+from multiprocessing.connection import Connection
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from game_backend.core import bit_backend
+from game_backend.simulation import spawn_tile
+
+
+def _buffer_specs(num_envs: int, size: int) -> Dict[str, Tuple[Tuple[int, ...], Any]]:
+    return {
+        'observations': ((num_envs, size * size), np.uint8),
+        'actions': ((num_envs,), np.uint8),
+        'rewards': ((num_envs,), np.int32),
+        'dones': ((num_envs,), np.bool_),
+        'legal': ((num_envs, 4), np.bool_),
+        'scores': ((num_envs,), np.int64),
+        'final_scores': ((num_envs,), np.int64),
+        'lengths': ((num_envs,), np.int32),
+    }
+
+
+class _Shard:
+    """
+    The environments of one worker, stepping in place on views of the shared buffers.
+    """
+    def __init__(self, arrays: Dict[str, np.ndarray], start: int, end: int, size: int, seed: Optional[int], start_tiles: int) -> None:
+        self.views = {name: array[start:end] for name, array in arrays.items()}
+        self.size = size
+        self.start_tiles = start_tiles
+        self.rngs = [random.Random(None if seed is None else seed + index) for index in range(start, end)]
+        self.boards: List[int] = [0] * (end - start)
+
+    def _new_board(self, index: int) -> int:
+        board = 0
+        for _ in range(self.start_tiles):
+            board = spawn_tile(board, self.size, self.rngs[index])
+        return board
+
+    def _observe(self, index: int, board: int) -> None:
+        views, size = self.views, self.size
+        views['observations'][index] = bit_backend.exponents(board, size)
+        views['legal'][index] = [bit_backend.move(board, direction, size)[0] != board for direction in bit_backend.DIRECTIONS]
+
+    def reset(self) -> None:
+        views = self.views
+        for index in range(len(self.boards)):
+            self.boards[index] = board = self._new_board(index)
+            self._observe(index, board)
+        views['rewards'][:] = 0
+        views['dones'][:] = False
+        views['scores'][:] = 0
+        views['final_scores'][:] = 0
+        views['lengths'][:] = 0
+
+    def step(self) -> None:
+        views, size = self.views, self.size
+        actions, rewards, dones = views['actions'], views['rewards'], views['dones']
+        scores, final_scores, lengths = views['scores'], views['final_scores'], views['lengths']
+        for index, action in enumerate(actions.tolist()):
+            board = self.boards[index]
+            new_board, gained = bit_backend.move(board, action, size)
+            done = False
+            if new_board != board:
+                # Illegal moves leave the board unchanged, as in GameManager.play_turn
+                new_board = spawn_tile(new_board, size, self.rngs[index])
+                scores[index] += gained
+                lengths[index] += 1
+                done = not bit_backend.can_move(new_board, size)
+            rewards[index] = gained
+            dones[index] = done
+            if done:
+                # Auto-reset: the observation is the first of the next episode
+                final_scores[index] = scores[index]
+                scores[index] = 0
+                lengths[index] = 0
+                new_board = self._new_board(index)
+            self.boards[index] = new_board
+            self._observe(index, new_board)
+
+
+def _attach(names: Dict[str, str], num_envs: int, size: int) -> Tuple[List[shared_memory.SharedMemory], Dict[str, np.ndarray]]:
+    blocks, arrays = [], {}
+    for name, (shape, dtype) in _buffer_specs(num_envs, size).items():
+        block = shared_memory.SharedMemory(name=names[name])
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    return blocks, arrays
+
+
+def _worker(
+    conn: Connection, names: Dict[str, str], num_envs: int, size: int,
+    start: int, end: int, seed: Optional[int], start_tiles: int,
+) -> None:
+    blocks, arrays = _attach(names, num_envs, size)
+    shard = _Shard(arrays, start, end, size, seed, start_tiles)
+    try:
+        while True:
+            command = conn.recv()
+            if command == "step":
+                shard.step()
+            elif command == "reset":
+                shard.reset()
+            elif command == "close":
+                break
+            conn.send(None)
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        del shard, arrays
+        for block in blocks:
+            block.close()
+        conn.close()
+
+
+class VectorEnv:
+    """
+    N 2048 environments stepped together, with automatic reset at game over.
+
+    Observations are cell exponents in row-major order (0 = empty, 1 = 2, 2 = 4, ...), one row per
+    environment; actions are directions (0: up, 1: right, 2: down, 3: left). An illegal action
+    leaves the board unchanged with a reward of 0. When a game ends, `dones` is set, `final_scores`
+    holds its score, and the returned observation is already the first of a new game.
+
+    `reset` must be called before the first step. The arrays returned by `reset` and `step` are the
+    shared buffers themselves: they are overwritten by the next step, so copy them if they need to
+    outlive it.
+    """
+    def __init__(
+        self,
+        num_envs: int,
+        size: int = 4,
+        num_workers: Optional[int] = None,
+        seed: Optional[int] = None,
+        start_tiles: int = 2,
+    ) -> None:
+        """
+        Initializes the VectorEnv.
+
+        Args:
+            num_envs (int): Number of environments.
+            size (int): Board size.
+            num_workers (Optional[int]): Worker processes; 0 steps in the calling process. Defaults to the CPU count.
+            seed (Optional[int]): Environment i draws its tiles from `random.Random(seed + i)`.
+            start_tiles (int): Tiles on a new board.
+        """
+        if num_envs < 1:
+            raise ValueError("num_envs must be at least 1")
+        self.num_envs = num_envs
+        self.size = size
+        self.observation_shape = (size * size,)
+        self.action_count = len(bit_backend.DIRECTIONS)
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        self.num_workers = min(num_workers, num_envs)
+
+        self._blocks: List[shared_memory.SharedMemory] = []
+        arrays: Dict[str, np.ndarray] = {}
+        for name, (shape, dtype) in _buffer_specs(num_envs, size).items():
+            block = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize))
+            self._blocks.append(block)
+            arrays[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+            arrays[name][...] = 0
+        self.arrays = arrays
+        self.observations = arrays['observations']
+        self.rewards = arrays['rewards']
+        self.dones = arrays['dones']
+        self.legal = arrays['legal']
+        self.final_scores = arrays['final_scores']
+
+        self._connections: List[Connection] = []
+        self._processes: List[multiprocessing.Process] = []
+        self._local: Optional[_Shard] = None
+        self._started = False
+        self.closed = False
+
+        if self.num_workers == 0:
+            self._local = _Shard(arrays, 0, num_envs, size, seed, start_tiles)
+            return
+
+        names = {name: block.name for name, block in zip(arrays, self._blocks)}
+        context = multiprocessing.get_context("spawn")
+        bounds = np.linspace(0, num_envs, self.num_workers + 1).astype(int)
+        for start, end in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=_worker,
+                args=(child, names, num_envs, size, start, end, seed, start_tiles),
+                daemon=True,
+            )
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+
+    def _broadcast(self, command: str) -> None:
+        for conn in self._connections:
+            conn.send(command)
+
+    def _wait(self) -> None:
+        for conn in self._connections:
+            conn.recv()
+
+    def reset(self) -> np.ndarray:
+        """
+        Starts a new game in every environment.
+
+        Returns:
+            np.ndarray: Observations, shape (num_envs, size * size).
+        """
+        if self._local is not None:
+            self._local.reset()
+        else:
+            self._broadcast("reset")
+            self._wait()
+        self._started = True
+        return self.observations
+
+    def step_async(self, actions: Sequence[int]) -> None:
+        """
+        Starts a step; the workers run while the caller does other work until `step_wait`.
+
+        Raises:
+            RuntimeError: If `reset` has not been called yet.
+            ValueError: If there is not one action per environment or an action is not a direction.
+        """
+        if not self._started:
+            raise RuntimeError("VectorEnv.reset() must be called before stepping")
+        # Checked here, since a bad action would kill the worker stepping it
+        actions = np.asarray(actions)
+        if actions.shape != (self.num_envs,):
+            raise ValueError(f"Expected {self.num_envs} actions, got shape {actions.shape}")
+        if actions.dtype.kind not in "iu" or ((actions < 0) | (actions >= self.action_count)).any():
+            raise ValueError(f"Actions must be integers from 0 to {self.action_count - 1}")
+        self.arrays['actions'][:] = actions
+        if self._local is None:
+            self._broadcast("step")
+
+    def step_wait(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Waits for the step started by `step_async`.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[str, np.ndarray]]: Observations, rewards,
+            done flags, and infos with the legal-move masks (`legal`), final scores of the games that
+            just ended (`final_scores`), and current scores and lengths of the running games.
+        """
+        if self._local is not None:
+            self._local.step()
+        else:
+            self._wait()
+        infos = {
+            'legal': self.legal,
+            'final_scores': self.final_scores,
+            'scores': self.arrays['scores'],
+            'lengths': self.arrays['lengths'],
+        }
+        return self.observations, self.rewards, self.dones, infos
+
+    def step(self, actions: Sequence[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Plays one action in every environment (see `step_wait` for the results).
+        """
+        self.step_async(actions)
+        return self.step_wait()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        for conn in self._connections:
+            try:
+                conn.send("close")
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._connections:
+            conn.close()
+        self._local = None
+        self.arrays = self.observations = self.rewards = self.dones = self.legal = self.final_scores = None
+        for block in self._blocks:
+            try:
+                block.close()
+            except BufferError:
+                pass  # The caller still holds a returned array; the mapping goes away with it
+            block.unlink()
+
+    def __enter__(self) -> "VectorEnv":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        try:
+            self.close()
+        except Exception:
+            pass
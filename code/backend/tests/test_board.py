@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from game_backend.core import bit_backend
+from game_backend.core.array_backend import ArrayGrid, ArrayTile
+from game_backend.services import GameManager, LocalStorageManager
+
+
+def random_board(rng: random.Random, size: int, max_exponent: int = 10) -> int:
+    # Mostly small tiles and some empty cells, so boards have both merges and slides
+    cells = [rng.choice([0, 0, 1, 1, 2, 3]) if rng.random() < 0.8 else rng.randint(0, max_exponent) for _ in range(size * size)]
+    return bit_backend.from_exponents(cells)
+
+
+@pytest.fixture
+def game_manager(tmp_path):
+    def create(board: int, size: int) -> GameManager:
+        manager = GameManager(
+            grid=ArrayGrid(size=size),
+            tile_class=ArrayTile,
+            storage_manager=LocalStorageManager(str(tmp_path / "local_storage.json")),
+        )
+        manager.grid = ArrayGrid(size=size)
+        for x, column in enumerate(bit_backend.decode_values(board, size)):
+            for y, value in enumerate(column):
+                if value:
+                    manager.grid.insert_tile(ArrayTile((x, y), value))
+        manager.score = 0
+        return manager
+    return create
+
+
+@pytest.mark.parametrize("size", [2, 3, 4, 5])
+def test_move_matches_game_manager(game_manager, size):
+    rng = random.Random(size)
+    for _ in range(40):
+        board = random_board(rng, size)
+        assert bit_backend.can_move(board, size) == game_manager(board, size).moves_available()
+        for direction in bit_backend.DIRECTIONS:
+            manager = game_manager(board, size)
+            moved = manager._move(direction)
+            expected = bit_backend.encode_grid(manager.grid)
+
+            result, gained = bit_backend.move(board, direction, size)
+            assert result == expected, (hex(board), direction)
+            assert gained == manager.score
+            assert (result != board) == moved
+
+
+@pytest.mark.parametrize(
+    "line, expected, gained",
+    [
+        ([1, 1, 1, 1], [2, 2, 0, 0], 8),
+        ([1, 1, 2, 0], [2, 2, 0, 0], 4),
+        ([2, 1, 1, 0], [2, 2, 0, 0], 4),
+        ([0, 0, 0, 1], [1, 0, 0, 0], 0),
+        ([1, 2, 1, 2], [1, 2, 1, 2], 0),
+        ([3, 0, 3, 3], [4, 3, 0, 0], 16),
+    ],
+)
+def test_move_left_merges_each_tile_once(line, expected, gained):
+    board = bit_backend.from_exponents(line + [0] * 12)
+    assert bit_backend.move(board, 3, 4) == (bit_backend.from_exponents(expected + [0] * 12), gained)
+
+
+def test_empty_cells_follow_grid_order():
+    rng = random.Random(7)
+    for size in (3, 4, 5):
+        board = random_board(rng, size)
+        grid = ArrayGrid(size=size)
+        for x, column in enumerate(bit_backend.decode_values(board, size)):
+            for y, value in enumerate(column):
+                if value:
+                    grid.insert_tile(ArrayTile((x, y), value))
+        assert bit_backend.empty_cells(board, size) == [tuple(cell) for cell in grid._available_cells()]
@@ -0,0 +1,29 @@
+import json
+
+from game_backend.core import bit_backend
+from game_backend.dataset import DatasetReader, DatasetWriter, export_recorded_games
+
+
+def recorded_game(moves):
+    board = bit_backend.from_exponents([1, 1] + [0] * 14)
+    boards = [board]
+    for direction in moves[:-1]:
+        board, _ = bit_backend.move(board, direction, 4)
+        board = bit_backend.set_exponent(board, *bit_backend.empty_cells(board, 4)[0], 1)
+        boards.append(board)
+    return {'boards': boards, 'moves': moves}
+
+
+def test_malformed_games_are_skipped(tmp_path):
+    good = recorded_game([3, 2])
+    lines = [
+        json.dumps(good),
+        json.dumps(dict(good, moves=[3, 7])),
+        json.dumps(dict(good, moves=[3, "left"])),
+        json.dumps(dict(good, moves=[True, 2])),
+        json.dumps([good]),
+        json.dumps(good),
+    ]
+    with DatasetWriter(str(tmp_path), size=4) as writer:
+        assert export_recorded_games(lines, writer) == 2
+    assert len(DatasetReader(str(tmp_path))) == 4
@@ -0,0 +1,129 @@
+import random
+
+import pytest
+
+from game_backend.core import bit_backend
+from game_backend.core.array_backend import ArrayGrid, ArrayTile
+from game_backend.services import GameManager, LocalStorageManager
+from game_backend.services.game_history import GameHistory
+
+
+def play_random_game(rng: random.Random, size: int, moves: int):
+    """
+    Yields the direction, resulting board and score gained of each move of a random game, with
+    spawns drawn like GameManager.
+    """
+    board = bit_backend.set_exponent(0, 0, 0, 1, size)
+    for _ in range(moves):
+        if not bit_backend.can_move(board, size):
+            return
+        direction = rng.choice(bit_backend.legal_moves(board, size))
+        board, gained = bit_backend.move(board, direction, size)
+        x, y = rng.choice(bit_backend.empty_cells(board, size))
+        board = bit_backend.set_exponent(board, x, y, 2 if rng.random() < 0.1 else 1, size)
+        yield direction, board, gained
+
+
+@pytest.mark.parametrize("size, depth", [(4, 10000), (4, 50), (3, 7), (5, 100)])
+def test_undo_and_redo_restore_every_state(size, depth):
+    rng = random.Random(depth)
+    history = GameHistory(size=size, depth=depth)
+    start = bit_backend.set_exponent(0, 0, 0, 1, size)
+    history.reset(start)
+    boards, gains = [start], [0]
+    for direction, board, gained in play_random_game(rng, size, 300):
+        history.record(direction, board)
+        boards.append(board)
+        gains.append(gained)
+
+        if rng.random() < 0.2:
+            # Walk back some moves and forward again
+            steps = rng.randint(1, 2 * min(depth, 64))
+            undone = 0
+            while undone < steps and history.can_undo():
+                assert history.undo() == (boards[-2 - undone], gains[-1 - undone])
+                undone += 1
+            for redone in range(undone, 0, -1):
+                assert history.redo() == (boards[-redone], gains[-redone])
+            assert history.board == boards[-1]
+
+    undoable = min(depth, len(boards) - 1)
+    for step in range(undoable):
+        assert history.undo() == (boards[-2 - step], gains[-1 - step])
+    assert history.undo() is None
+    assert len(history) == 0
+
+
+def test_recording_after_undo_discards_redo_states():
+    history = GameHistory(size=4)
+    history.reset(bit_backend.set_exponent(0, 0, 0, 1, 4))
+    for direction, board, _ in play_random_game(random.Random(1), 4, 20):
+        history.record(direction, board)
+    for _ in range(5):
+        history.undo()
+
+    base = history.board
+    direction = bit_backend.legal_moves(base, 4)[0]
+    moved, _ = bit_backend.move(base, direction, 4)
+    x, y = bit_backend.empty_cells(moved, 4)[0]
+    history.record(direction, bit_backend.set_exponent(moved, x, y, 1, 4))
+    assert not history.can_redo()
+    assert history.undo()[0] == base
+
+
+def test_record_rejects_boards_that_do_not_follow_the_move():
+    history = GameHistory(size=4)
+    board = bit_backend.from_exponents([1, 1] + [0] * 14)
+    history.reset(board)
+    with pytest.raises(ValueError):
+        history.record(3, board)  # Two spawned tiles
+
+
+def test_memory_is_nine_bytes_per_4x4_state():
+    history = GameHistory(size=4)
+    history.reset(bit_backend.set_exponent(0, 0, 0, 1, 4))
+    moves = 0
+    for direction, board, _ in play_random_game(random.Random(3), 4, 10000):
+        history.record(direction, board)
+        moves += 1
+    assert moves > 100
+    # About 90 KB for a 10,000-move game
+    assert history.memory_usage() == 9 * (moves + 1)
+
+
+@pytest.fixture
+def game_manager(tmp_path):
+    return GameManager(
+        grid=ArrayGrid(size=4),
+        tile_class=ArrayTile,
+        storage_manager=LocalStorageManager(str(tmp_path / "local_storage.json")),
+    )
+
+
+def test_undo_restores_won_from_history(game_manager):
+    # A 2048 tile reached without a merge (e.g. restored from storage) does not win the game
+    game_manager.grid = ArrayGrid(size=4)
+    game_manager.grid.insert_tile(ArrayTile((0, 0), 2048))
+    game_manager.grid.insert_tile(ArrayTile((3, 3), 2))
+    game_manager.won = False
+    game_manager._reset_history()
+
+    game_manager.play_turn(3)
+    assert not game_manager.won
+    assert game_manager.undo()
+    assert not game_manager.won
+    assert game_manager.used_undo
+
+
+def test_undo_and_redo_keep_the_win_flag(game_manager):
+    game_manager.grid = ArrayGrid(size=4)
+    game_manager.grid.insert_tile(ArrayTile((0, 0), 1024))
+    game_manager.grid.insert_tile(ArrayTile((1, 0), 1024))
+    game_manager._reset_history()
+
+    game_manager.play_turn(3)
+    assert game_manager.won
+    assert game_manager.undo()
+    assert not game_manager.won
+    assert game_manager.redo()
+    assert game_manager.won
@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from game_backend.core import bit_backend
+from game_backend.core.bit_backend.board import _slide_line, _transpose_4, line_shifts
+
+
+def reference_move(board: int, direction: int, size: int = 4):
+    # The generic path: gather each line along the move, slide it and scatter it back
+    new_board, gained = 0, 0
+    for shifts in line_shifts(size, direction):
+        slid, score = _slide_line(tuple((board >> shift) & 0xF for shift in shifts))
+        gained += score
+        for exponent, shift in zip(slid, shifts):
+            new_board |= exponent << shift
+    return new_board, gained
+
+
+def random_boards(count: int = 500):
+    rng = random.Random(4)
+    boards = [bit_backend.from_exponents([rng.choice([0, 0, 1, 1, 2, 3]) for _ in range(16)]) for _ in range(count)]
+    # Full range of exponents, including unmergeable 15s
+    boards += [bit_backend.from_exponents([rng.randint(0, 15) for _ in range(16)]) for _ in range(count)]
+    return boards + [0, 0xFFFFFFFFFFFFFFFF]
+
+
+@pytest.mark.parametrize("direction", bit_backend.DIRECTIONS)
+def test_4x4_fast_path_matches_generic_move(direction):
+    for board in random_boards():
+        assert bit_backend.move(board, direction, 4) == reference_move(board, direction), (hex(board), direction)
+
+
+def test_transpose_4_swaps_coordinates():
+    for board in random_boards(100):
+        transposed = _transpose_4(board)
+        for y in range(4):
+            for x in range(4):
+                assert bit_backend.get_exponent(transposed, y, x) == bit_backend.get_exponent(board, x, y)
+
+
+def test_empty_cells_lists_zero_nibbles():
+    for size in (3, 4, 5):
+        rng = random.Random(size)
+        board = bit_backend.from_exponents([rng.choice([0, 1, 2]) for _ in range(size * size)])
+        expected = [(x, y) for x in range(size) for y in range(size) if not bit_backend.get_exponent(board, x, y, size)]
+        assert bit_backend.empty_cells(board, size) == expected
@@ -0,0 +1,49 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from game_backend.services import api_server
+from game_backend.services.multiplex import MultiplexSession
+
+
+def test_frames_with_too_many_commands_are_rejected_whole():
+    session = MultiplexSession(api_server.manager, "connection", max_frame_commands=4)
+    frame = json.dumps([{"id": i, "op": "create"} for i in range(5)])
+    assert session.parse_frame(frame) == []
+    assert [json.loads(reply) for reply in session.run_round()] == [{"error": "At most 4 commands per frame"}]
+
+
+def test_rounds_stop_at_their_command_budget():
+    session = MultiplexSession(api_server.manager, "connection", round_commands=3, round_seconds=60)
+    for command in session.parse_frame(json.dumps([{"id": i, "op": "undo"} for i in range(5)])):
+        session.enqueue(command)
+    assert len(session.run_round()) == 3
+    assert [json.loads(reply)["id"] for reply in session.run_round()] == [3, 4]
+    assert not session.pending
+
+
+def test_every_command_of_a_frame_costs_a_token(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(api_server.manager.rate_limiter, "mux_burst", 10.0)
+    monkeypatch.setattr(api_server.manager.rate_limiter, "mux_rate", 1.0)
+    with TestClient(api_server.app).websocket_connect("/ws/games") as websocket:
+        websocket.send_text(json.dumps([{"id": i, "op": "create"} for i in range(15)]))
+        replies = []
+        while len(replies) < 15:
+            replies.extend(json.loads(websocket.receive_text()))
+    limited = [reply for reply in replies if reply.get("error") == "Rate limit exceeded"]
+    assert 5 <= len(limited) < 15
+    assert all("retryAfter" in reply for reply in limited)
+
+
+def test_multiplexed_games_have_their_own_budget_and_no_storage(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    commands = 2 * int(api_server.manager.rate_limiter.session_burst)
+    with TestClient(api_server.app).websocket_connect("/ws/games") as websocket:
+        websocket.send_text(json.dumps([{"id": i, "op": "create"} for i in range(commands)]))
+        replies = []
+        while len(replies) < commands:
+            replies.extend(json.loads(websocket.receive_text()))
+    # Twice a single-game session's burst goes through, and nothing is written to local storage
+    assert all("state" in reply for reply in replies)
+    assert not (tmp_path / "local_storage.json").exists()
@@ -0,0 +1,21 @@
+import pytest
+
+from game_backend.services.profiling import SpanRecorder
+
+
+def test_disabled_spans_share_one_no_op_context():
+    recorder = SpanRecorder()
+    assert recorder.span("a") is recorder.span("b")
+    with recorder.span("a"):
+        pass
+    assert recorder.stats == {}
+
+
+def test_enabled_spans_record_every_exit():
+    recorder = SpanRecorder(enabled=True)
+    with recorder.span("move"):
+        pass
+    with pytest.raises(KeyError):
+        with recorder.span("move"):
+            raise KeyError
+    assert recorder.snapshot()["spans"]["move"]["count"] == 2
@@ -0,0 +1,59 @@
+import asyncio
+import random
+
+import pytest
+
+from game_backend.core import bit_backend
+from game_backend.replay import ReplayVerifier, verify_record
+from game_backend.simulation import spawn_tile
+
+
+def seeded_record(seed: int, moves: int = 50):
+    rng = random.Random(seed)
+    board = spawn_tile(spawn_tile(0, 4, rng), 4, rng)
+    directions, score = [], 0
+    for _ in range(moves):
+        legal = bit_backend.legal_moves(board, 4)
+        if not legal:
+            break
+        directions.append(legal[0])
+        board, gained = bit_backend.move(board, legal[0], 4)
+        board = spawn_tile(board, 4, rng)
+        score += gained
+    return {"id": seed, "seed": seed, "moves": directions, "score": score}
+
+
+def test_seeded_records_verify():
+    record = seeded_record(1)
+    assert verify_record(record)["valid"]
+    assert not verify_record(dict(record, score=record["score"] + 4))["valid"]
+
+
+def test_boolean_fields_are_rejected():
+    assert not verify_record(dict(seeded_record(2), seed=True))["valid"]
+    board = [2, 2] + [0] * 14
+    record = {"board": board, "moves": [3], "spawns": [[True, False, 2]], "score": 4}
+    result = verify_record(record)
+    assert result == {"valid": False, "error": "Spawn outside the board", "moveIndex": 0}
+    assert verify_record(dict(record, spawns=[[1, 0, 2]]))["valid"]
+
+
+def test_small_batches_skip_the_pool():
+    verifier = ReplayVerifier(workers=1, chunk_size=8)
+    records = [seeded_record(seed) for seed in range(8)]
+    results = asyncio.run(verifier.verify_async(records))
+    assert [result["id"] for result in results] == list(range(8))
+    assert all(result["valid"] for result in results)
+    assert verifier._pool is None
+
+
+@pytest.mark.parametrize(
+    "field, value",
+    [("spawns", [[1, 0, {}]]), ("spawns", [[1, 0, [2]]]), ("board", [[2], 2] + [0] * 14), ("board", [{}, 2] + [0] * 14)],
+)
+def test_unhashable_values_fail_only_their_record(field, value):
+    good = {"board": [2, 2] + [0] * 14, "moves": [3], "spawns": [[1, 0, 2]], "score": 4}
+    records = [good, dict(good, **{field: value}), good]
+    results = ReplayVerifier(workers=1).verify(records)
+    assert [result["valid"] for result in results] == [True, False, True]
+    assert "must be 2 or 4" in results[1]["error"]
@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from game_backend.core import bit_backend
+from game_backend.core.array_backend import ArrayGrid, ArrayTile
+from game_backend.core.bit_backend.symmetry import _cell_maps, _compose
+
+SIZES = [2, 3, 4, 5]
+
+
+def random_boards(size: int, count: int = 50):
+    rng = random.Random(size)
+    return [bit_backend.from_exponents([rng.randint(0, 6) for _ in range(size * size)]) for _ in range(count)]
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_apply_transform_moves_every_cell(size):
+    for board in random_boards(size):
+        for transform in bit_backend.TRANSFORMS:
+            transformed = bit_backend.apply_transform(board, transform, size)
+            for y in range(size):
+                for x in range(size):
+                    tx, ty = bit_backend.transform_cell(x, y, transform, size)
+                    assert bit_backend.get_exponent(transformed, tx, ty, size) == bit_backend.get_exponent(board, x, y, size)
+
+
+def test_4x4_tables_match_cell_permutations():
+    for board in random_boards(4):
+        for transform, destinations in enumerate(_cell_maps(4)):
+            expected = 0
+            for index, destination in enumerate(destinations):
+                expected |= ((board >> (4 * index)) & 0xF) << (4 * destination)
+            assert bit_backend.apply_transform(board, transform, 4) == expected
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_inverse_and_composition(size):
+    for board in random_boards(size, count=10):
+        for first in bit_backend.TRANSFORMS:
+            once = bit_backend.apply_transform(board, first, size)
+            assert bit_backend.apply_transform(once, bit_backend.INVERSE[first], size) == board
+            for second in bit_backend.TRANSFORMS:
+                twice = bit_backend.apply_transform(once, second, size)
+                assert bit_backend.apply_transform(board, _compose(first, second), size) == twice
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_moves_commute_with_transforms(size):
+    for board in random_boards(size, count=20):
+        for transform in bit_backend.TRANSFORMS:
+            transformed = bit_backend.apply_transform(board, transform, size)
+            for direction in bit_backend.DIRECTIONS:
+                canonical_direction = bit_backend.to_canonical_direction(direction, transform)
+                assert bit_backend.from_canonical_direction(canonical_direction, transform) == direction
+
+                moved, gained = bit_backend.move(board, direction, size)
+                moved_transformed, gained_transformed = bit_backend.move(transformed, canonical_direction, size)
+                assert bit_backend.apply_transform(moved, transform, size) == moved_transformed
+                assert gained == gained_transformed
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_canonicalize_is_symmetry_invariant(size):
+    for board in random_boards(size, count=20):
+        key, transform = bit_backend.canonicalize(board, size)
+        symmetries = [bit_backend.apply_transform(board, t, size) for t in bit_backend.TRANSFORMS]
+        assert key == min(symmetries)
+        assert bit_backend.apply_transform(board, transform, size) == key
+        for symmetric in symmetries:
+            assert bit_backend.canonical_key(symmetric, size) == key
+
+
+def test_canonicalize_accepts_grids():
+    board = random_boards(4, count=1)[0]
+    grid = ArrayGrid(size=4)
+    for x, column in enumerate(bit_backend.decode_values(board, 4)):
+        for y, value in enumerate(column):
+            if value:
+                grid.insert_tile(ArrayTile((x, y), value))
+    assert bit_backend.canonicalize(grid) == bit_backend.canonicalize(board, 4)
@@ -0,0 +1,78 @@
+from functools import lru_cache
+
+import pytest
+
+from game_backend.core import bit_backend
+from game_backend.core.bit_backend.search import SPAWNS
+from game_backend.tablebase import Tablebase, build_tablebase, start_boards
+
+SIZE = 2
+
+
+@lru_cache(maxsize=None)
+def solve(board: int) -> float:
+    """
+    Expected score still to be gained from `board` with optimal play, by plain recursion.
+    """
+    return max((move_value(board, direction) for direction in bit_backend.legal_moves(board, SIZE)), default=0.0)
+
+
+def move_value(board: int, direction: int) -> float:
+    moved, gained = bit_backend.move(board, direction, SIZE)
+    cells = bit_backend.empty_cells(moved, SIZE)
+    expected = sum(
+        probability * solve(bit_backend.set_exponent(moved, x, y, exponent, SIZE))
+        for x, y in cells
+        for exponent, probability in SPAWNS
+    )
+    return gained + expected / len(cells)
+
+
+def reachable(boards):
+    seen, stack = set(), list(boards)
+    while stack:
+        board = stack.pop()
+        if board in seen:
+            continue
+        seen.add(board)
+        for direction in bit_backend.legal_moves(board, SIZE):
+            moved, _ = bit_backend.move(board, direction, SIZE)
+            for x, y in bit_backend.empty_cells(moved, SIZE):
+                for exponent, _ in SPAWNS:
+                    stack.append(bit_backend.set_exponent(moved, x, y, exponent, SIZE))
+    return seen
+
+
+@pytest.fixture(scope="module")
+def tablebase(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("tablebase") / "2x2.tb")
+    # Small chunks so layers are split across several tasks
+    build_tablebase(path, size=SIZE, workers=0, chunk_size=8)
+    with Tablebase(path) as table:
+        yield table
+
+
+def test_2x2_tablebase_matches_recursive_solver(tablebase):
+    boards, probabilities = start_boards(SIZE)
+    positions = reachable(int(board) for board in boards)
+    assert len(tablebase) == len({bit_backend.canonical_key(board, SIZE) for board in positions})
+
+    for board in positions:
+        direction, value = tablebase.lookup(board)
+        expected = solve(board)
+        assert value == pytest.approx(expected, rel=1e-5, abs=1e-4), hex(board)
+        if direction is None:
+            assert not bit_backend.legal_moves(board, SIZE)
+        else:
+            # Ties may be broken either way; the stored move only has to be optimal
+            assert move_value(board, direction) == pytest.approx(expected, rel=1e-5, abs=1e-4), hex(board)
+
+    start_value = sum(probability * solve(int(board)) for board, probability in zip(boards, probabilities))
+    assert tablebase.start_value == pytest.approx(start_value, rel=1e-6)
+
+
+def test_unreachable_boards_are_not_found(tablebase):
+    assert tablebase.lookup(0) is None
+    assert tablebase.best_move(0) is None
+    # A 2x2 board cannot hold a 2048 tile
+    assert tablebase.lookup(bit_backend.from_exponents([11, 1, 0, 0])) is None
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from game_backend.core import bit_backend
+from game_backend.vector_env import VectorEnv
+
+
+def test_step_before_reset_raises():
+    with VectorEnv(2, num_workers=0, seed=0) as env:
+        with pytest.raises(RuntimeError):
+            env.step([0, 0])
+
+
+def test_reset_starts_playable_games():
+    with VectorEnv(4, num_workers=0, seed=0) as env:
+        observations = env.reset()
+        assert (np.count_nonzero(observations, axis=1) == 2).all()
+        assert env.legal.any(axis=1).all()
+        for _ in range(20):
+            actions = [int(np.flatnonzero(legal)[0]) for legal in env.legal]
+            observations, rewards, dones, infos = env.step(actions)
+        for row, legal in zip(observations, infos['legal']):
+            board = bit_backend.from_exponents(row.tolist())
+            assert legal.tolist() == [bit_backend.move(board, d, 4)[0] != board for d in bit_backend.DIRECTIONS]
+
+
+@pytest.mark.parametrize("actions", [[0], [0, 1, 2], [0, 4], [-1, 0], [0.5, 1], [True, False]])
+def test_invalid_actions_are_rejected_before_stepping(actions):
+    with VectorEnv(2, num_workers=0, seed=0) as env:
+        env.reset()
+        before = env.observations.copy()
+        with pytest.raises(ValueError):
+            env.step(actions)
+        assert (env.observations == before).all()
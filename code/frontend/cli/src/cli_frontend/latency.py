@@ -0,0 +1,124 @@
+import json
+import math
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+
+class RollingHistogram:
+    """
+    Latency samples in milliseconds over a sliding window of the most recent ones.
+    """
+    # Upper bounds of the exported buckets; samples above the last bound go to an overflow bucket
+    BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+    def __init__(self, window: int = 1000) -> None:
+        """
+        Initializes the RollingHistogram.
+
+        Args:
+            window (int): Number of most recent samples kept.
+        """
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.total: int = 0
+
+    def add(self, ms: float) -> None:
+        self.samples.append(ms)
+        self.total += 1
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """
+        Nearest-rank percentile of the window, or None if there are no samples.
+        """
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+        return ordered[rank]
+
+    def buckets(self) -> List[int]:
+        """
+        Sample counts of the window per bucket of `BOUNDS_MS`, plus the overflow bucket.
+        """
+        counts = [0] * (len(self.BOUNDS_MS) + 1)
+        for sample in self.samples:
+            counts[bisect_left(self.BOUNDS_MS, sample)] += 1
+        return counts
+
+    def summary(self) -> Dict[str, Any]:
+        def ms(value: Optional[float]) -> Optional[float]:
+            return round(value, 3) if value is not None else None
+
+        samples = self.samples
+        return {
+            'count': self.total,
+            'window': len(samples),
+            'meanMs': ms(sum(samples) / len(samples)) if samples else None,
+            'p50Ms': ms(self.percentile(50)),
+            'p90Ms': ms(self.percentile(90)),
+            'p99Ms': ms(self.percentile(99)),
+            'maxMs': ms(max(samples)) if samples else None,
+            'buckets': [
+                {'leMs': bound, 'count': count}
+                for bound, count in zip(list(self.BOUNDS_MS) + [None], self.buckets())
+            ],
+        }
+
+
+class LatencyStats:
+    """
+    Rolling latency histograms of a game connection.
+
+    - `rtt`: from sending a move to receiving its reply.
+    - `server`: time the server spent on the move, as echoed in the reply.
+    - `network`: `rtt` minus `server`, i.e. the network and both ends' socket handling.
+    - `decode`: time spent decoding the reply's JSON.
+    - `ping`: WebSocket ping/pong round trip, independent of the game.
+    """
+    METRICS = ('rtt', 'server', 'network', 'decode', 'ping')
+
+    def __init__(self, window: int = 1000) -> None:
+        """
+        Initializes the LatencyStats.
+
+        Args:
+            window (int): Number of most recent samples kept per metric.
+        """
+        self.histograms: Dict[str, RollingHistogram] = {name: RollingHistogram(window) for name in self.METRICS}
+        self.errors: int = 0
+        self.started: float = time.time()
+
+    def record(self, metric: str, ms: float) -> None:
+        self.histograms[metric].add(ms)
+
+    def status_line(self) -> str:
+        """
+        One-line summary for the terminal: move round trip percentiles and the medians of its parts.
+        """
+        def fmt(value: Optional[float]) -> str:
+            return f"{value:.1f}" if value is not None else "-"
+
+        rtt = self.histograms['rtt']
+        parts = [f"rtt p50 {fmt(rtt.percentile(50))} p99 {fmt(rtt.percentile(99))}"]
+        for name in ('server', 'network', 'decode', 'ping'):
+            parts.append(f"{name} {fmt(self.histograms[name].percentile(50))}")
+        line = " | ".join(parts) + " ms"
+        if self.errors:
+            line += f" | {self.errors} errors"
+        return line
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'startedAt': self.started,
+            'endedAt': time.time(),
+            'errors': self.errors,
+            **{name: histogram.summary() for name, histogram in self.histograms.items()},
+        }
+
+    def dump(self, path: str) -> None:
+        """
+        Writes the histograms as JSON to a file.
+        """
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
@@ -1,4 +1,5 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
 import curses
 
 class Renderer:
@@ -41,6 +42,26 @@ class Renderer:
         self.stdscr.addstr(grid_state['grid']['size'] + 3, 0, "Use WASD or Arrow keys to move. Press 'q' to exit.")
         self.stdscr.refresh()
 
+    def draw_status(self, text: str) -> None:
+        """
+        Writes a status line on the bottom row of the screen.
+
+        Args:
+            text (str): The status text, truncated to the screen width.
+        """
+        rows, columns = self.stdscr.getmaxyx()
+        try:
+            self.stdscr.addstr(rows - 1, 0, text[:columns - 1])
+            self.stdscr.clrtoeol()
+        except curses.error:
+            pass  # Screen too small for the status line
+        self.stdscr.refresh()
+
+    async def wait_animation(self) -> None:
+        """
+        Waits for the animation of the last render, if any, to finish.
+        """
+
     def show_game_over(self, message: str) -> None:
         """
         Displays the game over message.
@@ -50,4 +71,143 @@ class Renderer:
         """
         self.stdscr.addstr(0, 0, message, curses.A_BLINK | curses.A_BOLD)
         self.stdscr.addstr(1, 0, "Press any key to exit.")
-        self.stdscr.refresh()
\ No newline at end of file
+        self.stdscr.refresh()
+
+
+class IncrementalRenderer(Renderer):
+    """
+    Renderer that keeps the last drawn board and only rewrites what changed.
+
+    The first frame (and any frame after a resize or game over message) is painted in full.
+    After that a move costs a handful of cell writes plus the score, instead of a cleared and
+    repainted screen, which keeps terminal output small over high-latency links.
+
+    Tiles do not slide: the optional animation only flashes the cells a move merged into or
+    spawned on. It runs as a task on the event loop, sleeping between frames, so replies and
+    keys keep being handled while it plays; the next render cuts it short.
+    """
+    CELL_WIDTH = 5
+    GRID_TOP = 2
+    HIGHLIGHT = curses.A_BOLD | curses.A_REVERSE
+
+    def __init__(self, stdscr: curses.window, animation_frames: int = 0, frame_time_ms: int = 30) -> None:
+        """
+        Initializes the IncrementalRenderer.
+
+        Args:
+            stdscr (curses.window): The curses window object.
+            animation_frames (int): Frames used to flash merged and spawned cells. 0 disables animation,
+                as does rendering outside a running event loop.
+            frame_time_ms (int): Duration of each animation frame in milliseconds.
+        """
+        super().__init__(stdscr)
+        self.animation_frames = animation_frames
+        self.frame_time_ms = frame_time_ms
+        self._cells: Optional[Dict[Tuple[int, int], int]] = None
+        self._score: Optional[int] = None
+        self._size: Optional[int] = None
+        self._screen_size: Optional[Tuple[int, int]] = None
+        self._animation: Optional[asyncio.Task] = None
+        self._animated: List[Tuple[int, int]] = []
+
+    def invalidate(self) -> None:
+        """
+        Forces the next render to repaint the whole screen.
+        """
+        self._cells = None
+
+    def render_grid(self, grid_state: Dict[str, Any]) -> None:
+        """
+        Renders the current game grid and score, writing only cells that changed since the last render.
+
+        Args:
+            grid_state (Dict[str, Any]): The current state of the game grid and score.
+        """
+        size = grid_state['grid']['size']
+        columns = grid_state['grid']['cells']
+        cells = {
+            (x, y): columns[x][y]['value'] if columns[x][y] else 0
+            for x in range(size)
+            for y in range(size)
+        }
+        screen_size = self.stdscr.getmaxyx()
+        self._stop_animation()
+
+        if self._cells is None or size != self._size or screen_size != self._screen_size:
+            self._paint_full(grid_state, cells, size)
+        else:
+            changed = [cell for cell, value in cells.items() if self._cells[cell] != value]
+            if grid_state['score'] != self._score:
+                self._draw_score(grid_state['score'])
+            # Merges and spawns are the cells whose value grew; slides only moved tiles around
+            grown = [cell for cell in changed if cells[cell] > self._cells[cell]]
+            for cell in changed:
+                self._draw_cell(cell, cells[cell])
+            if grown and self.animation_frames > 0:
+                self._start_animation(grown, cells)
+
+        self._cells = cells
+        self._score = grid_state['score']
+        self._size = size
+        self._screen_size = screen_size
+        self.stdscr.refresh()
+
+    async def wait_animation(self) -> None:
+        if self._animation is not None:
+            # asyncio.wait neither cancels the animation nor raises if it was cut short
+            await asyncio.wait({self._animation})
+
+    def show_game_over(self, message: str) -> None:
+        self._stop_animation()
+        super().show_game_over(message)
+        self.invalidate()
+
+    def _paint_full(self, grid_state: Dict[str, Any], cells: Dict[Tuple[int, int], int], size: int) -> None:
+        self.stdscr.erase()
+        self._draw_score(grid_state['score'])
+        self.stdscr.addstr(1, 0, "-" * (size * 6))
+        for cell, value in cells.items():
+            self._draw_cell(cell, value)
+        self.stdscr.addstr(size + 3, 0, "Use WASD or Arrow keys to move. Press 'q' to exit.")
+
+    def _draw_score(self, score: int) -> None:
+        self.stdscr.addstr(0, 0, f"Score: {score}", curses.A_BOLD)
+        self.stdscr.clrtoeol()
+
+    def _draw_cell(self, cell: Tuple[int, int], value: int, attr: int = curses.A_NORMAL) -> None:
+        x, y = cell
+        text = f"{value:4} " if value else "   . "
+        self.stdscr.addstr(y + self.GRID_TOP, x * self.CELL_WIDTH, text, attr)
+
+    def _start_animation(self, grown: List[Tuple[int, int]], cells: Dict[Tuple[int, int], int]) -> None:
+        try:
+            self._animation = asyncio.get_running_loop().create_task(self._animate(grown, cells))
+        except RuntimeError:
+            return  # No event loop to drive the frames
+        self._animated = grown
+
+    def _stop_animation(self) -> None:
+        if self._animation is None:
+            return
+        if not self._animation.done():
+            self._animation.cancel()
+            if self._cells is not None:
+                # Leave no cell highlighted by a cut-short frame
+                for cell in self._animated:
+                    self._draw_cell(cell, self._cells[cell])
+        self._animation = None
+        self._animated = []
+
+    async def _animate(self, grown: List[Tuple[int, int]], cells: Dict[Tuple[int, int], int]) -> None:
+        """
+        Flashes merged and spawned cells, bounded by `animation_frames * frame_time_ms`.
+        """
+        for frame in range(self.animation_frames):
+            attr = self.HIGHLIGHT if frame % 2 == 0 else curses.A_NORMAL
+            for cell in grown:
+                self._draw_cell(cell, cells[cell], attr)
+            self.stdscr.refresh()
+            await asyncio.sleep(self.frame_time_ms / 1000)
+        for cell in grown:
+            self._draw_cell(cell, cells[cell])
+        self.stdscr.refresh()
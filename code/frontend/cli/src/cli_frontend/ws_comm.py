@@ -1,48 +1,173 @@
 import asyncio
 import json
-from typing import Any, Dict, Optional
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
 import websockets
 import logging
 
+from .latency import LatencyStats
+
 logger = logging.getLogger(__name__)
 
 class WebSocketCommunication:
-    def __init__(self, uri: str):
+    def __init__(self, uri: str, timing: bool = True, ping_interval: Optional[float] = 5.0, window: int = 1000):
+        """
+        Initializes the WebSocketCommunication.
+
+        Args:
+            uri (str): WebSocket URI of the game endpoint.
+            timing (bool): Ask the server to echo its processing time in each reply (`?timing=1`).
+            ping_interval (Optional[float]): Seconds between ping/pong round trip measurements. None disables them.
+            window (int): Number of most recent samples kept per latency histogram.
+        """
+        if timing:
+            uri += ("&" if "?" in uri else "?") + "timing=1"
         self.uri = uri
         self.websocket: Optional[websockets.WebSocketClientProtocol] = None
         self.game_state: Optional[Dict[str, Any]] = None
+        self.ping_interval = ping_interval
+        self.latency = LatencyStats(window)
+        self._sent: Deque[float] = deque()  # Send times of queued moves awaiting their reply
+        self._ping_task: Optional[asyncio.Task] = None
 
     async def connect(self):
         try:
             self.websocket = await websockets.connect(self.uri)
             # Receive initial game state
             data = await self.websocket.recv()
-            self.game_state = json.loads(data)
+            self.game_state, _ = self._decode(data)
             logger.info("Connected to WebSocket server.")
         except Exception as e:
+            self.latency.errors += 1
             logger.error(f"Failed to connect to WebSocket server: {e}")
+            return
+        if self.ping_interval:
+            self._ping_task = asyncio.ensure_future(self._ping_loop())
+
+    def _decode(self, data: str) -> Tuple[Dict[str, Any], Optional[float]]:
+        """
+        Decodes a reply, recording the decode time and the server time it carries.
+
+        Returns:
+            Tuple[Dict[str, Any], Optional[float]]: The message without its timing field, and the server time in milliseconds if echoed.
+        """
+        start = time.perf_counter()
+        message = json.loads(data)
+        self.latency.record('decode', (time.perf_counter() - start) * 1000)
+        server_ms = message.pop('serverMs', None)
+        if server_ms is not None:
+            self.latency.record('server', server_ms)
+        return message, server_ms
+
+    def _record_round_trip(self, sent: float, received: float, server_ms: Optional[float]) -> None:
+        rtt_ms = (received - sent) * 1000
+        self.latency.record('rtt', rtt_ms)
+        if server_ms is not None:
+            self.latency.record('network', max(0.0, rtt_ms - server_ms))
+
+    async def _ping_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            start = time.perf_counter()
+            try:
+                pong = await self.websocket.ping()
+                await asyncio.wait_for(pong, timeout=max(self.ping_interval, 1.0))
+            except asyncio.TimeoutError:
+                # A late pong is counted and pinging goes on; only a closed connection stops the loop
+                self.latency.errors += 1
+                logger.error("WebSocket ping timed out.")
+                continue
+            except websockets.exceptions.ConnectionClosed:
+                return
+            self.latency.record('ping', (time.perf_counter() - start) * 1000)
 
     async def send_move(self, direction: int) -> bool:
         if self.websocket:
             try:
                 message = json.dumps({"direction": direction})
+                sent = time.perf_counter()
                 await self.websocket.send(message)
                 data = await self.websocket.recv()
-                self.game_state = json.loads(data)
+                received = time.perf_counter()
+                message, server_ms = self._decode(data)
+                self._record_round_trip(sent, received, server_ms)
+                self._apply_reply(message)
                 return True
             except websockets.exceptions.ConnectionClosed:
+                self.latency.errors += 1
                 logger.error("WebSocket connection closed by the server.")
                 return False
             except Exception as e:
+                self.latency.errors += 1
                 logger.error(f"Error sending move: {e}")
                 return False
         logger.error("WebSocket is not connected.")
         return False
 
+    async def queue_move(self, direction: int) -> bool:
+        """
+        Sends a move without waiting for its reply, so several moves can be in flight.
+        Replies are read with `next_state`, one per queued move, in order.
+        """
+        if self.websocket:
+            try:
+                await self.websocket.send(json.dumps({"direction": direction}))
+                self._sent.append(time.perf_counter())
+                return True
+            except websockets.exceptions.ConnectionClosed:
+                self.latency.errors += 1
+                logger.error("WebSocket connection closed by the server.")
+                return False
+        logger.error("WebSocket is not connected.")
+        return False
+
+    async def next_state(self) -> Optional[Dict[str, Any]]:
+        """
+        Waits for the next message from the server.
+
+        Returns:
+            Optional[Dict[str, Any]]: The decoded message (a game state or an error), or None once the connection is closed.
+        """
+        if not self.websocket:
+            return None
+        try:
+            data = await self.websocket.recv()
+        except websockets.exceptions.ConnectionClosed:
+            return None
+        received = time.perf_counter()
+        message, server_ms = self._decode(data)
+        if self._sent:
+            # Replies come back in the order the moves were queued
+            self._record_round_trip(self._sent.popleft(), received, server_ms)
+        self._apply_reply(message)
+        return message
+
+    def _apply_reply(self, message: Dict[str, Any]) -> None:
+        """
+        Keeps a game state reply. Error replies are not states; they may carry the current one (e.g. rate limiting).
+        """
+        if 'error' not in message:
+            self.game_state = message
+            return
+        self.latency.errors += 1
+        logger.warning(f"Server error: {message['error']}")
+        if 'state' in message:
+            self.game_state = message['state']
+
+    def forget_pending(self) -> None:
+        """
+        Drops the send times of queued moves, e.g. once their replies are presumed lost.
+        """
+        self._sent.clear()
+
     def get_game_state(self) -> Optional[Dict[str, Any]]:
         return self.game_state
 
     async def close(self):
+        if self._ping_task:
+            self._ping_task.cancel()
+            self._ping_task = None
         if self.websocket:
             await self.websocket.close()
-            logger.info("WebSocket connection closed.")
\ No newline at end of file
+            logger.info("WebSocket connection closed.")
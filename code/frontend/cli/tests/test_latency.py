@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from cli_frontend.latency import RollingHistogram
+from cli_frontend.ws_comm import WebSocketCommunication
+
+
+@pytest.mark.parametrize(
+    "pct, expected",
+    [(1, 1), (10, 1), (11, 2), (50, 5), (90, 9), (91, 10), (99, 10), (100, 10)],
+)
+def test_percentile_is_nearest_rank(pct, expected):
+    histogram = RollingHistogram()
+    for ms in range(10, 0, -1):
+        histogram.add(ms)
+    assert histogram.percentile(pct) == expected
+
+
+class SilentWebSocket:
+    """
+    Answers pings only after a number of them have gone unanswered.
+    """
+    def __init__(self, lost: int) -> None:
+        self.lost = lost
+        self.pings = 0
+
+    async def ping(self):
+        self.pings += 1
+        pong = asyncio.get_running_loop().create_future()
+        if self.pings > self.lost:
+            pong.set_result(None)
+        return pong
+
+
+def test_ping_loop_survives_timeouts():
+    async def run():
+        comm = WebSocketCommunication("ws://unused", ping_interval=0.001)
+        comm.websocket = SilentWebSocket(lost=2)
+        task = asyncio.ensure_future(comm._ping_loop())
+        while not comm.latency.histograms['ping'].samples:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        return comm
+
+    comm = asyncio.run(asyncio.wait_for(run(), timeout=10))
+    assert comm.latency.errors == 2
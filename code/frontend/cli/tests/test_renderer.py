@@ -0,0 +1,70 @@
+import asyncio
+import curses
+
+import pytest
+
+from cli_frontend.renderer import IncrementalRenderer
+
+
+class FakeWindow:
+    """
+    Records the attributes cells are drawn with.
+    """
+    def __init__(self) -> None:
+        self.attrs = {}
+
+    def addstr(self, y, x, text, attr=curses.A_NORMAL):
+        self.attrs[(y, x)] = attr
+
+    def getmaxyx(self):
+        return 24, 80
+
+    def nodelay(self, flag): pass
+    def keypad(self, flag): pass
+    def refresh(self): pass
+    def erase(self): pass
+    def clrtoeol(self): pass
+
+
+def state(values, score=0):
+    return {
+        'score': score,
+        'grid': {'size': 2, 'cells': [[{'value': v} if v else None for v in column] for column in values]},
+    }
+
+
+@pytest.fixture
+def renderer(monkeypatch):
+    monkeypatch.setattr(curses, "curs_set", lambda visibility: None)
+    return IncrementalRenderer(FakeWindow(), animation_frames=4, frame_time_ms=50)
+
+
+def test_animation_runs_without_blocking_the_loop(renderer):
+    async def run():
+        renderer.render_grid(state([[2, 0], [0, 0]]))
+        renderer.render_grid(state([[4, 2], [0, 0]], score=4))
+        # The render returns at once and the flash plays on the loop
+        await asyncio.sleep(0)
+        assert renderer.stdscr.attrs[(2, 0)] == IncrementalRenderer.HIGHLIGHT
+        await renderer.wait_animation()
+        assert renderer.stdscr.attrs[(2, 0)] == curses.A_NORMAL
+
+    asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+
+def test_next_render_cuts_the_animation_short(renderer):
+    async def run():
+        renderer.render_grid(state([[2, 0], [0, 0]]))
+        renderer.render_grid(state([[4, 0], [0, 0]], score=4))
+        await asyncio.sleep(0)
+        renderer.render_grid(state([[4, 0], [2, 0]], score=4))
+        assert renderer.stdscr.attrs[(2, 0)] == curses.A_NORMAL
+        await renderer.wait_animation()
+
+    asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+
+def test_no_animation_outside_an_event_loop(renderer):
+    renderer.render_grid(state([[2, 0], [0, 0]]))
+    renderer.render_grid(state([[4, 0], [0, 0]], score=4))
+    assert renderer.stdscr.attrs[(2, 0)] == curses.A_NORMAL